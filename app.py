@@ -17,6 +17,8 @@ from dash import Dash, Input, Output, State, dcc, html, no_update, ALL
 from dash.exceptions import PreventUpdate
 from dash_extensions import WebSocket
 
+from backend.drivers.message_inbox import validate_inbox_params
+from backend.services.expression_compiler import ExpressionError, validate_expression
 from config.settings import settings
 from frontend.components.device_card import device_card
 from frontend.pages import dashboard as dashboard_page
@@ -44,11 +46,23 @@ DASHBOARD_MIN_RENDER_INTERVAL = 1.0 / DASHBOARD_MAX_REFRESH_HZ
 DEFAULT_CONNECTION_BY_PROTOCOL: dict[str, dict[str, Any]] = {
     "modbus_tcp": {"host": "127.0.0.1", "port": 502},
     "modbus_rtu": {"port": "/dev/ttyUSB0", "baudrate": 9600, "bytesize": 8, "parity": "N", "stopbits": 1},
-    "mqtt": {"host": "127.0.0.1", "port": 1883, "username": None, "password": None},
+    "mqtt": {
+        "host": "127.0.0.1",
+        "port": 1883,
+        "username": None,
+        "password": None,
+        "inbox_policy": "all",
+        "inbox_size": 1000,
+    },
     "serial": {"port": "/dev/ttyUSB0", "baudrate": 9600, "bytesize": 8, "parity": "N", "stopbits": 1},
     "tcp": {"host": "127.0.0.1", "port": 8000},
+    "tcp_server": {"listen_port": 9000, "peer_ip": None, "identifier": None, "terminator": "\r\n"},
+    "udp": {"listen_port": 9100, "peer_ip": None},
 }
 
+# Protocols where the device pushes data into message_handler instead of being polled.
+PUSH_PROTOCOL_TYPES = {"mqtt", "tcp_server", "udp"}
+
 PROTOCOL_TEMPLATE_PRESETS: dict[str, dict[str, Any]] = {
     "modbus_tcp": {
         "name": "Modbus 模板示例",
@@ -134,6 +148,42 @@ PROTOCOL_TEMPLATE_PRESETS: dict[str, dict[str, Any]] = {
         },
         "output": {"weight": "${message_handler.result}", "unit": "kg"},
     },
+    "tcp_server": {
+        "name": "TCP 服务端（设备主动连接）模板示例",
+        "protocol_type": "tcp_server",
+        "variables": [],
+        "steps": [
+            {
+                "id": "tare",
+                "name": "去皮",
+                "trigger": "manual",
+                "action": "tcp_server.send",
+                "params": {"data": "T\r\n"},
+            }
+        ],
+        "message_handler": {
+            "id": "handle_message",
+            "name": "处理报文",
+            "trigger": "event",
+            "action": "tcp_server.on_message",
+            "parse": {"type": "regex", "pattern": "([-+]?[0-9]*\\.?[0-9]+)", "group": 1},
+        },
+        "output": {"weight": "${message_handler.result}", "unit": "kg"},
+    },
+    "udp": {
+        "name": "UDP 推送模板示例",
+        "protocol_type": "udp",
+        "variables": [],
+        "steps": [],
+        "message_handler": {
+            "id": "handle_message",
+            "name": "处理报文",
+            "trigger": "event",
+            "action": "udp.on_message",
+            "parse": {"type": "regex", "pattern": "([-+]?[0-9]*\\.?[0-9]+)", "group": 1},
+        },
+        "output": {"weight": "${message_handler.result}", "unit": "kg"},
+    },
     "serial": {
         "name": "串口模板示例",
         "protocol_type": "serial",
@@ -189,8 +239,17 @@ VALID_ACTIONS_BY_PROTOCOL: dict[str, set[str]] = {
         "delay",
     },
     "mqtt": {"mqtt.subscribe", "mqtt.on_message", "mqtt.publish", "delay"},
-    "serial": {"serial.send", "serial.receive", "delay"},
-    "tcp": {"tcp.send", "tcp.receive", "delay"},
+    "serial": {
+        "serial.send",
+        "serial.receive",
+        "serial.transact",
+        "serial.stream_start",
+        "serial.stream_read",
+        "delay",
+    },
+    "tcp": {"tcp.send", "tcp.receive", "tcp.transact", "tcp.stream_start", "tcp.stream_read", "delay"},
+    "tcp_server": {"tcp_server.send", "tcp_server.on_message", "delay"},
+    "udp": {"udp.send", "udp.on_message", "delay"},
 }
 
 UI_ACTION_OPTIONS_BY_PROTOCOL: dict[str, list[dict[str, str]]] = {
@@ -215,11 +274,23 @@ UI_ACTION_OPTIONS_BY_PROTOCOL: dict[str, list[dict[str, str]]] = {
     "serial": [
         {"label": "serial.send", "value": "serial.send"},
         {"label": "serial.receive", "value": "serial.receive"},
+        {"label": "serial.transact", "value": "serial.transact"},
+        {"label": "serial.stream_read", "value": "serial.stream_read"},
         {"label": "delay", "value": "delay"},
     ],
     "tcp": [
         {"label": "tcp.send", "value": "tcp.send"},
         {"label": "tcp.receive", "value": "tcp.receive"},
+        {"label": "tcp.transact", "value": "tcp.transact"},
+        {"label": "tcp.stream_read", "value": "tcp.stream_read"},
+        {"label": "delay", "value": "delay"},
+    ],
+    "tcp_server": [
+        {"label": "tcp_server.send", "value": "tcp_server.send"},
+        {"label": "delay", "value": "delay"},
+    ],
+    "udp": [
+        {"label": "udp.send", "value": "udp.send"},
         {"label": "delay", "value": "delay"},
     ],
 }
@@ -229,12 +300,28 @@ SETUP_ACTION_OPTIONS = [
     {"label": "delay", "value": "delay"},
 ]
 
+SETUP_ACTION_OPTIONS_BY_PROTOCOL: dict[str, list[dict[str, str]]] = {
+    "mqtt": SETUP_ACTION_OPTIONS,
+    "serial": [
+        {"label": "serial.stream_start", "value": "serial.stream_start"},
+        {"label": "serial.send", "value": "serial.send"},
+        {"label": "delay", "value": "delay"},
+    ],
+    "tcp": [
+        {"label": "tcp.stream_start", "value": "tcp.stream_start"},
+        {"label": "tcp.send", "value": "tcp.send"},
+        {"label": "delay", "value": "delay"},
+    ],
+}
+
 TRIGGER_OPTIONS_BY_PROTOCOL: dict[str, list[dict[str, str]]] = {
     "modbus_tcp": [{"label": "poll", "value": "poll"}, {"label": "manual", "value": "manual"}],
     "modbus_rtu": [{"label": "poll", "value": "poll"}, {"label": "manual", "value": "manual"}],
     "mqtt": [{"label": "manual", "value": "manual"}],
     "serial": [{"label": "poll", "value": "poll"}, {"label": "manual", "value": "manual"}],
     "tcp": [{"label": "poll", "value": "poll"}, {"label": "manual", "value": "manual"}],
+    "tcp_server": [{"label": "manual", "value": "manual"}],
+    "udp": [{"label": "manual", "value": "manual"}],
 }
 
 PARSE_TYPE_UI_OPTIONS = [
@@ -277,9 +364,9 @@ def _is_valid_placeholder(path: str) -> bool:
 
 def _validate_expression_syntax(expression: str) -> bool:
     try:
-        compile(expression, "<protocol_expression>", "eval")
+        validate_expression(expression)
         return True
-    except Exception:
+    except ExpressionError:
         return False
 
 
@@ -346,7 +433,7 @@ def _default_step_row(protocol_type: str) -> dict[str, Any]:
     normalized = str(protocol_type or "modbus_tcp")
     options = UI_ACTION_OPTIONS_BY_PROTOCOL.get(normalized, UI_ACTION_OPTIONS_BY_PROTOCOL["modbus_tcp"])
     default_action = options[0]["value"] if options else ""
-    default_trigger = "manual" if normalized == "mqtt" else "poll"
+    default_trigger = "manual" if normalized in PUSH_PROTOCOL_TYPES else "poll"
     return {
         "id": "",
         "name": "",
@@ -436,7 +523,7 @@ def _template_to_form_fields(template: dict[str, Any]) -> dict[str, Any]:
         "variables_data": [_variable_to_row(v) for v in variables if isinstance(v, dict)],
         "steps_data": [_step_to_row(s) for s in steps if isinstance(s, dict)],
         "setup_steps_data": [_step_to_row(s) for s in setup_steps if isinstance(s, dict)],
-        "message_fields": _handler_to_fields(message_handler if protocol_type == "mqtt" else {}),
+        "message_fields": _handler_to_fields(message_handler if protocol_type in PUSH_PROTOCOL_TYPES else {}),
         "output_weight": str(output.get("weight") or ""),
         "output_unit": str(output.get("unit") or "kg"),
     }
@@ -543,10 +630,55 @@ def _validate_template_structure(template: dict[str, Any], strict_name: bool = T
         for i, step in enumerate(template.get("steps", []), start=1):
             if step.get("trigger") != "manual":
                 warnings.append(f"MQTT steps[{i}] 建议只保留 manual 步骤")
+    elif protocol_type in PUSH_PROTOCOL_TYPES:
+        if not isinstance(template.get("message_handler"), dict):
+            errors.append(f"{protocol_type} 协议必须配置 message_handler")
+        for i, step in enumerate(template.get("steps", []), start=1):
+            if step.get("trigger") != "manual":
+                warnings.append(f"{protocol_type} steps[{i}] 建议只保留 manual 步骤")
     else:
         if not template.get("steps"):
             errors.append(f"{protocol_type or '当前'} 协议必须配置 steps")
 
+    handler = template.get("message_handler")
+    batch = handler.get("batch") if isinstance(handler, dict) else None
+    if batch is not None:
+        if not isinstance(batch, dict):
+            errors.append("message_handler.batch 必须是对象")
+        elif str(batch.get("format") or "json_array") not in {"json_array", "ndjson"}:
+            errors.append("message_handler.batch.format 只能是 json_array 或 ndjson")
+
+    output = template.get("output")
+    stability = output.get("stability") if isinstance(output, dict) else None
+    if stability is not None:
+        if not isinstance(stability, dict):
+            errors.append("output.stability 必须是对象")
+        else:
+            try:
+                if int(stability.get("window") or 10) < 2:
+                    errors.append("output.stability.window 不能小于 2")
+                if float(stability.get("tolerance") or 0) < 0:
+                    errors.append("output.stability.tolerance 不能为负数")
+            except (TypeError, ValueError):
+                errors.append("output.stability.window / tolerance 必须是数字")
+
+    publish_policy = template.get("publish_policy")
+    if publish_policy is not None:
+        if not isinstance(publish_policy, dict):
+            errors.append("publish_policy 必须是对象")
+        else:
+            for key in ("deadband_abs", "deadband_percent", "heartbeat"):
+                value = publish_policy.get(key)
+                if value is None:
+                    continue
+                try:
+                    number = float(value)
+                except (TypeError, ValueError):
+                    errors.append(f"publish_policy.{key} 必须是数字")
+                    continue
+                if number < 0 or (key == "heartbeat" and number == 0):
+                    errors.append(f"publish_policy.{key} 必须大于 0" if key == "heartbeat" else f"publish_policy.{key} 不能为负数")
+
     return errors, warnings
 
 
@@ -599,7 +731,7 @@ def _generate_template_from_form(
             continue
         row = dict(row)
         row["trigger"] = row.get("trigger") or "setup"
-        step, step_errors, step_warnings = _parse_row_step(row, "mqtt", "setup")
+        step, step_errors, step_warnings = _parse_row_step(row, protocol_type, "setup")
         errors.extend(step_errors)
         warnings.extend(step_warnings)
         if step:
@@ -617,14 +749,15 @@ def _generate_template_from_form(
         },
     }
 
-    if protocol_type == "mqtt":
-        template["setup_steps"] = parsed_setup_steps
+    if protocol_type in PUSH_PROTOCOL_TYPES:
+        if parsed_setup_steps or protocol_type == "mqtt":
+            template["setup_steps"] = parsed_setup_steps
         template["steps"] = [step for step in parsed_steps if step.get("trigger") == "manual"]
         message_handler: dict[str, Any] = {
             "id": message_id or "handle_message",
             "name": message_name or "处理消息",
             "trigger": "event",
-            "action": message_action or "mqtt.on_message",
+            "action": message_action or f"{protocol_type}.on_message",
         }
         if message_parse_type:
             if message_parse_type == "expression":
@@ -644,6 +777,8 @@ def _generate_template_from_form(
         template["message_handler"] = message_handler
     else:
         template["steps"] = parsed_steps
+        if parsed_setup_steps:
+            template["setup_steps"] = parsed_setup_steps
 
     structure_errors, structure_warnings = _validate_template_structure(template, strict_name=False)
     errors.extend(structure_errors)
@@ -1198,11 +1333,18 @@ def create_device(
             return "创建失败: 采集频率必须大于 0（单位：次/秒）"
 
         poll_interval = 1.0 / rate
+        connection_params = json.loads(connection_json or "{}")
+        if not isinstance(connection_params, dict):
+            return "创建失败: 连接参数必须是 JSON 对象"
+        try:
+            validate_inbox_params(connection_params)
+        except ValueError as exc:
+            return f"创建失败: {exc}"
         payload = {
             "device_code": str(device_code),
             "name": name,
             "protocol_template_id": int(template_id),
-            "connection_params": json.loads(connection_json or "{}"),
+            "connection_params": connection_params,
             "template_variables": json.loads(variables_json or "{}"),
             "poll_interval": poll_interval,
             "enabled": str(enabled).lower() == "true",
@@ -1528,10 +1670,11 @@ def switch_protocol_editor_mode(mode: str):
     Input("protocol-type", "value"),
 )
 def switch_protocol_mqtt_sections(protocol_type: str):
-    is_mqtt = str(protocol_type or "") == "mqtt"
+    normalized = str(protocol_type or "")
+    is_push = normalized in PUSH_PROTOCOL_TYPES
     visible = {"display": "block"}
     hidden = {"display": "none"}
-    return (visible if is_mqtt else hidden, visible if is_mqtt else hidden)
+    return (visible if normalized in SETUP_ACTION_OPTIONS_BY_PROTOCOL else hidden, visible if is_push else hidden)
 
 
 @app.callback(
@@ -1544,7 +1687,8 @@ def update_protocol_step_dropdowns(protocol_type: str):
     normalized = str(protocol_type or "modbus_tcp")
     main_actions = UI_ACTION_OPTIONS_BY_PROTOCOL.get(normalized, UI_ACTION_OPTIONS_BY_PROTOCOL["modbus_tcp"])
     main_triggers = TRIGGER_OPTIONS_BY_PROTOCOL.get(normalized, TRIGGER_OPTIONS_BY_PROTOCOL["modbus_tcp"])
-    return main_triggers, main_actions, SETUP_ACTION_OPTIONS
+    setup_actions = SETUP_ACTION_OPTIONS_BY_PROTOCOL.get(normalized, SETUP_ACTION_OPTIONS)
+    return main_triggers, main_actions, setup_actions
 
 
 @app.callback(
@@ -2236,6 +2380,8 @@ def load_protocol_preset(
 
     if normalized == "mqtt":
         text = "MQTT 模板建议使用 setup_steps + message_handler。setup 负责订阅，message_handler 负责解析消息。"
+    elif normalized in PUSH_PROTOCOL_TYPES:
+        text = "推送类模板使用 message_handler 解析设备主动上报的每一帧；steps 只保留 manual 控制步骤。"
     else:
         text = "轮询协议模板建议使用 steps + trigger=poll；写操作步骤建议设置 trigger=manual。"
 
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import asyncio
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse, Response
 from peewee import IntegrityError
 
 from backend.api.deps import require_api_key
@@ -35,6 +37,7 @@ async def create_device(payload: DeviceCreate) -> dict[str, Any]:
             protocol_template=payload.protocol_template_id,
             connection_params=payload.connection_params,
             template_variables=payload.template_variables,
+            runtime_options=payload.runtime_options,
             poll_interval=payload.poll_interval,
             enabled=payload.enabled,
         )
@@ -83,6 +86,16 @@ async def disable_device_by_code(device_code: str) -> dict[str, Any]:
     return row.to_dict()
 
 
+@router.get("/by-code/{device_code}/updates")
+async def wait_device_update_by_code(
+    device_code: str,
+    timeout: float = Query(25.0, ge=0, le=60),
+    since: str | None = None,
+) -> Response:
+    row = _get_device_by_code_or_404(device_code)
+    return await _wait_for_update(row.id, timeout, since)
+
+
 @router.post("/by-code/{device_code}/execute")
 async def execute_step_by_code(device_code: str, payload: ExecuteStepRequest) -> dict[str, Any]:
     row = _get_device_by_code_or_404(device_code)
@@ -129,6 +142,16 @@ async def disable_device(device_id: int) -> dict[str, Any]:
     return row.to_dict()
 
 
+@router.get("/{device_id}/updates")
+async def wait_device_update(
+    device_id: int,
+    timeout: float = Query(25.0, ge=0, le=60),
+    since: str | None = None,
+) -> Response:
+    row = _get_device_by_id_or_404(device_id)
+    return await _wait_for_update(row.id, timeout, since)
+
+
 @router.post("/{device_id}/execute")
 async def execute_step(device_id: int, payload: ExecuteStepRequest) -> dict[str, Any]:
     row = _get_device_by_id_or_404(device_id)
@@ -183,6 +206,24 @@ async def _update_device_row(row: Device, payload: DeviceUpdate) -> dict[str, An
     return row.to_dict()
 
 
+async def _wait_for_update(device_id: int, timeout: float, since: str | None) -> Response:
+    """Long poll: return the next weight_update, or the current snapshot when it is newer than `since` or on timeout."""
+    # Subscribe first so an update between the snapshot and the wait is not lost.
+    queue = await manager.subscribe([device_id])
+    try:
+        snapshot = await manager.runtime_snapshot(device_id)
+        if since is not None and snapshot.get("timestamp") != since:
+            return JSONResponse(snapshot)
+        try:
+            # The bus already encoded the update; send those bytes as they are.
+            frame = await asyncio.wait_for(queue.get(), timeout=timeout)
+            return Response(frame, media_type="application/json")
+        except asyncio.TimeoutError:
+            return JSONResponse(await manager.runtime_snapshot(device_id))
+    finally:
+        await manager.unsubscribe(queue)
+
+
 async def _execute_manual(device_id: int, payload: ExecuteStepRequest) -> dict[str, Any]:
     try:
         return await manager.execute_manual_step(device_id, payload.step_id, payload.params)
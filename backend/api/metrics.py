@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi import APIRouter, Depends
+
+from backend.api.deps import require_api_key
+from backend.drivers.message_inbox import inbox_dispatcher
+from backend.drivers.modbus_bus import modbus_rtu_buses
+from backend.drivers.modbus_pool import modbus_tcp_pool
+from backend.drivers.mqtt_broker import mqtt_clients
+from backend.drivers.tcp_listener import tcp_listener_hub
+from backend.drivers.udp_listener import udp_endpoint_hub
+from backend.services.codec_cache import codec_cache_stats
+from backend.services.device_manager import manager
+from backend.services.expression_compiler import expression_cache_stats
+from backend.services.poll_scheduler import poll_scheduler
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"], dependencies=[Depends(require_api_key)])
+
+
+@router.get("/parse-cache")
+def get_parse_cache_stats() -> dict[str, Any]:
+    return {"expression": expression_cache_stats(), **codec_cache_stats()}
+
+
+@router.get("/modbus-pool")
+def get_modbus_pool_stats() -> dict[str, Any]:
+    return modbus_tcp_pool.stats()
+
+
+@router.get("/modbus-bus")
+def get_modbus_bus_stats() -> dict[str, Any]:
+    return modbus_rtu_buses.stats()
+
+
+@router.get("/mqtt-clients")
+def get_mqtt_client_stats() -> dict[str, Any]:
+    return mqtt_clients.stats()
+
+
+@router.get("/inboxes")
+def get_inbox_stats() -> dict[str, Any]:
+    devices = []
+    for runtime in manager.list_runtimes():
+        inbox = getattr(runtime.driver, "inbox", None)
+        if inbox is None:
+            continue
+        devices.append({"device_id": runtime.device.id, "device_code": runtime.device.device_code, **inbox.stats()})
+    return {**inbox_dispatcher.stats(), "devices": devices}
+
+
+@router.get("/tcp-listeners")
+def get_tcp_listener_stats() -> dict[str, Any]:
+    return tcp_listener_hub.stats()
+
+
+@router.get("/udp-endpoints")
+def get_udp_endpoint_stats() -> dict[str, Any]:
+    return udp_endpoint_hub.stats()
+
+
+@router.get("/scheduler")
+def get_scheduler_stats() -> dict[str, Any]:
+    return poll_scheduler.stats()
+
+
+@router.get("/lifecycle")
+def get_lifecycle_stats() -> dict[str, Any]:
+    return manager.lifecycle_stats()
+
+
+@router.get("/publish")
+def get_publish_stats() -> dict[str, Any]:
+    return manager.publish_stats()
+
+
+@router.get("/subscriptions")
+def get_subscription_stats() -> dict[str, Any]:
+    return manager.subscription_stats()
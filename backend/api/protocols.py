@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import logging
 from typing import Any, Literal
 
 from fastapi import APIRouter, Depends, HTTPException
@@ -8,8 +9,11 @@ from backend.api.deps import require_api_key
 from backend.api.schemas import ProtocolTemplateCreate, ProtocolTemplateUpdate, ProtocolTestRequest, StepTestRequest
 from backend.database.models import Device, ProtocolTemplate
 from backend.drivers import build_driver
+from backend.services.device_manager import manager
 from backend.services.protocol_executor import ProtocolExecutor
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/api/protocols", tags=["protocols"], dependencies=[Depends(require_api_key)])
 
 
@@ -65,17 +69,31 @@ def get_protocol(protocol_id: int) -> dict[str, Any]:
 
 
 @router.put("/{protocol_id}")
-def update_protocol(protocol_id: int, payload: ProtocolTemplateUpdate) -> dict[str, Any]:
+async def update_protocol(protocol_id: int, payload: ProtocolTemplateUpdate) -> dict[str, Any]:
     row = ProtocolTemplate.get_or_none(ProtocolTemplate.id == protocol_id)
     if row is None:
         raise HTTPException(status_code=404, detail="Protocol not found")
-    _ensure_template_not_in_use(row.id)
 
     data = payload.model_dump(exclude_none=True)
+    if "template" in data:
+        # Devices using this template pick it up right away, so reject a template that does not compile.
+        try:
+            ProtocolExecutor().compile(data["template"])
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
     for key, value in data.items():
         setattr(row, key, value)
     row.save()
-    return row.to_dict()
+    result = row.to_dict()
+    # The edit is already committed: a device that cannot pick it up is reported, not turned into a 500.
+    try:
+        errors = await manager.reload_template(row.id)
+    except Exception as exc:
+        logger.exception("Failed to reload devices for protocol_id=%s: %s", row.id, exc)
+        errors = [{"device_id": None, "error": str(exc)}]
+    if errors:
+        result["reload_errors"] = errors
+    return result
 
 
 @router.delete("/{protocol_id}")
@@ -87,6 +105,7 @@ def delete_protocol(protocol_id: int) -> dict[str, bool]:
     if row.is_system:
         raise HTTPException(status_code=403, detail="System protocol can not be deleted")
     row.delete_instance(recursive=True)
+    manager.invalidate_plan(protocol_id)
     return {"ok": True}
 
 
@@ -162,6 +181,21 @@ async def execute_single_step(
     if not test_payload:
         raise ValueError("event 步骤测试需要提供 test_payload")
 
+    if isinstance(step.get("batch"), dict):
+        plan = executor.compile({**template, "message_handler": step})
+        payload_text = str(test_payload)
+        rendered: dict[str, Any] = {}
+        records = 0
+        for key in executor.record_groups(plan, payload_text):
+            _, outputs = await executor.run_message_batch(plan, payload_text, variables, key=key)
+            records += len(outputs)
+            # Only the last record of each device is published at runtime.
+            rendered[key if key is not None else "*"] = outputs[-1]
+        return {
+            "step_result": {"records": records, "devices": len(rendered)},
+            "rendered_output": rendered,
+        }
+
     event_context = {
         "payload": str(test_payload),
         "steps": steps_context,
@@ -195,7 +229,7 @@ async def test_protocol(protocol_id: int, payload: ProtocolTestRequest) -> dict[
         context_steps = setup
 
         output = None
-        if row.protocol_type.lower() != "mqtt":
+        if not driver.is_push_driven():
             context_steps = await executor.run_poll_steps(
                 row.template,
                 driver,
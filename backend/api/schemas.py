@@ -5,6 +5,9 @@ from typing import Any, Literal
 
 from pydantic import BaseModel, Field, field_validator
 
+from backend.services.adaptive_poll import parse_adaptive_poll, parse_on_demand
+from backend.services.template_compiler import parse_publish_policy
+
 
 DEVICE_CODE_PATTERN = re.compile(r"^[A-Z0-9][A-Z0-9_-]{0,63}$")
 
@@ -18,6 +21,23 @@ def _normalize_device_code(value: Any) -> str:
     return code
 
 
+def _validate_runtime_options(value: dict[str, Any] | None) -> dict[str, Any] | None:
+    if value is None:
+        return None
+    policy = value.get("publish_policy")
+    if policy is not None:
+        if not isinstance(policy, dict):
+            raise ValueError("runtime_options.publish_policy must be an object")
+        parse_publish_policy(policy)
+    adaptive = value.get("adaptive_poll")
+    if adaptive is not None:
+        if not isinstance(adaptive, dict):
+            raise ValueError("runtime_options.adaptive_poll must be an object")
+        parse_adaptive_poll(adaptive)
+    parse_on_demand(value.get("on_demand"))
+    return value
+
+
 class ProtocolTemplateBase(BaseModel):
     name: str
     description: str | None = None
@@ -42,6 +62,7 @@ class DeviceBase(BaseModel):
     protocol_template_id: int
     connection_params: dict[str, Any] = Field(default_factory=dict)
     template_variables: dict[str, Any] = Field(default_factory=dict)
+    runtime_options: dict[str, Any] = Field(default_factory=dict)
     poll_interval: float = 1.0
     enabled: bool = True
 
@@ -52,6 +73,11 @@ class DeviceCreate(DeviceBase):
     def validate_device_code(cls, value: Any) -> str:
         return _normalize_device_code(value)
 
+    @field_validator("runtime_options")
+    @classmethod
+    def validate_runtime_options(cls, value: dict[str, Any]) -> dict[str, Any]:
+        return _validate_runtime_options(value)
+
 
 class DeviceUpdate(BaseModel):
     device_code: str | None = None
@@ -59,6 +85,7 @@ class DeviceUpdate(BaseModel):
     protocol_template_id: int | None = None
     connection_params: dict[str, Any] | None = None
     template_variables: dict[str, Any] | None = None
+    runtime_options: dict[str, Any] | None = None
     poll_interval: float | None = None
     enabled: bool | None = None
 
@@ -69,6 +96,11 @@ class DeviceUpdate(BaseModel):
             return None
         return _normalize_device_code(value)
 
+    @field_validator("runtime_options")
+    @classmethod
+    def validate_runtime_options(cls, value: dict[str, Any] | None) -> dict[str, Any] | None:
+        return _validate_runtime_options(value)
+
 
 class ExecuteStepRequest(BaseModel):
     step_id: str
@@ -1,14 +1,23 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import json
+import logging
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
 from backend.api.deps import verify_api_key_value
 from backend.services.device_manager import manager
+from backend.services.event_bus import encode_message, offer
+from backend.services.subscriptions import Selector
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["websocket"])
 
+_PING = encode_message({"type": "ping"})
+
 
 @router.websocket("/ws")
 async def websocket_stream(websocket: WebSocket) -> None:
@@ -17,17 +26,81 @@ async def websocket_stream(websocket: WebSocket) -> None:
         await websocket.close(code=4401)
         return
 
-    await websocket.accept()
-    queue = await manager.subscribe()
+    device_ids = None
+    raw_ids = websocket.query_params.get("device_ids")
+    if raw_ids:
+        try:
+            device_ids = {int(item) for item in raw_ids.split(",") if item.strip()}
+        except ValueError:
+            await websocket.close(code=4400)
+            return
 
+    await websocket.accept()
+    # Subscribing to specific devices is also what keeps on_demand devices polling at full rate.
+    queue = await manager.subscribe(device_ids)
+    # Without ?device_ids the socket gets every device until its first "subscribe".
+    selector = Selector(everything=device_ids is None, device_ids=device_ids or set())
+    sender = asyncio.create_task(_send_updates(websocket, queue))
     try:
-        while True:
-            try:
-                message = await asyncio.wait_for(queue.get(), timeout=30)
-                await websocket.send_json(message)
-            except asyncio.TimeoutError:
-                await websocket.send_json({"type": "ping"})
+        await _receive_controls(websocket, queue, selector, implicit=device_ids is None)
     except WebSocketDisconnect:
         pass
     finally:
+        sender.cancel()
         await manager.unsubscribe(queue)
+
+
+async def _send_updates(websocket: WebSocket, queue: asyncio.Queue) -> None:
+    try:
+        while True:
+            try:
+                frame = await asyncio.wait_for(queue.get(), timeout=30)
+                await websocket.send_text(frame)
+            except asyncio.TimeoutError:
+                await websocket.send_text(_PING)
+    except Exception as exc:
+        # The receiving side notices the closed socket and cleans up.
+        logger.warning("WebSocket send failed: %s", exc)
+        with contextlib.suppress(Exception):
+            await websocket.close()
+
+
+async def _receive_controls(websocket: WebSocket, queue: asyncio.Queue, selector: Selector, implicit: bool) -> None:
+    """Handle `subscribe` / `unsubscribe` messages; replies go through the queue so only one task sends."""
+    status_only = False
+    while True:
+        text = await websocket.receive_text()
+        try:
+            request = json.loads(text)
+            if not isinstance(request, dict):
+                raise ValueError("control message must be a JSON object")
+            action = request.get("action")
+            if action not in {"subscribe", "unsubscribe"}:
+                raise ValueError("action must be subscribe or unsubscribe")
+            requested = Selector.from_message(request)
+        except ValueError as exc:
+            offer(queue, encode_message({"type": "error", "error": str(exc)}))
+            continue
+
+        if action == "subscribe":
+            if implicit:
+                # The first explicit subscribe replaces the default "everything".
+                selector.subtract(Selector(everything=True))
+                implicit = False
+            selector.merge(requested)
+            if "status_only" in request:
+                status_only = bool(request["status_only"])
+        else:
+            selector.subtract(requested)
+        device_ids = await manager.update_subscription(queue, selector, status_only)
+        offer(
+            queue,
+            encode_message(
+                {
+                    "type": "subscription",
+                    **selector.describe(),
+                    "status_only": status_only,
+                    "matched_device_ids": device_ids,
+                }
+            ),
+        )
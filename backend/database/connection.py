@@ -56,6 +56,7 @@ def init_db(seed: bool = True) -> None:
         normalize_code=normalize_device_code,
         default_code_builder=build_default_device_code,
     )
+    _ensure_runtime_options_schema()
 
     if seed:
         seed_system_templates()
@@ -66,6 +67,13 @@ def close_db() -> None:
         database_proxy.close()
 
 
+def _ensure_runtime_options_schema() -> None:
+    columns = {column.name for column in database_proxy.get_columns("devices")}
+    if "runtime_options" not in columns:
+        # NULL reads back as {} through JSONField.
+        database_proxy.execute_sql("ALTER TABLE devices ADD COLUMN runtime_options TEXT")
+
+
 def _ensure_device_code_schema(
     normalize_code,
     default_code_builder,
@@ -110,6 +110,7 @@ class Device(BaseModel):
     protocol_template = ForeignKeyField(ProtocolTemplate, backref="devices", on_delete="CASCADE")
     connection_params = JSONField()
     template_variables = JSONField()
+    runtime_options = JSONField(default=dict)
     poll_interval = FloatField(default=1.0)
     enabled = BooleanField(default=True)
     created_at = DateTimeField(default=utcnow)
@@ -131,6 +132,7 @@ class Device(BaseModel):
             "protocol_template_id": self.protocol_template_id,
             "connection_params": self.connection_params,
             "template_variables": self.template_variables,
+            "runtime_options": self.runtime_options,
             "poll_interval": self.poll_interval,
             "enabled": self.enabled,
             "created_at": to_iso(self.created_at),
@@ -7,6 +7,8 @@ from backend.drivers.modbus_driver import ModbusDriver
 from backend.drivers.mqtt_driver import MqttDriver
 from backend.drivers.serial_driver import SerialDriver
 from backend.drivers.tcp_driver import TcpDriver
+from backend.drivers.tcp_server_driver import TcpServerDriver
+from backend.drivers.udp_driver import UdpDriver
 
 
 def build_driver(protocol_type: str, connection_params: dict[str, Any]) -> DeviceDriver:
@@ -17,6 +19,10 @@ def build_driver(protocol_type: str, connection_params: dict[str, Any]) -> Devic
         return MqttDriver(connection_params)
     if normalized == "tcp":
         return TcpDriver(connection_params)
+    if normalized == "tcp_server":
+        return TcpServerDriver(connection_params)
+    if normalized == "udp":
+        return UdpDriver(connection_params)
     if normalized == "serial":
         return SerialDriver(connection_params)
     raise ValueError(f"Unsupported protocol_type: {protocol_type}")
@@ -5,6 +5,7 @@ from typing import Any, Awaitable, Callable
 
 
 MessageHandler = Callable[[str, bytes], Awaitable[None]]
+BatchMessageHandler = Callable[[str, list[bytes]], Awaitable[None]]
 
 
 class DeviceDriver(ABC):
@@ -29,3 +30,27 @@ class DeviceDriver(ABC):
 
     def register_message_handler(self, handler: MessageHandler) -> None:
         _ = handler
+
+    def register_batch_handler(self, handler: BatchMessageHandler) -> None:
+        # Drivers that receive bursts may hand several payloads over at once.
+        _ = handler
+
+    def is_push_driven(self) -> bool:
+        # Data arrives through register_message_handler instead of poll steps.
+        return False
+
+    def supports_pipelining(self) -> bool:
+        # Whether independent actions may be in flight at the same time.
+        return False
+
+    def supports_read_coalescing(self) -> bool:
+        # Whether adjacent register reads may be merged into one request.
+        return False
+
+    def begin_setup(self) -> None:
+        # Setup steps are about to (re)run, e.g. after a template swap on a live connection.
+        return None
+
+    def finish_setup(self) -> None:
+        # Setup steps completed; drop whatever the previous setup created and this one did not.
+        return None
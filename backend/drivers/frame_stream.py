@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Mapping
+
+from backend.drivers.framing import FrameError, FrameSpec
+
+DEFAULT_STREAM_CAPACITY = 64
+STREAM_READ_MODES = {"latest", "all"}
+
+
+class Framer:
+    """Cut a byte stream into frames according to a `FrameSpec`."""
+
+    def __init__(self, spec: FrameSpec):
+        self.spec = spec
+        self._buffer = bytearray()
+        self.discarded_bytes = 0
+
+    def feed(self, data: bytes) -> list[bytes]:
+        if not self.spec.delimited:
+            # Without a boundary every chunk the reader gets is one frame.
+            return [bytes(data[index : index + self.spec.max_bytes]) for index in range(0, len(data), self.spec.max_bytes)]
+
+        self._buffer += data
+        frames: list[bytes] = []
+        while self._buffer:
+            try:
+                end = self.spec.frame_end(self._buffer)
+            except FrameError:
+                # Line noise or a lost boundary: resynchronise on the next chunk.
+                self.discarded_bytes += len(self._buffer)
+                self._buffer.clear()
+                break
+            if end is None:
+                break
+            frames.append(bytes(self._buffer[:end]))
+            del self._buffer[:end]
+        return frames
+
+    def reset(self) -> None:
+        self._buffer.clear()
+
+
+class FrameStream:
+    """Bounded ring of frames filled by a driver's background reader.
+
+    The oldest frame is dropped when the consumer falls behind; `dropped`
+    counts them so a template can tell it is losing data.
+    """
+
+    def __init__(self, spec: FrameSpec, capacity: int = DEFAULT_STREAM_CAPACITY):
+        self.framer = Framer(spec)
+        self.capacity = max(int(capacity), 1)
+        self._frames: deque[tuple[float, bytes]] = deque(maxlen=self.capacity)
+        self._latest: tuple[float, bytes] | None = None
+        self._arrived = asyncio.Event()
+        self.received = 0
+        self.dropped = 0
+        self.error: str | None = None
+
+    @classmethod
+    def from_params(cls, params: Mapping[str, Any]) -> FrameStream:
+        return cls(FrameSpec.from_params(params), int(params.get("buffer_size", DEFAULT_STREAM_CAPACITY)))
+
+    def feed(self, data: bytes) -> None:
+        now = time.monotonic()
+        for frame in self.framer.feed(data):
+            if len(self._frames) == self.capacity:
+                self.dropped += 1
+            self._frames.append((now, frame))
+            self._latest = (now, frame)
+            self.received += 1
+            self._arrived.set()
+
+    def restart(self) -> None:
+        # A new connection starts mid-stream; never glue bytes across it.
+        self.framer.reset()
+        self.error = None
+
+    async def read(self, mode: str, timeout: float, max_age: float | None = None) -> dict[str, Any]:
+        if mode not in STREAM_READ_MODES:
+            raise ValueError(f"stream_read mode must be one of {sorted(STREAM_READ_MODES)}")
+        if self._latest is None and timeout > 0:
+            self._arrived.clear()
+            try:
+                await asyncio.wait_for(self._arrived.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        if self._latest is None:
+            raise TimeoutError(self.error or f"no frame received within {timeout * 1000:.0f} ms")
+
+        received_at, payload = self._latest
+        age = time.monotonic() - received_at
+        if max_age is not None and age > max_age:
+            raise TimeoutError(self.error or f"latest frame is {age * 1000:.0f} ms old")
+
+        pending = list(self._frames)
+        self._frames.clear()
+        frames = [frame for _, frame in pending] if mode == "all" else []
+        return {
+            "payload": payload,
+            "frames": frames,
+            "new_frames": len(pending),
+            "received": self.received,
+            "dropped": self.dropped,
+            "discarded_bytes": self.framer.discarded_bytes,
+            "age_ms": round(age * 1000, 1),
+        }
+
+
+async def run_reader(stream: FrameStream, read_chunk: Any, on_closed: Any) -> None:
+    """Pump ``read_chunk()`` into ``stream`` until EOF or an error, then call ``on_closed``."""
+    stream.restart()
+    try:
+        while True:
+            chunk = await read_chunk()
+            if chunk is None:
+                stream.error = "stream closed by peer"
+                break
+            if chunk:
+                stream.feed(chunk)
+    except asyncio.CancelledError:
+        raise
+    except Exception as exc:
+        stream.error = f"stream reader failed: {exc}"
+    on_closed()
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import codecs
+from dataclasses import dataclass
+from typing import Any, Mapping
+
+DEFAULT_MAX_FRAME_BYTES = 4096
+
+
+class FrameError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class LengthField:
+    """Frame length carried in the header: total = offset + size + value + adjust."""
+
+    offset: int = 0
+    size: int = 1
+    byteorder: str = "big"
+    adjust: int = 0
+
+    @property
+    def header_length(self) -> int:
+        return self.offset + self.size
+
+    def total_length(self, header: bytes | bytearray) -> int:
+        value = int.from_bytes(header[self.offset : self.header_length], self.byteorder)
+        return self.header_length + value + self.adjust
+
+
+@dataclass(frozen=True)
+class FrameSpec:
+    """Where a frame ends: terminator, fixed length, length field, or (none of them) line idle."""
+
+    terminator: bytes = b""
+    expected_length: int = 0
+    length_field: LengthField | None = None
+    max_bytes: int = DEFAULT_MAX_FRAME_BYTES
+
+    @classmethod
+    def from_params(cls, params: Mapping[str, Any]) -> FrameSpec:
+        length_field = params.get("length_field")
+        spec = cls(
+            terminator=_terminator_bytes(params.get("terminator"), str(params.get("terminator_encoding", "ascii"))),
+            expected_length=int(params.get("expected_length") or 0),
+            length_field=_length_field(length_field) if isinstance(length_field, dict) else None,
+            max_bytes=int(params.get("max_bytes") or DEFAULT_MAX_FRAME_BYTES),
+        )
+        if spec.max_bytes <= 0:
+            raise FrameError("max_bytes must be > 0")
+        if spec.expected_length > spec.max_bytes:
+            raise FrameError(f"expected_length {spec.expected_length} exceeds max_bytes {spec.max_bytes}")
+        return spec
+
+    @property
+    def delimited(self) -> bool:
+        return bool(self.terminator or self.expected_length or self.length_field)
+
+    def frame_end(self, buffer: bytes | bytearray) -> int | None:
+        """Return the end offset of the first complete frame in ``buffer``, None if incomplete."""
+        end: int | None = None
+        if self.terminator:
+            index = buffer.find(self.terminator, 0, self.max_bytes + len(self.terminator))
+            if index >= 0:
+                end = index + len(self.terminator)
+        elif self.expected_length:
+            if len(buffer) >= self.expected_length:
+                end = self.expected_length
+        elif self.length_field is not None:
+            if len(buffer) >= self.length_field.header_length:
+                total = self.check_length(self.length_field.total_length(buffer))
+                if len(buffer) >= total:
+                    end = total
+        elif len(buffer) >= self.max_bytes:
+            end = self.max_bytes
+
+        if end is None and self.delimited and len(buffer) >= self.max_bytes:
+            raise FrameError(f"no frame boundary within max_bytes={self.max_bytes}")
+        if end is not None and end > self.max_bytes:
+            raise FrameError(f"frame of {end} bytes exceeds max_bytes={self.max_bytes}")
+        return end
+
+    def check_length(self, total: int) -> int:
+        if self.length_field is not None and total < self.length_field.header_length:
+            raise FrameError(f"length field gives {total} bytes, shorter than its header")
+        if total > self.max_bytes:
+            raise FrameError(f"frame of {total} bytes exceeds max_bytes={self.max_bytes}")
+        return total
+
+
+def to_bytes(data: Any, encoding: str) -> bytes:
+    """Payload bytes for a step's `data` param: raw bytes, a hex string, or text as UTF-8."""
+    if isinstance(data, bytes):
+        return data
+    text = str(data)
+    if encoding == "hex":
+        return bytes.fromhex(text.replace(" ", ""))
+    return text.encode("utf-8")
+
+
+def _terminator_bytes(value: Any, encoding: str) -> bytes:
+    if value is None or value == "":
+        return b""
+    if isinstance(value, bytes):
+        return value
+    text = str(value)
+    if encoding == "hex":
+        return bytes.fromhex(text.replace(" ", ""))
+    # Accept the escaped spelling used in form inputs (`\r\n`) as well as the real characters.
+    if "\\" in text:
+        text = codecs.decode(text, "unicode_escape")
+    return text.encode("latin-1")
+
+
+def _length_field(config: Mapping[str, Any]) -> LengthField:
+    size = int(config.get("size", 1))
+    if size not in {1, 2, 4}:
+        raise FrameError("length_field.size must be 1, 2 or 4")
+    byteorder = str(config.get("byteorder", "big")).lower()
+    if byteorder not in {"big", "little"}:
+        raise FrameError("length_field.byteorder must be 'big' or 'little'")
+    return LengthField(
+        offset=int(config.get("offset", 0)),
+        size=size,
+        byteorder=byteorder,
+        adjust=int(config.get("adjust", 0)),
+    )
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Mapping
+
+from backend.drivers.base import BatchMessageHandler
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+INBOX_POLICIES = {"all", "latest", "coalesce"}
+# all / latest: queued messages; coalesce: distinct topics held.
+DEFAULT_INBOX_SIZE = {"all": 1000, "latest": 10, "coalesce": 100}
+
+
+def validate_inbox_params(params: Mapping[str, Any]) -> tuple[str, int | None]:
+    """`inbox_policy` / `inbox_size` from connection params; raises ValueError when invalid."""
+    policy = str(params.get("inbox_policy") or "all").lower()
+    if policy not in INBOX_POLICIES:
+        raise ValueError(f"inbox_policy must be one of {sorted(INBOX_POLICIES)}")
+    size = params.get("inbox_size")
+    if size is None:
+        return policy, None
+    try:
+        size = int(size)
+    except (TypeError, ValueError) as exc:
+        raise ValueError("inbox_size must be a positive integer") from exc
+    if size < 1:
+        raise ValueError("inbox_size must be a positive integer")
+    return policy, size
+
+
+class MessageInbox:
+    """Bounded per-device queue of pushed messages.
+
+    - ``all``: keep every message; once ``size`` are waiting, new ones are
+      refused and counted as ``overflow`` instead of evicting queued ones.
+    - ``latest``: keep only the newest ``size`` messages, dropping the oldest.
+    - ``coalesce``: keep only the newest payload per topic.
+
+    The inbox is processed by one dispatcher worker at a time, so a device's
+    messages are always handled in order; everything queued meanwhile is
+    handed to the handler as one batch per topic.
+    """
+
+    def __init__(
+        self,
+        handler: BatchMessageHandler,
+        policy: str = "all",
+        size: int | None = None,
+        dispatcher: InboxDispatcher | None = None,
+    ):
+        if policy not in INBOX_POLICIES:
+            raise ValueError(f"inbox_policy must be one of {sorted(INBOX_POLICIES)}")
+        self.policy = policy
+        self.size = max(int(size or DEFAULT_INBOX_SIZE[policy]), 1)
+        self._handler = handler
+        self._dispatcher = dispatcher or inbox_dispatcher
+        # "all" must never evict silently, so only "latest" gets a ring buffer.
+        self._queue: deque[tuple[str, bytes]] = deque(maxlen=self.size if policy == "latest" else None)
+        self._latest: dict[str, bytes] = {}
+        self.scheduled = False
+        self.received = 0
+        self.handled = 0
+        self.dropped = 0
+        self.coalesced = 0
+        # Messages lost because the handler raised on their batch.
+        self.failed = 0
+        self.overflow = 0
+        self._overflowing = False
+
+    @classmethod
+    def from_params(cls, handler: BatchMessageHandler, params: Mapping[str, Any]) -> MessageInbox:
+        policy, size = validate_inbox_params(params)
+        return cls(handler, policy, size)
+
+    @property
+    def depth(self) -> int:
+        return len(self._latest) if self.policy == "coalesce" else len(self._queue)
+
+    def put(self, topic: str, payload: bytes) -> None:
+        self.received += 1
+        if self.policy == "coalesce":
+            if self._latest.pop(topic, None) is not None:
+                self.coalesced += 1
+            elif len(self._latest) >= self.size:
+                del self._latest[next(iter(self._latest))]
+                self.dropped += 1
+            self._latest[topic] = payload
+        elif self.policy == "all" and len(self._queue) >= self.size:
+            self.overflow += 1
+            if not self._overflowing:
+                self._overflowing = True
+                logger.warning("Inbox full (%s messages): refusing new messages until it drains", self.size)
+            return
+        else:
+            if len(self._queue) == self.size:
+                self.dropped += 1
+            self._queue.append((topic, payload))
+        if not self.scheduled:
+            self.scheduled = True
+            self._dispatcher.schedule(self)
+
+    def clear(self) -> None:
+        self._queue.clear()
+        self._latest.clear()
+
+    async def process(self) -> None:
+        if self.policy == "coalesce":
+            items = list(self._latest.items())
+            self._latest.clear()
+        else:
+            items = list(self._queue)
+            self._queue.clear()
+            self._overflowing = False
+
+        # Consecutive messages on the same topic form one batch.
+        index = 0
+        while index < len(items):
+            topic = items[index][0]
+            end = index
+            while end < len(items) and items[end][0] == topic:
+                end += 1
+            # One failing topic must not drop the batches drained after it.
+            try:
+                await self._handler(topic, [payload for _, payload in items[index:end]])
+            except Exception:
+                self.failed += end - index
+                logger.exception("Inbox handler failed for topic %s", topic)
+            else:
+                self.handled += end - index
+            index = end
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "policy": self.policy,
+            "size": self.size,
+            "depth": self.depth,
+            "received": self.received,
+            "handled": self.handled,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "failed": self.failed,
+            "overflow": self.overflow,
+        }
+
+
+class InboxDispatcher:
+    """Fixed pool of worker tasks draining whichever inboxes have messages."""
+
+    def __init__(self, workers: int):
+        self.workers = max(int(workers), 1)
+        self._ready: asyncio.Queue[MessageInbox] | None = None
+        self._tasks: list[asyncio.Task[None]] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def schedule(self, inbox: MessageInbox) -> None:
+        self._ensure_workers()
+        assert self._ready is not None
+        self._ready.put_nowait(inbox)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "ready": self._ready.qsize() if self._ready is not None else 0,
+        }
+
+    def _ensure_workers(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._ready is not None:
+            return
+        self._loop = loop
+        self._ready = asyncio.Queue()
+        self._tasks = [loop.create_task(self._work(self._ready)) for _ in range(self.workers)]
+
+    async def _work(self, ready: asyncio.Queue[MessageInbox]) -> None:
+        while True:
+            inbox = await ready.get()
+            try:
+                await inbox.process()
+            except Exception:
+                logger.exception("Inbox handler failed")
+            if inbox.depth:
+                ready.put_nowait(inbox)
+            else:
+                inbox.scheduled = False
+
+
+inbox_dispatcher = InboxDispatcher(settings.inbox_workers)
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+try:
+    from pymodbus.client import AsyncModbusSerialClient
+except Exception:  # pragma: no cover
+    AsyncModbusSerialClient = None
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_WRITE = 0
+PRIORITY_READ = 1
+
+# Modbus over serial line spec: above 19200 baud use fixed 1.75 ms for t3.5.
+FIXED_GAP_BAUDRATE = 19200
+FIXED_FRAME_GAP = 0.00175
+
+
+def frame_gap(baudrate: int, bytesize: int = 8, parity: str = "N", stopbits: int = 1) -> float:
+    """Silent interval (t3.5) required between two RTU frames, in seconds."""
+    if baudrate > FIXED_GAP_BAUDRATE:
+        return FIXED_FRAME_GAP
+    bits_per_char = 1 + bytesize + (0 if str(parity).upper() == "N" else 1) + stopbits
+    return 3.5 * bits_per_char / max(baudrate, 1)
+
+
+def line_settings(params: dict[str, Any]) -> tuple[int, int, str, int]:
+    """(baudrate, bytesize, parity, stopbits): what every device sharing a port must agree on."""
+    return (
+        int(params.get("baudrate", 9600)),
+        int(params.get("bytesize", 8)),
+        str(params.get("parity", "N")).upper(),
+        int(params.get("stopbits", 1)),
+    )
+
+
+@dataclass
+class _Request:
+    lease: ModbusBusLease
+    method: str
+    kwargs: dict[str, Any]
+    future: asyncio.Future[Any]
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class ModbusBusLease:
+    """One device's handle on a shared RTU bus."""
+
+    def __init__(self, bus: ModbusSerialBus):
+        self._bus = bus
+        self.released = False
+        # Virtual finish time for fair queuing between devices.
+        self.finish_tag = 0.0
+
+    @property
+    def port(self) -> str:
+        return self._bus.port
+
+    async def call(self, method: str, *, priority: int = PRIORITY_READ, **kwargs: Any) -> Any:
+        if self.released:
+            raise ConnectionError(f"Modbus RTU bus {self._bus.port} lease released")
+        return await self._bus.submit(self, method, kwargs, priority)
+
+
+class ModbusSerialBus:
+    """Own one serial port and run every device's request through one queue.
+
+    Requests are ordered by priority (writes before reads), then round-robin
+    between devices using per-lease virtual finish tags, so a chatty device
+    cannot starve the others. The worker keeps the t3.5 silent interval
+    between frames and accounts bus busy time for utilisation stats.
+    """
+
+    def __init__(self, port: str, params: dict[str, Any]):
+        self.port = port
+        self.params = params
+        self.settings = line_settings(params)
+        self.baudrate, bytesize, parity, stopbits = self.settings
+        self.gap = frame_gap(self.baudrate, bytesize=bytesize, parity=parity, stopbits=stopbits)
+        self.users = 0
+        self.client: Any = None
+        # Devices start concurrently; only one of them may open the port.
+        self._open_lock = asyncio.Lock()
+        self._heap: list[tuple[int, float, int, _Request]] = []
+        self._sequence = itertools.count()
+        self._virtual_time = 0.0
+        self._wakeup = asyncio.Event()
+        self._worker: asyncio.Task[None] | None = None
+        self._last_frame_end = 0.0
+        self._opened_at = time.monotonic()
+        self._busy_seconds = 0.0
+        self._wait_seconds = 0.0
+        self._requests = 0
+        self._errors = 0
+        self._max_queue = 0
+
+    async def open(self) -> bool:
+        async with self._open_lock:
+            if self.client is None:
+                if AsyncModbusSerialClient is None:
+                    return False
+                _, bytesize, parity, stopbits = self.settings
+                self.client = AsyncModbusSerialClient(
+                    port=self.port,
+                    baudrate=self.baudrate,
+                    parity=parity,
+                    stopbits=stopbits,
+                    bytesize=bytesize,
+                    timeout=float(self.params.get("timeout", 1.0)),
+                )
+            if not self.client.connected and not await self.client.connect():
+                return False
+            if self._worker is None or self._worker.done():
+                self._worker = asyncio.create_task(self._run())
+            return True
+
+    def close(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        while self._heap:
+            _, _, _, request = heapq.heappop(self._heap)
+            if not request.future.done():
+                request.future.set_exception(ConnectionError(f"Modbus RTU bus {self.port} closed"))
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+
+    async def submit(self, lease: ModbusBusLease, method: str, kwargs: dict[str, Any], priority: int) -> Any:
+        start = max(self._virtual_time, lease.finish_tag)
+        lease.finish_tag = start + 1.0
+        request = _Request(lease=lease, method=method, kwargs=kwargs, future=asyncio.get_running_loop().create_future())
+        heapq.heappush(self._heap, (priority, start, next(self._sequence), request))
+        self._max_queue = max(self._max_queue, len(self._heap))
+        self._wakeup.set()
+        return await request.future
+
+    def stats(self) -> dict[str, Any]:
+        uptime = max(time.monotonic() - self._opened_at, 1e-9)
+        return {
+            "port": self.port,
+            "baudrate": self.baudrate,
+            "frame_gap_ms": round(self.gap * 1000, 3),
+            "devices": self.users,
+            "queued": len(self._heap),
+            "max_queued": self._max_queue,
+            "requests": self._requests,
+            "errors": self._errors,
+            "busy_seconds": round(self._busy_seconds, 3),
+            "utilisation": round(min(self._busy_seconds / uptime, 1.0), 4),
+            "avg_wait_ms": round(self._wait_seconds / self._requests * 1000, 3) if self._requests else 0.0,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            if not self._heap:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            _, start, _, request = heapq.heappop(self._heap)
+            self._virtual_time = start
+            if request.future.done():
+                continue
+
+            silence = self._last_frame_end + self.gap - time.monotonic()
+            if silence > 0:
+                await asyncio.sleep(silence)
+
+            begin = time.monotonic()
+            self._wait_seconds += begin - request.enqueued_at
+            self._requests += 1
+            try:
+                if not self.client.connected and not await self.client.connect():
+                    raise ConnectionError(f"Modbus RTU bus {self.port} is not connected")
+                result = await getattr(self.client, request.method)(**request.kwargs)
+            except asyncio.CancelledError:
+                if not request.future.done():
+                    request.future.set_exception(ConnectionError(f"Modbus RTU bus {self.port} closed"))
+                raise
+            except Exception as exc:
+                self._errors += 1
+                if not request.future.done():
+                    request.future.set_exception(exc)
+            else:
+                if not request.future.done():
+                    request.future.set_result(result)
+            finally:
+                self._last_frame_end = time.monotonic()
+                self._busy_seconds += self._last_frame_end - begin
+
+
+class ModbusBusRegistry:
+    """Hand out leases on one `ModbusSerialBus` per serial port name."""
+
+    def __init__(self) -> None:
+        self._buses: dict[str, ModbusSerialBus] = {}
+
+    async def acquire(self, port: str, params: dict[str, Any]) -> ModbusBusLease | None:
+        bus = self._buses.get(port)
+        if bus is None:
+            bus = ModbusSerialBus(port, params)
+            self._buses[port] = bus
+        elif line_settings(params) != bus.settings:
+            logger.warning(
+                "Modbus RTU %s: device settings %s differ from the open bus %s",
+                port,
+                line_settings(params),
+                bus.settings,
+            )
+            raise ConnectionError(
+                f"Modbus RTU bus {port} is open with baudrate/bytesize/parity/stopbits {bus.settings}"
+            )
+
+        bus.users += 1
+        try:
+            opened = await bus.open()
+        except BaseException:
+            self._leave(bus)
+            raise
+        if not opened:
+            self._leave(bus)
+            return None
+        return ModbusBusLease(bus)
+
+    async def release(self, lease: ModbusBusLease) -> None:
+        if lease.released:
+            return
+        lease.released = True
+        self._leave(lease._bus)
+
+    def stats(self) -> dict[str, Any]:
+        return {"buses": [bus.stats() for bus in self._buses.values()]}
+
+    def _leave(self, bus: ModbusSerialBus) -> None:
+        bus.users -= 1
+        if bus.users > 0:
+            return
+        if self._buses.get(bus.port) is bus:
+            del self._buses[bus.port]
+        bus.close()
+
+
+modbus_rtu_buses = ModbusBusRegistry()
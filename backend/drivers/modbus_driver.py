@@ -4,6 +4,8 @@ import random
 from typing import Any
 
 from backend.drivers.base import DeviceDriver
+from backend.drivers.modbus_bus import PRIORITY_READ, PRIORITY_WRITE, ModbusBusLease, modbus_rtu_buses
+from backend.drivers.modbus_pool import PooledModbusClient, modbus_tcp_pool
 from config.settings import settings
 
 try:
@@ -24,12 +26,11 @@ class ModbusDriver(DeviceDriver):
         port_name = self.connection_params.get("port")
 
         if host and AsyncModbusTcpClient is not None:
-            client = AsyncModbusTcpClient(
-                host=host,
-                port=int(self.connection_params.get("port", 502)),
-            )
-            self._connected = await client.connect()
-            self.client = client if self._connected else None
+            if isinstance(self.client, PooledModbusClient):
+                await modbus_tcp_pool.release(self.client)
+            lease = await modbus_tcp_pool.acquire(host, int(self.connection_params.get("port", 502)))
+            self._connected = lease is not None
+            self.client = lease
             if self._connected:
                 return True
             if settings.simulate_on_connect_fail:
@@ -39,16 +40,13 @@ class ModbusDriver(DeviceDriver):
             return False
 
         if not host and port_name and AsyncModbusSerialClient is not None:
-            client = AsyncModbusSerialClient(
-                port=port_name,
-                baudrate=int(self.connection_params.get("baudrate", 9600)),
-                parity=str(self.connection_params.get("parity", "N")),
-                stopbits=int(self.connection_params.get("stopbits", 1)),
-                bytesize=int(self.connection_params.get("bytesize", 8)),
-                timeout=float(self.connection_params.get("timeout", 1.0)),
-            )
-            self._connected = await client.connect()
-            self.client = client if self._connected else None
+            if isinstance(self.client, ModbusBusLease):
+                await modbus_rtu_buses.release(self.client)
+                self.client = None
+                self._connected = False
+            lease = await modbus_rtu_buses.acquire(str(port_name), self.connection_params)
+            self._connected = lease is not None
+            self.client = lease
             if self._connected:
                 return True
             if settings.simulate_on_connect_fail:
@@ -62,7 +60,11 @@ class ModbusDriver(DeviceDriver):
         return True
 
     async def disconnect(self) -> bool:
-        if self.client is not None:
+        if isinstance(self.client, PooledModbusClient):
+            await modbus_tcp_pool.release(self.client)
+        elif isinstance(self.client, ModbusBusLease):
+            await modbus_rtu_buses.release(self.client)
+        elif self.client is not None:
             self.client.close()
         self.client = None
         self._connected = False
@@ -71,6 +73,14 @@ class ModbusDriver(DeviceDriver):
     async def is_connected(self) -> bool:
         return self._connected
 
+    def supports_pipelining(self) -> bool:
+        # Modbus TCP matches responses by transaction id; RTU is a single half-duplex bus.
+        return bool(self.connection_params.get("host"))
+
+    def supports_read_coalescing(self) -> bool:
+        # Simulated reads fabricate values per request, so a merged block would not split back.
+        return self.client is not None
+
     async def execute_action(self, action: str, params: dict[str, Any]) -> Any:
         if self.client is None:
             return self._simulate(action, params)
@@ -80,48 +90,56 @@ class ModbusDriver(DeviceDriver):
 
         if action == "modbus.read_input_registers":
             count = int(params.get("count", 2))
-            result = await self.client.read_input_registers(address=address, count=count, slave=slave_id)
+            result = await self._call("read_input_registers", address=address, count=count, slave=slave_id)
             if result.isError():
                 raise RuntimeError(str(result))
             return {"registers": list(result.registers)}
 
         if action == "modbus.read_holding_registers":
             count = int(params.get("count", 2))
-            result = await self.client.read_holding_registers(address=address, count=count, slave=slave_id)
+            result = await self._call("read_holding_registers", address=address, count=count, slave=slave_id)
             if result.isError():
                 raise RuntimeError(str(result))
             return {"registers": list(result.registers)}
 
         if action == "modbus.read_coils":
             count = int(params.get("count", 8))
-            result = await self.client.read_coils(address=address, count=count, slave=slave_id)
+            result = await self._call("read_coils", address=address, count=count, slave=slave_id)
             if result.isError():
                 raise RuntimeError(str(result))
             return {"coils": list(result.bits)[:count]}
 
         if action == "modbus.read_discrete_inputs":
             count = int(params.get("count", 8))
-            result = await self.client.read_discrete_inputs(address=address, count=count, slave=slave_id)
+            result = await self._call("read_discrete_inputs", address=address, count=count, slave=slave_id)
             if result.isError():
                 raise RuntimeError(str(result))
             return {"coils": list(result.bits)[:count]}
 
         if action == "modbus.write_register":
             value = int(params.get("value", 0))
-            result = await self.client.write_register(address=address, value=value, slave=slave_id)
+            result = await self._call("write_register", address=address, value=value, slave=slave_id)
             if result.isError():
                 raise RuntimeError(str(result))
             return {"ok": True}
 
         if action == "modbus.write_coil":
             value = bool(params.get("value", 0))
-            result = await self.client.write_coil(address=address, value=value, slave=slave_id)
+            result = await self._call("write_coil", address=address, value=value, slave=slave_id)
             if result.isError():
                 raise RuntimeError(str(result))
             return {"ok": True}
 
         raise ValueError(f"Unsupported action for ModbusDriver: {action}")
 
+    async def _call(self, method: str, **kwargs: Any) -> Any:
+        if isinstance(self.client, ModbusBusLease):
+            priority = PRIORITY_WRITE if method.startswith("write") else PRIORITY_READ
+            return await self.client.call(method, priority=priority, **kwargs)
+        if isinstance(self.client, PooledModbusClient):
+            return await self.client.call(method, **kwargs)
+        return await getattr(self.client, method)(**kwargs)
+
     # 生成模拟数据
     def _simulate(self, action: str, params: dict[str, Any]) -> Any:
         if action.startswith("modbus.read"):
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any
+
+from config.settings import settings
+
+try:
+    from pymodbus.client import AsyncModbusTcpClient
+except Exception:  # pragma: no cover
+    AsyncModbusTcpClient = None
+
+
+@dataclass
+class _Connection:
+    client: Any
+    in_flight: int = 0
+    requests: int = 0
+
+    @property
+    def connected(self) -> bool:
+        return bool(getattr(self.client, "connected", False))
+
+
+@dataclass
+class _Endpoint:
+    host: str
+    port: int
+    users: int = 0
+    connections: list[_Connection] = field(default_factory=list)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    connect_failures: int = 0
+    dropped: int = 0
+
+    @property
+    def key(self) -> tuple[str, int]:
+        return self.host, self.port
+
+
+class PooledModbusClient:
+    """A device's lease on the shared connections of one Modbus TCP endpoint."""
+
+    def __init__(self, pool: ModbusTcpPool, endpoint: _Endpoint):
+        self._pool = pool
+        self._endpoint = endpoint
+        self.released = False
+
+    @property
+    def endpoint(self) -> tuple[str, int]:
+        return self._endpoint.key
+
+    async def call(self, method: str, **kwargs: Any) -> Any:
+        if self.released:
+            raise ConnectionError(f"Modbus TCP {self._endpoint.host}:{self._endpoint.port} lease released")
+        connection = await self._pool._checkout(self._endpoint)
+        connection.in_flight += 1
+        connection.requests += 1
+        try:
+            return await getattr(connection.client, method)(**kwargs)
+        except Exception:
+            if not connection.connected:
+                self._pool._discard(self._endpoint, connection)
+            raise
+        finally:
+            connection.in_flight -= 1
+
+
+class ModbusTcpPool:
+    """Share Modbus TCP sockets between devices behind the same gateway.
+
+    Every (host, port) gets at most ``max_connections`` sockets. Requests go to
+    the least busy socket and a new one is only opened while all existing ones
+    have a request in flight. The endpoint is reference-counted by its leases
+    and its sockets are closed when the last device releases it.
+    """
+
+    def __init__(self, max_connections: int):
+        self.max_connections = max(int(max_connections), 1)
+        self._endpoints: dict[tuple[str, int], _Endpoint] = {}
+
+    async def acquire(self, host: str, port: int) -> PooledModbusClient | None:
+        key = (str(host), int(port))
+        endpoint = self._endpoints.get(key)
+        if endpoint is None:
+            endpoint = _Endpoint(host=key[0], port=key[1])
+            self._endpoints[key] = endpoint
+
+        endpoint.users += 1
+        try:
+            async with endpoint.lock:
+                self._prune(endpoint)
+                ready = bool(endpoint.connections)
+                if not ready and len(endpoint.connections) < self.max_connections:
+                    ready = await self._open(endpoint) is not None
+        except BaseException:
+            self._leave(endpoint)
+            raise
+
+        if not ready:
+            self._leave(endpoint)
+            return None
+        return PooledModbusClient(self, endpoint)
+
+    async def release(self, lease: PooledModbusClient) -> None:
+        if lease.released:
+            return
+        lease.released = True
+        self._leave(lease._endpoint)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_connections": self.max_connections,
+            "endpoints": [
+                {
+                    "endpoint": f"{endpoint.host}:{endpoint.port}",
+                    "users": endpoint.users,
+                    "connections": len(endpoint.connections),
+                    "connected": sum(1 for connection in endpoint.connections if connection.connected),
+                    "in_flight": sum(connection.in_flight for connection in endpoint.connections),
+                    "requests": sum(connection.requests for connection in endpoint.connections),
+                    "connect_failures": endpoint.connect_failures,
+                    "dropped": endpoint.dropped,
+                }
+                for endpoint in self._endpoints.values()
+            ],
+        }
+
+    async def _checkout(self, endpoint: _Endpoint) -> _Connection:
+        best = self._least_busy(endpoint)
+        if best is not None and (best.in_flight == 0 or len(endpoint.connections) >= self.max_connections):
+            return best
+
+        async with endpoint.lock:
+            self._prune(endpoint)
+            best = self._least_busy(endpoint)
+            if best is not None and best.in_flight == 0:
+                return best
+            if len(endpoint.connections) < self.max_connections:
+                opened = await self._open(endpoint)
+                if opened is not None:
+                    return opened
+        if best is None:
+            raise ConnectionError(f"Modbus TCP {endpoint.host}:{endpoint.port} is not connected")
+        return best
+
+    async def _open(self, endpoint: _Endpoint) -> _Connection | None:
+        if AsyncModbusTcpClient is None:
+            return None
+        client = AsyncModbusTcpClient(host=endpoint.host, port=endpoint.port)
+        if not await client.connect():
+            client.close()
+            endpoint.connect_failures += 1
+            return None
+        connection = _Connection(client=client)
+        endpoint.connections.append(connection)
+        return connection
+
+    def _least_busy(self, endpoint: _Endpoint) -> _Connection | None:
+        live = [connection for connection in endpoint.connections if connection.connected]
+        return min(live, key=lambda connection: connection.in_flight, default=None)
+
+    def _prune(self, endpoint: _Endpoint) -> None:
+        # Sockets the gateway closed never come back; drop them so they do not count against the cap.
+        for connection in [connection for connection in endpoint.connections if not connection.connected]:
+            self._discard(endpoint, connection)
+
+    def _discard(self, endpoint: _Endpoint, connection: _Connection) -> None:
+        if connection in endpoint.connections:
+            endpoint.connections.remove(connection)
+            endpoint.dropped += 1
+            connection.client.close()
+
+    def _leave(self, endpoint: _Endpoint) -> None:
+        endpoint.users -= 1
+        if endpoint.users > 0:
+            return
+        if self._endpoints.get(endpoint.key) is endpoint:
+            del self._endpoints[endpoint.key]
+        for connection in endpoint.connections:
+            connection.client.close()
+        endpoint.connections.clear()
+
+
+modbus_tcp_pool = ModbusTcpPool(settings.modbus_tcp_max_connections)
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from typing import TYPE_CHECKING, Any, Generic, Hashable, Iterable, TypeVar
+
+try:
+    from gmqtt import Client as MQTTClient
+except Exception:  # pragma: no cover
+    MQTTClient = None
+
+if TYPE_CHECKING:  # pragma: no cover
+    from backend.drivers.mqtt_driver import MqttDriver
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T", bound=Hashable)
+
+
+class _TrieNode(Generic[T]):
+    __slots__ = ("children", "values")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _TrieNode[T]] = {}
+        self.values: set[T] = set()
+
+
+class TopicTrie(Generic[T]):
+    """Topic filters by level; `match` walks the topic once instead of testing every filter."""
+
+    def __init__(self) -> None:
+        self._root: _TrieNode[T] = _TrieNode()
+
+    def add(self, topic_filter: str, value: T) -> None:
+        node = self._root
+        for level in topic_filter.split("/"):
+            node = node.children.setdefault(level, _TrieNode())
+        node.values.add(value)
+
+    def remove(self, topic_filter: str, value: T) -> None:
+        path = [self._root]
+        levels = topic_filter.split("/")
+        for level in levels:
+            child = path[-1].children.get(level)
+            if child is None:
+                return
+            path.append(child)
+        path[-1].values.discard(value)
+        # Prune branches that no longer lead to a filter.
+        for index in range(len(levels), 0, -1):
+            node = path[index]
+            if node.values or node.children:
+                break
+            del path[index - 1].children[levels[index - 1]]
+
+    def match(self, topic: str) -> set[T]:
+        matched: set[T] = set()
+        nodes = [self._root]
+        # Topics starting with "$" are not matched by a leading wildcard (MQTT 4.7.2).
+        wildcards = not topic.startswith("$")
+        for level in topic.split("/"):
+            next_nodes: list[_TrieNode[T]] = []
+            for node in nodes:
+                if wildcards:
+                    multi = node.children.get("#")
+                    if multi is not None:
+                        matched |= multi.values
+                    single = node.children.get("+")
+                    if single is not None:
+                        next_nodes.append(single)
+                exact = node.children.get(level)
+                if exact is not None:
+                    next_nodes.append(exact)
+            if not next_nodes:
+                return matched
+            nodes = next_nodes
+            wildcards = True
+        for node in nodes:
+            matched |= node.values
+            # "a/#" also matches "a" itself.
+            multi = node.children.get("#")
+            if multi is not None:
+                matched |= multi.values
+        return matched
+
+    def __bool__(self) -> bool:
+        return bool(self._root.children)
+
+
+class SharedMqttClient:
+    """One broker connection whose subscriptions are shared by every device on it."""
+
+    def __init__(self, host: str, port: int, username: str | None, password: str | None):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.users = 0
+        self.client: Any = None
+        self._routes: TopicTrie[MqttDriver] = TopicTrie()
+        # filter -> {driver: qos}
+        self._filters: dict[str, dict[MqttDriver, int]] = {}
+        self._connect_lock = asyncio.Lock()
+        self.routed = 0
+        self.unrouted = 0
+
+    @property
+    def connected(self) -> bool:
+        return self.client is not None and bool(getattr(self.client, "is_connected", False))
+
+    async def open(self) -> None:
+        async with self._connect_lock:
+            if self.client is not None:
+                return
+            client = MQTTClient(f"quantix-{uuid.uuid4().hex[:8]}")
+            if self.username:
+                client.set_auth_credentials(self.username, self.password)
+            client.on_message = self._on_message
+            await client.connect(self.host, port=self.port, keepalive=30)
+            self.client = client
+
+    async def close(self) -> None:
+        client = self.client
+        self.client = None
+        self._routes = TopicTrie()
+        self._filters.clear()
+        if client is not None:
+            await client.disconnect()
+
+    def subscribe(self, driver: MqttDriver, topic_filter: str, qos: int) -> None:
+        holders = self._filters.setdefault(topic_filter, {})
+        current = max(holders.values(), default=-1)
+        holders[driver] = max(holders.get(driver, 0), qos)
+        self._routes.add(topic_filter, driver)
+        if qos > current and self.client is not None:
+            self.client.subscribe(topic_filter, qos=qos)
+
+    def unsubscribe_all(self, driver: MqttDriver) -> None:
+        self.unsubscribe(driver, list(self._filters))
+
+    def unsubscribe(self, driver: MqttDriver, topic_filters: Iterable[str]) -> None:
+        emptied: list[str] = []
+        for topic_filter in topic_filters:
+            holders = self._filters.get(topic_filter)
+            if holders is None or holders.pop(driver, None) is None:
+                continue
+            self._routes.remove(topic_filter, driver)
+            if not holders:
+                del self._filters[topic_filter]
+                emptied.append(topic_filter)
+        if emptied and self.client is not None:
+            self.client.unsubscribe(emptied)
+
+    def publish(self, topic: str, payload: Any, qos: int) -> None:
+        if self.client is not None:
+            self.client.publish(topic, payload, qos=qos)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "broker": f"{self.host}:{self.port}",
+            "username": self.username,
+            "connected": self.connected,
+            "devices": self.users,
+            "filters": len(self._filters),
+            "routed": self.routed,
+            "unrouted": self.unrouted,
+        }
+
+    def _on_message(self, client, topic, payload, qos, properties) -> None:
+        _ = (client, qos, properties)
+        drivers = self._routes.match(topic)
+        if not drivers:
+            self.unrouted += 1
+            return
+        self.routed += 1
+        raw_payload = payload if isinstance(payload, bytes) else str(payload).encode("utf-8")
+        for driver in drivers:
+            driver.deliver(topic, raw_payload)
+
+
+class MqttClientRegistry:
+    """Hand out the shared client for a (host, port, username, password) to each MQTT device."""
+
+    def __init__(self) -> None:
+        self._clients: dict[tuple[str, int, str | None, str | None], SharedMqttClient] = {}
+
+    async def acquire(self, host: str, port: int, username: str | None, password: str | None) -> SharedMqttClient:
+        key = (host, port, username or None, password or None)
+        shared = self._clients.get(key)
+        if shared is None:
+            shared = SharedMqttClient(*key)
+            self._clients[key] = shared
+
+        shared.users += 1
+        try:
+            await shared.open()
+        except BaseException:
+            await self._leave(key, shared)
+            raise
+        return shared
+
+    async def release(self, shared: SharedMqttClient, driver: MqttDriver) -> None:
+        shared.unsubscribe_all(driver)
+        await self._leave((shared.host, shared.port, shared.username, shared.password), shared)
+
+    def stats(self) -> dict[str, Any]:
+        return {"clients": [shared.stats() for shared in self._clients.values()]}
+
+    async def _leave(self, key: tuple[str, int, str | None, str | None], shared: SharedMqttClient) -> None:
+        shared.users -= 1
+        if shared.users > 0:
+            return
+        if self._clients.get(key) is shared:
+            del self._clients[key]
+        try:
+            await shared.close()
+        except Exception as exc:
+            logger.warning("MQTT disconnect from %s:%s failed: %s", shared.host, shared.port, exc)
+
+
+mqtt_clients = MqttClientRegistry()
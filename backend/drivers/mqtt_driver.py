@@ -1,72 +1,102 @@
 from __future__ import annotations
 
-import asyncio
-import uuid
 from typing import Any
 
-from backend.drivers.base import DeviceDriver, MessageHandler
-
-try:
-    from gmqtt import Client as MQTTClient
-except Exception:  # pragma: no cover
-    MQTTClient = None
+from backend.drivers.base import BatchMessageHandler, DeviceDriver, MessageHandler
+from backend.drivers.message_inbox import MessageInbox
+from backend.drivers.mqtt_broker import MQTTClient, SharedMqttClient, mqtt_clients
 
 
 class MqttDriver(DeviceDriver):
+    """MQTT device; the broker connection is shared with every device using the same credentials."""
+
     def __init__(self, connection_params: dict[str, Any]):
         super().__init__(connection_params)
-        self._client = None
+        self._shared: SharedMqttClient | None = None
         self._connected = False
         self._handler: MessageHandler | None = None
+        self._batch_handler: BatchMessageHandler | None = None
+        self._last_error: str | None = None
+        # Filters subscribed by the current setup, and those left over from the previous one.
+        self._topics: set[str] = set()
+        self._stale_topics: set[str] = set()
+        try:
+            self.inbox = MessageInbox.from_params(self._handle_batch, connection_params)
+        except ValueError as exc:
+            self._last_error = str(exc)
+            self.inbox = MessageInbox(self._handle_batch)
 
     def register_message_handler(self, handler: MessageHandler) -> None:
         self._handler = handler
 
+    def register_batch_handler(self, handler: BatchMessageHandler) -> None:
+        self._batch_handler = handler
+
     async def connect(self) -> bool:
+        if self._last_error:
+            return False
         if MQTTClient is None:
             self._connected = True
             return True
 
-        host = self.connection_params.get("host", "127.0.0.1")
-        port = int(self.connection_params.get("port", 1883))
-
-        client_id = f"quantix-{uuid.uuid4().hex[:8]}"
-        self._client = MQTTClient(client_id)
-
-        username = self.connection_params.get("username")
-        password = self.connection_params.get("password")
-        if username:
-            self._client.set_auth_credentials(username, password)
-
-        self._client.on_message = self._on_message
-        await self._client.connect(host, port=port, keepalive=30)
+        if self._shared is None:
+            self._shared = await mqtt_clients.acquire(
+                str(self.connection_params.get("host", "127.0.0.1")),
+                int(self.connection_params.get("port", 1883)),
+                self.connection_params.get("username"),
+                self.connection_params.get("password"),
+            )
         self._connected = True
         return True
 
     async def disconnect(self) -> bool:
-        if self._client is not None:
-            await self._client.disconnect()
+        shared = self._shared
+        self._shared = None
         self._connected = False
-        self._client = None
+        self._topics.clear()
+        self._stale_topics.clear()
+        self.inbox.clear()
+        if shared is not None:
+            await mqtt_clients.release(shared, self)
         return True
 
     async def is_connected(self) -> bool:
         return self._connected
 
+    def get_last_error(self) -> str | None:
+        return self._last_error
+
+    def is_push_driven(self) -> bool:
+        return True
+
+    def supports_pipelining(self) -> bool:
+        return True
+
+    def begin_setup(self) -> None:
+        self._stale_topics |= self._topics
+        self._topics = set()
+
+    def finish_setup(self) -> None:
+        stale = self._stale_topics - self._topics
+        self._stale_topics = set()
+        if stale and self._shared is not None:
+            self._shared.unsubscribe(self, stale)
+
     async def execute_action(self, action: str, params: dict[str, Any]) -> Any:
         if action == "mqtt.subscribe":
             topic = str(params.get("topic", ""))
             qos = int(params.get("qos", 0))
-            if self._client is not None:
-                self._client.subscribe(topic, qos=qos)
+            if self._shared is not None:
+                self._shared.subscribe(self, topic, qos)
+            self._topics.add(topic)
             return {"topic": topic, "qos": qos}
 
         if action == "mqtt.publish":
             topic = str(params.get("topic", ""))
             payload = params.get("payload", "")
             qos = int(params.get("qos", 0))
-            if self._client is not None:
-                self._client.publish(topic, payload, qos=qos)
+            if self._shared is not None:
+                self._shared.publish(topic, payload, qos)
             return {"topic": topic, "published": True}
 
         if action == "mqtt.on_message":
@@ -74,10 +104,16 @@ class MqttDriver(DeviceDriver):
 
         raise ValueError(f"Unsupported action for MqttDriver: {action}")
 
-    def _on_message(self, client, topic, payload, qos, properties) -> None:
-        _ = (client, qos, properties)
-        if self._handler is None:
+    def deliver(self, topic: str, payload: bytes) -> None:
+        """Called by the shared client for each message matching one of this device's filters."""
+        if self._handler is None and self._batch_handler is None:
             return
+        self.inbox.put(topic, payload)
 
-        raw_payload = payload if isinstance(payload, bytes) else str(payload).encode("utf-8")
-        asyncio.create_task(self._handler(topic, raw_payload))
+    async def _handle_batch(self, topic: str, payloads: list[bytes]) -> None:
+        if self._batch_handler is not None:
+            await self._batch_handler(topic, payloads)
+            return
+        if self._handler is not None:
+            for payload in payloads:
+                await self._handler(topic, payload)
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import Any
 
 from backend.drivers.base import DeviceDriver
+from backend.drivers.frame_stream import FrameStream, run_reader
+from backend.drivers.framing import FrameSpec, to_bytes
+from backend.drivers.serial_transport import AsyncSerialPort
 
 try:
     import serial
@@ -12,13 +16,17 @@ except Exception:  # pragma: no cover
 
 logger = logging.getLogger(__name__)
 
+STREAM_CHUNK_BYTES = 4096
+
 
 class SerialDriver(DeviceDriver):
     def __init__(self, connection_params: dict[str, Any]):
         super().__init__(connection_params)
-        self._ser = None
+        self._port: AsyncSerialPort | None = None
         self._connected = False
         self._last_error: str | None = None
+        self._stream: FrameStream | None = None
+        self._stream_task: asyncio.Task[None] | None = None
 
     async def connect(self) -> bool:
         if serial is None:
@@ -26,8 +34,9 @@ class SerialDriver(DeviceDriver):
             self._last_error = None
             return True
 
+        self._close_port()
         try:
-            self._ser = serial.Serial(
+            self._port = await AsyncSerialPort.open(
                 port=self.connection_params.get("port", "/dev/ttyUSB0"),
                 baudrate=int(self.connection_params.get("baudrate", 9600)),
                 bytesize=int(self.connection_params.get("bytesize", 8)),
@@ -37,6 +46,8 @@ class SerialDriver(DeviceDriver):
             )
             self._connected = True
             self._last_error = None
+            if self._stream is not None:
+                self._start_stream_reader()
         except Exception as exc:
             self._connected = False
             self._last_error = str(exc)
@@ -49,9 +60,7 @@ class SerialDriver(DeviceDriver):
         return self._connected
 
     async def disconnect(self) -> bool:
-        if self._ser is not None:
-            self._ser.close()
-        self._ser = None
+        self._close_port()
         self._connected = False
         return True
 
@@ -63,30 +72,72 @@ class SerialDriver(DeviceDriver):
 
     async def execute_action(self, action: str, params: dict[str, Any]) -> Any:
         if action == "serial.send":
-            data = _to_bytes(params.get("data", ""), params.get("encoding", "ascii"))
-            if self._ser is not None:
-                self._ser.write(data)
+            data = to_bytes(params.get("data", ""), params.get("encoding", "ascii"))
+            if self._port is not None:
+                await self._port.write(data)
             return {"bytes_sent": len(data)}
 
+        if action in {"serial.receive", "serial.transact"} and self._stream_task is not None:
+            raise ValueError(f"{action} is not available while serial.stream_start is active")
+
         if action == "serial.receive":
             size = int(params.get("size", 0))
             timeout = float(params.get("timeout", 1000)) / 1000
-            if self._ser is None:
+            if self._port is None:
                 return {"payload": b"WS 12.34"}
-            old_timeout = self._ser.timeout
-            self._ser.timeout = timeout
-            payload = self._ser.read(size)
-            self._ser.timeout = old_timeout
+            payload = await self._port.read(size, timeout)
             return {"payload": payload}
 
+        if action == "serial.transact":
+            data = to_bytes(params.get("data", ""), params.get("encoding", "ascii"))
+            spec = FrameSpec.from_params(params)
+            timeout = float(params.get("timeout", 1000)) / 1000
+            inter_byte_timeout = float(params.get("inter_byte_timeout", 0)) / 1000
+            if self._port is None:
+                return {"payload": b"WS 12.34", "bytes_sent": len(data)}
+            if params.get("flush_input", True):
+                self._port.reset_input()
+            await self._port.write(data)
+            payload = await self._port.read_frame(spec, timeout, inter_byte_timeout)
+            return {"payload": payload, "bytes_sent": len(data)}
+
+        if action == "serial.stream_start":
+            self._stream = FrameStream.from_params(params)
+            if self._port is not None:
+                self._start_stream_reader()
+            return {"streaming": self._port is not None, "buffer_size": self._stream.capacity}
+
+        if action == "serial.stream_read":
+            if self._stream is None:
+                raise ValueError("serial.stream_read requires a serial.stream_start setup step")
+            if self._port is None:
+                return {"payload": b"WS 12.34", "frames": [], "new_frames": 0, "received": 0, "dropped": 0}
+            max_age = params.get("max_age")
+            return await self._stream.read(
+                str(params.get("mode", "latest")),
+                float(params.get("timeout", 1000)) / 1000,
+                float(max_age) / 1000 if max_age is not None else None,
+            )
+
         raise ValueError(f"Unsupported action for SerialDriver: {action}")
 
+    def _start_stream_reader(self) -> None:
+        if self._stream_task is not None:
+            self._stream_task.cancel()
+        port = self._port
+        self._stream_task = asyncio.create_task(
+            run_reader(self._stream, lambda: port.read_some(STREAM_CHUNK_BYTES, 1.0), self._on_stream_closed)
+        )
 
-def _to_bytes(data: Any, encoding: str) -> bytes:
-    if isinstance(data, bytes):
-        return data
-    text = str(data)
-    if encoding == "hex":
-        cleaned = text.replace(" ", "")
-        return bytes.fromhex(cleaned)
-    return text.encode("utf-8")
+    def _on_stream_closed(self) -> None:
+        self._stream_task = None
+        self._connected = False
+        self._last_error = self._stream.error if self._stream is not None else None
+
+    def _close_port(self) -> None:
+        if self._stream_task is not None:
+            self._stream_task.cancel()
+            self._stream_task = None
+        if self._port is not None:
+            self._port.close()
+        self._port = None
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import Any, Callable
+
+from backend.drivers.framing import FrameSpec
+
+try:
+    import serial
+except Exception:  # pragma: no cover
+    serial = None
+
+# Readiness polling step when the port has no selectable fd (Windows / Proactor loop).
+POLL_INTERVAL = 0.01
+
+
+class AsyncSerialPort:
+    """Event-loop friendly wrapper around an open pyserial port.
+
+    The port is switched to non-blocking reads (``timeout=0``). On POSIX the
+    file descriptor is watched with ``loop.add_reader``/``add_writer`` so a
+    pending read or a full output buffer never blocks the event loop;
+    elsewhere readiness is polled and writes are handed to a thread.
+    """
+
+    def __init__(self, ser: Any):
+        self.serial = ser
+        self.serial.timeout = 0
+        # Bytes read past the end of the last frame.
+        self._pending = bytearray()
+        try:
+            self._fd: int | None = ser.fileno()
+        except Exception:
+            self._fd = None
+
+    @classmethod
+    async def open(cls, **kwargs: Any) -> AsyncSerialPort:
+        if serial is None:
+            raise RuntimeError("pyserial is not installed")
+        ser = await asyncio.to_thread(serial.Serial, **kwargs)
+        return cls(ser)
+
+    @property
+    def is_open(self) -> bool:
+        return bool(getattr(self.serial, "is_open", False))
+
+    def close(self) -> None:
+        self.serial.close()
+
+    def reset_buffers(self) -> None:
+        self.reset_input()
+        self.serial.reset_output_buffer()
+
+    def reset_input(self) -> None:
+        self._pending.clear()
+        self.serial.reset_input_buffer()
+
+    async def write(self, data: bytes) -> int:
+        if self._fd is None:
+            return int(await asyncio.to_thread(self.serial.write, data) or 0)
+
+        view = memoryview(data)
+        written = 0
+        while written < len(view):
+            try:
+                written += os.write(self._fd, view[written:])
+            except BlockingIOError:
+                await self._wait_writable()
+        return written
+
+    async def drain(self) -> None:
+        await asyncio.to_thread(self.serial.flush)
+
+    async def read(self, size: int, timeout: float) -> bytes:
+        """Read until ``size`` bytes arrived or ``timeout`` seconds passed (pyserial semantics)."""
+        if size <= 0:
+            return b""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max(timeout, 0.0)
+        buffer = bytearray()
+        while len(buffer) < size:
+            chunk = self._read_nowait(size - len(buffer))
+            if chunk:
+                buffer += chunk
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0 or not await self.wait_readable(remaining):
+                break
+        return bytes(buffer)
+
+    async def read_some(self, max_bytes: int, timeout: float) -> bytes:
+        """Return whatever is buffered, waiting up to ``timeout`` seconds for the first byte."""
+        payload = self._read_nowait(max_bytes)
+        if payload or timeout <= 0:
+            return payload
+        if await self.wait_readable(timeout):
+            return self._read_nowait(max_bytes)
+        return b""
+
+    async def read_frame(self, spec: FrameSpec, timeout: float, inter_byte_timeout: float = 0.0) -> bytes:
+        """Read one frame; bytes after its end are kept for the next read.
+
+        Without a terminator/length in ``spec`` the frame ends when the line
+        stays idle for ``inter_byte_timeout``, at ``max_bytes`` or at ``timeout``.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max(timeout, 0.0)
+        buffer = self._pending
+        self._pending = bytearray()
+        while True:
+            end = spec.frame_end(buffer)
+            if end is not None:
+                self._pending = buffer[end:]
+                return bytes(buffer[:end])
+
+            chunk = self.serial.read(spec.max_bytes)
+            if chunk:
+                buffer += chunk
+                continue
+
+            wait = deadline - loop.time()
+            if buffer and inter_byte_timeout > 0:
+                wait = min(wait, inter_byte_timeout)
+            if wait > 0 and await self.wait_readable(wait):
+                continue
+            if buffer and not spec.delimited:
+                return bytes(buffer)
+            raise TimeoutError(f"incomplete frame after {timeout * 1000:.0f} ms ({len(buffer)} bytes received)")
+
+    async def wait_readable(self, timeout: float) -> bool:
+        if self._pending:
+            return True
+        if self._fd is not None:
+            loop = asyncio.get_running_loop()
+            try:
+                return await self._wait_fd(loop.add_reader, loop.remove_reader, timeout)
+            except NotImplementedError:
+                self._fd = None
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while not int(getattr(self.serial, "in_waiting", 0) or 0):
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            await asyncio.sleep(min(POLL_INTERVAL, remaining))
+        return True
+
+    def _read_nowait(self, size: int) -> bytes:
+        if not self._pending:
+            return self.serial.read(size)
+        chunk = bytes(self._pending[:size])
+        del self._pending[:size]
+        return chunk
+
+    async def _wait_writable(self) -> None:
+        loop = asyncio.get_running_loop()
+        await self._wait_fd(loop.add_writer, loop.remove_writer, None)
+
+    async def _wait_fd(
+        self,
+        register: Callable[..., Any],
+        unregister: Callable[[int], Any],
+        timeout: float | None,
+    ) -> bool:
+        future = asyncio.get_running_loop().create_future()
+        register(self._fd, _set_ready, future)
+        try:
+            await asyncio.wait_for(future, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            unregister(self._fd)
+
+
+def _set_ready(future: asyncio.Future[None]) -> None:
+    if not future.done():
+        future.set_result(None)
@@ -4,6 +4,12 @@ import asyncio
 from typing import Any
 
 from backend.drivers.base import DeviceDriver
+from backend.drivers.frame_stream import FrameStream, run_reader
+from backend.drivers.framing import FrameSpec, to_bytes
+
+# Buffered bytes are returned immediately; this only bounds the wait when there are none.
+FLUSH_POLL_SECONDS = 0.001
+STREAM_CHUNK_BYTES = 4096
 
 
 class TcpDriver(DeviceDriver):
@@ -12,6 +18,10 @@ class TcpDriver(DeviceDriver):
         self.reader = None
         self.writer = None
         self._connected = False
+        self._stream: FrameStream | None = None
+        self._stream_task: asyncio.Task[None] | None = None
+        # Bytes received after the end of the last transact frame.
+        self._pending = bytearray()
 
     async def connect(self) -> bool:
         host = self.connection_params.get("host")
@@ -20,20 +30,19 @@ class TcpDriver(DeviceDriver):
             self._connected = True
             return True
 
+        await self._close_connection()
         try:
             self.reader, self.writer = await asyncio.open_connection(host, port)
             self._connected = True
+            if self._stream is not None:
+                self._start_stream_reader()
             return True
         except Exception:
             self._connected = False
             return False
 
     async def disconnect(self) -> bool:
-        if self.writer is not None:
-            self.writer.close()
-            await self.writer.wait_closed()
-        self.reader = None
-        self.writer = None
+        await self._close_connection()
         self._connected = False
         return True
 
@@ -42,28 +51,138 @@ class TcpDriver(DeviceDriver):
 
     async def execute_action(self, action: str, params: dict[str, Any]) -> Any:
         if action == "tcp.send":
-            data = _to_bytes(params.get("data", ""), params.get("encoding", "ascii"))
+            data = to_bytes(params.get("data", ""), params.get("encoding", "ascii"))
             if self.writer is not None:
                 self.writer.write(data)
                 await self.writer.drain()
             return {"bytes_sent": len(data)}
 
+        if action in {"tcp.receive", "tcp.transact"} and self._stream_task is not None:
+            raise ValueError(f"{action} is not available while tcp.stream_start is active")
+
         if action == "tcp.receive":
             size = int(params.get("size", 0))
             timeout = float(params.get("timeout", 1000)) / 1000
             if self.reader is None:
                 return {"payload": b"0.0"}
+            if self._pending:
+                count = size if size > 0 else len(self._pending)
+                payload = bytes(self._pending[:count])
+                del self._pending[:count]
+                return {"payload": payload}
             payload = await asyncio.wait_for(self.reader.read(size), timeout=timeout)
             return {"payload": payload}
 
+        if action == "tcp.transact":
+            data = to_bytes(params.get("data", ""), params.get("encoding", "ascii"))
+            spec = FrameSpec.from_params(params)
+            timeout = float(params.get("timeout", 1000)) / 1000
+            inter_byte_timeout = float(params.get("inter_byte_timeout", 0)) / 1000
+            if self.writer is None or self.reader is None:
+                return {"payload": b"0.0", "bytes_sent": len(data)}
+            if params.get("flush_input", True):
+                await self._discard_buffered()
+            self.writer.write(data)
+            await self.writer.drain()
+            try:
+                payload = await asyncio.wait_for(self._read_frame(spec, inter_byte_timeout), timeout=timeout)
+            except asyncio.IncompleteReadError as exc:
+                self._connected = False
+                raise ConnectionError(f"connection closed mid-frame ({len(exc.partial)} bytes received)") from exc
+            return {"payload": payload, "bytes_sent": len(data)}
+
+        if action == "tcp.stream_start":
+            self._stream = FrameStream.from_params(params)
+            if self.reader is not None:
+                self._start_stream_reader()
+            return {"streaming": self.reader is not None, "buffer_size": self._stream.capacity}
+
+        if action == "tcp.stream_read":
+            if self._stream is None:
+                raise ValueError("tcp.stream_read requires a tcp.stream_start setup step")
+            if self.reader is None:
+                return {"payload": b"0.0", "frames": [], "new_frames": 0, "received": 0, "dropped": 0}
+            max_age = params.get("max_age")
+            return await self._stream.read(
+                str(params.get("mode", "latest")),
+                float(params.get("timeout", 1000)) / 1000,
+                float(max_age) / 1000 if max_age is not None else None,
+            )
+
         raise ValueError(f"Unsupported action for TcpDriver: {action}")
 
+    def _start_stream_reader(self) -> None:
+        if self._stream_task is not None:
+            self._stream_task.cancel()
+        reader = self.reader
+
+        async def read_chunk() -> bytes | None:
+            return await reader.read(STREAM_CHUNK_BYTES) or None
+
+        self._stream_task = asyncio.create_task(run_reader(self._stream, read_chunk, self._on_stream_closed))
+
+    def _on_stream_closed(self) -> None:
+        self._stream_task = None
+        self._connected = False
+
+    async def _close_connection(self) -> None:
+        if self._stream_task is not None:
+            self._stream_task.cancel()
+            self._stream_task = None
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except Exception:
+                pass
+        self.reader = None
+        self.writer = None
+        self._pending = bytearray()
+
+    async def _discard_buffered(self) -> None:
+        # Drop late replies / unsolicited bytes already received, without waiting for new ones.
+        self._pending = bytearray()
+        while True:
+            try:
+                chunk = await asyncio.wait_for(self.reader.read(65536), timeout=FLUSH_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                return
+            if not chunk:
+                return
+
+    async def _read_frame(self, spec: FrameSpec, inter_byte_timeout: float) -> bytes:
+        """Read one frame; bytes after its end are kept for the next read.
+
+        Same rules as the serial transport: once a frame has started, each gap
+        between chunks is bounded by ``inter_byte_timeout`` and ``max_bytes``
+        bounds every frame type. Without a boundary the frame ends when the
+        line goes idle (or with the first chunk when there is no idle timeout).
+        """
+        reader = self.reader
+        buffer = self._pending
+        self._pending = bytearray()
+        while True:
+            end = spec.frame_end(buffer)
+            if end is not None:
+                self._pending = buffer[end:]
+                return bytes(buffer[:end])
+            if buffer and not spec.delimited and inter_byte_timeout <= 0:
+                return bytes(buffer)
 
-def _to_bytes(data: Any, encoding: str) -> bytes:
-    if isinstance(data, bytes):
-        return data
-    text = str(data)
-    if encoding == "hex":
-        cleaned = text.replace(" ", "")
-        return bytes.fromhex(cleaned)
-    return text.encode("utf-8")
+            if buffer and inter_byte_timeout > 0:
+                try:
+                    chunk = await asyncio.wait_for(reader.read(spec.max_bytes), timeout=inter_byte_timeout)
+                except asyncio.TimeoutError:
+                    if not spec.delimited:
+                        return bytes(buffer)
+                    raise TimeoutError(
+                        f"incomplete frame: line idle for {inter_byte_timeout * 1000:.0f} ms "
+                        f"({len(buffer)} bytes received)"
+                    ) from None
+            else:
+                chunk = await reader.read(spec.max_bytes)
+            if not chunk:
+                if buffer and not spec.delimited:
+                    return bytes(buffer)
+                raise asyncio.IncompleteReadError(bytes(buffer), None)
+            buffer += chunk
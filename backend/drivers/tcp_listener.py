@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:  # pragma: no cover
+    from backend.drivers.tcp_server_driver import TcpServerDriver
+
+logger = logging.getLogger(__name__)
+
+# How long / how much an unknown peer may send before it must have identified itself.
+IDENTIFY_TIMEOUT_SECONDS = 10.0
+IDENTIFY_MAX_BYTES = 4096
+
+
+@dataclass
+class _Listener:
+    host: str
+    port: int
+    server: asyncio.AbstractServer | None = None
+    drivers: list[TcpServerDriver] = field(default_factory=list)
+    pending: set[asyncio.StreamWriter] = field(default_factory=set)
+    accepted: int = 0
+    unmatched: int = 0
+    # Rebuilt lazily after add/remove so matching a peer does not scan every device.
+    by_peer_ip: dict[str, TcpServerDriver] = field(default_factory=dict)
+    by_identifier: dict[bytes, TcpServerDriver] = field(default_factory=dict)
+    identifiers: re.Pattern[bytes] | None = None
+    stale: bool = False
+
+    @property
+    def key(self) -> tuple[str, int]:
+        return self.host, self.port
+
+    def add(self, driver: TcpServerDriver) -> None:
+        if driver not in self.drivers:
+            self.drivers.append(driver)
+            self.stale = True
+
+    def remove(self, driver: TcpServerDriver) -> None:
+        if driver in self.drivers:
+            self.drivers.remove(driver)
+            self.stale = True
+
+    def _reindex(self) -> None:
+        if not self.stale:
+            return
+        self.stale = False
+        self.by_peer_ip = {}
+        self.by_identifier = {}
+        for driver in self.drivers:
+            if driver.peer_ip:
+                self.by_peer_ip.setdefault(driver.peer_ip, driver)
+            if driver.identifier:
+                self.by_identifier.setdefault(driver.identifier, driver)
+        # Longest first, so at any position the alternation prefers "A1-B" over "A1".
+        ordered = sorted(self.by_identifier, key=len, reverse=True)
+        self.identifiers = (
+            re.compile(rb"(?<![0-9A-Za-z])(?:" + b"|".join(map(re.escape, ordered)) + rb")(?![0-9A-Za-z])")
+            if ordered
+            else None
+        )
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.accepted += 1
+        peername = writer.get_extra_info("peername") or ("", 0)
+        peer_ip = str(peername[0])
+
+        self._reindex()
+        driver = self.by_peer_ip.get(peer_ip)
+        initial = b""
+        if driver is None:
+            self.pending.add(writer)
+            try:
+                driver, initial = await asyncio.wait_for(self._identify(reader), IDENTIFY_TIMEOUT_SECONDS)
+            except (asyncio.TimeoutError, ConnectionError):
+                driver = None
+            finally:
+                self.pending.discard(writer)
+
+        if driver is None:
+            self.unmatched += 1
+            logger.info("TCP listener %s:%s: unidentified peer %s closed", self.host, self.port, peer_ip)
+            writer.close()
+            return
+        await driver.attach(reader, writer, initial)
+
+    async def _identify(self, reader: asyncio.StreamReader) -> tuple[TcpServerDriver | None, bytes]:
+        received = b""
+        while len(received) < IDENTIFY_MAX_BYTES:
+            chunk = await reader.read(IDENTIFY_MAX_BYTES - len(received))
+            if not chunk:
+                break
+            received += chunk
+            self._reindex()
+            if self.identifiers is None:
+                continue
+            found = {match.group() for match in self.identifiers.finditer(received)}
+            if not found:
+                continue
+            # "A1-B" beats "A1" when both appear; two unrelated identifiers mean the peer is ambiguous.
+            best = max(found, key=len)
+            if any(not identifier_pattern(other).search(best) for other in found):
+                logger.warning(
+                    "TCP listener %s:%s: peer matches several identifiers %s",
+                    self.host,
+                    self.port,
+                    sorted(other.decode("ascii", errors="replace") for other in found),
+                )
+                return None, received
+            return self.by_identifier[best], received
+        return None, received
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "listen": f"{self.host}:{self.port}",
+            "devices": len(self.drivers),
+            "connected_peers": sum(1 for driver in self.drivers if driver.peer is not None),
+            "identifying": len(self.pending),
+            "accepted": self.accepted,
+            "unmatched": self.unmatched,
+        }
+
+
+@lru_cache(maxsize=256)
+def identifier_pattern(identifier: bytes) -> re.Pattern[bytes]:
+    # The identifier must stand alone: "A1" does not match inside "A10" or "XA1".
+    return re.compile(rb"(?<![0-9A-Za-z])" + re.escape(identifier) + rb"(?![0-9A-Za-z])")
+
+
+class TcpListenerHub:
+    """One `asyncio.start_server` per listen address, shared by every tcp_server device on it.
+
+    Inbound peers are handed to the device whose `peer_ip` matches, or whose
+    `identifier` appears as a whole token in the first bytes the peer sends.
+    """
+
+    def __init__(self) -> None:
+        self._listeners: dict[tuple[str, int], _Listener] = {}
+        self._lock = asyncio.Lock()
+
+    async def register(self, driver: TcpServerDriver) -> None:
+        key = (driver.listen_host, driver.listen_port)
+        async with self._lock:
+            listener = self._listeners.get(key)
+            if listener is None:
+                listener = _Listener(host=key[0], port=key[1])
+                listener.server = await asyncio.start_server(listener.handle, host=key[0], port=key[1])
+                self._listeners[key] = listener
+            listener.add(driver)
+
+    async def unregister(self, driver: TcpServerDriver) -> None:
+        key = (driver.listen_host, driver.listen_port)
+        async with self._lock:
+            listener = self._listeners.get(key)
+            if listener is None or driver not in listener.drivers:
+                return
+            listener.remove(driver)
+            if listener.drivers:
+                return
+            del self._listeners[key]
+        for writer in list(listener.pending):
+            writer.close()
+        if listener.server is not None:
+            listener.server.close()
+            await listener.server.wait_closed()
+
+    def stats(self) -> dict[str, Any]:
+        return {"listeners": [listener.stats() for listener in self._listeners.values()]}
+
+
+tcp_listener_hub = TcpListenerHub()
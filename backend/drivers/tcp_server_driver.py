@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any
+
+from backend.drivers.base import DeviceDriver, MessageHandler
+from backend.drivers.frame_stream import Framer
+from backend.drivers.framing import FrameSpec, to_bytes
+from backend.drivers.tcp_listener import identifier_pattern, tcp_listener_hub
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK_BYTES = 4096
+IDENTIFY_MODES = {"frame", "handshake"}
+
+
+class TcpServerDriver(DeviceDriver):
+    """Device that dials in to a shared listener and pushes frames to `message_handler`."""
+
+    def __init__(self, connection_params: dict[str, Any]):
+        super().__init__(connection_params)
+        self.listen_host = str(connection_params.get("listen_host") or "0.0.0.0")
+        self.listen_port = int(connection_params.get("listen_port") or connection_params.get("port") or 0)
+        self.peer_ip = str(connection_params.get("peer_ip") or "").strip() or None
+        self.identifier = to_bytes(connection_params.get("identifier") or b"", "ascii")
+        self.identify_mode = str(connection_params.get("identify_mode") or "frame").lower()
+        self.handshake_reply = to_bytes(connection_params.get("handshake_reply") or b"", "ascii")
+        self.spec = FrameSpec.from_params(connection_params)
+        self.peer: str | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._reader_task: asyncio.Task[None] | None = None
+        self._handler: MessageHandler | None = None
+        self._connected = False
+        self._last_error: str | None = None
+
+    def register_message_handler(self, handler: MessageHandler) -> None:
+        self._handler = handler
+
+    def is_push_driven(self) -> bool:
+        return True
+
+    async def connect(self) -> bool:
+        if not self.listen_port:
+            self._last_error = "listen_port is required"
+            return False
+        if not self.peer_ip and not self.identifier:
+            self._last_error = "peer_ip or identifier is required to match inbound connections"
+            return False
+        if self.identify_mode not in IDENTIFY_MODES:
+            self._last_error = f"identify_mode must be one of {sorted(IDENTIFY_MODES)}"
+            return False
+        try:
+            await tcp_listener_hub.register(self)
+        except OSError as exc:
+            self._last_error = f"listen {self.listen_host}:{self.listen_port} failed: {exc}"
+            return False
+        self._connected = True
+        self._last_error = None
+        return True
+
+    async def disconnect(self) -> bool:
+        self._close_peer()
+        await tcp_listener_hub.unregister(self)
+        self._connected = False
+        return True
+
+    async def is_connected(self) -> bool:
+        return self._connected
+
+    def get_last_error(self) -> str | None:
+        return self._last_error
+
+    async def attach(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, initial: bytes) -> None:
+        """Take over an inbound connection matched to this device (replaces a previous one)."""
+        self._close_peer()
+        peername = writer.get_extra_info("peername") or ("", 0)
+        self.peer = f"{peername[0]}:{peername[1]}"
+        self._writer = writer
+        framer = Framer(self.spec)
+        if initial and self.identifier and self.identify_mode == "handshake":
+            initial = self._strip_handshake(initial)
+        if self.handshake_reply:
+            writer.write(self.handshake_reply)
+        self._reader_task = asyncio.current_task()
+        try:
+            if initial:
+                await self._dispatch(framer.feed(initial))
+            while True:
+                chunk = await reader.read(READ_CHUNK_BYTES)
+                if not chunk:
+                    break
+                await self._dispatch(framer.feed(chunk))
+        except (asyncio.CancelledError, ConnectionError):
+            pass
+        finally:
+            if self._writer is writer:
+                self._writer = None
+                self._reader_task = None
+                self.peer = None
+            writer.close()
+
+    async def execute_action(self, action: str, params: dict[str, Any]) -> Any:
+        if action == "tcp_server.send":
+            data = to_bytes(params.get("data", ""), params.get("encoding", "ascii"))
+            if self._writer is None:
+                raise ConnectionError("no peer connected for this device")
+            self._writer.write(data)
+            await self._writer.drain()
+            return {"bytes_sent": len(data), "peer": self.peer}
+
+        if action == "tcp_server.on_message":
+            return {"ok": True}
+
+        raise ValueError(f"Unsupported action for TcpServerDriver: {action}")
+
+    async def _dispatch(self, frames: list[bytes]) -> None:
+        if self._handler is None:
+            return
+        topic = f"tcp://{self.peer}"
+        for frame in frames:
+            await self._handler(topic, frame)
+
+    def _strip_handshake(self, initial: bytes) -> bytes:
+        # Drop every frame up to and including the one carrying the identifier.
+        if not self.spec.delimited:
+            return b""
+        offset = 0
+        while offset < len(initial):
+            try:
+                end = self.spec.frame_end(initial[offset:])
+            except ValueError:
+                return b""
+            if end is None:
+                return b""
+            offset += end
+            if identifier_pattern(self.identifier).search(initial[offset - end : offset]):
+                return initial[offset:]
+        return b""
+
+    def _close_peer(self) -> None:
+        task = self._reader_task
+        if self._writer is not None:
+            self._writer.close()
+        self._writer = None
+        self._reader_task = None
+        self.peer = None
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from typing import Any
+
+from backend.drivers.base import BatchMessageHandler, DeviceDriver, MessageHandler
+from backend.drivers.framing import to_bytes
+from backend.drivers.udp_listener import udp_endpoint_hub
+
+logger = logging.getLogger(__name__)
+
+# Datagrams held for one device while its handler is busy; the oldest are dropped beyond this.
+MAX_PENDING_DATAGRAMS = 4096
+
+
+class UdpDriver(DeviceDriver):
+    """Device that sends UDP datagrams to a shared local port.
+
+    Datagrams are queued per device and handed to the handler as one batch
+    per event-loop turn, so a burst costs one dispatch instead of one each.
+    """
+
+    def __init__(self, connection_params: dict[str, Any]):
+        super().__init__(connection_params)
+        self.listen_host = str(connection_params.get("listen_host") or "0.0.0.0")
+        self.listen_port = int(connection_params.get("listen_port") or connection_params.get("port") or 0)
+        self.peer_ip = str(connection_params.get("peer_ip") or "").strip() or None
+        self.peer_port = int(connection_params.get("peer_port") or 0) or None
+        self.last_peer: tuple[str, int] | None = None
+        self._pending: deque[bytes] = deque(maxlen=MAX_PENDING_DATAGRAMS)
+        self._flush_scheduled = False
+        self._dispatch_task: asyncio.Task[None] | None = None
+        self._handler: MessageHandler | None = None
+        self._batch_handler: BatchMessageHandler | None = None
+        self._connected = False
+        self._last_error: str | None = None
+        self.received = 0
+        self.dropped = 0
+        self.batches = 0
+        self.max_batch = 0
+
+    def register_message_handler(self, handler: MessageHandler) -> None:
+        self._handler = handler
+
+    def register_batch_handler(self, handler: BatchMessageHandler) -> None:
+        self._batch_handler = handler
+
+    def is_push_driven(self) -> bool:
+        return True
+
+    async def connect(self) -> bool:
+        if not self.listen_port:
+            self._last_error = "listen_port is required"
+            return False
+        try:
+            await udp_endpoint_hub.register(self)
+        except OSError as exc:
+            self._last_error = f"bind {self.listen_host}:{self.listen_port} failed: {exc}"
+            return False
+        self._connected = True
+        self._last_error = None
+        return True
+
+    async def disconnect(self) -> bool:
+        await udp_endpoint_hub.unregister(self)
+        self._connected = False
+        self._pending.clear()
+        task = self._dispatch_task
+        self._dispatch_task = None
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+        return True
+
+    async def is_connected(self) -> bool:
+        return self._connected
+
+    def get_last_error(self) -> str | None:
+        return self._last_error
+
+    def feed(self, data: bytes, addr: tuple[Any, ...]) -> None:
+        """Called by the endpoint for every datagram routed to this device."""
+        self.received += 1
+        if len(self._pending) == MAX_PENDING_DATAGRAMS:
+            self.dropped += 1
+        self._pending.append(data)
+        self.last_peer = (addr[0], addr[1])
+        if not self._flush_scheduled and self._dispatch_task is None:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "received": self.received,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "max_batch": self.max_batch,
+            "pending": len(self._pending),
+        }
+
+    async def execute_action(self, action: str, params: dict[str, Any]) -> Any:
+        if action == "udp.send":
+            data = to_bytes(params.get("data", ""), params.get("encoding", "ascii"))
+            target = self._reply_address(params)
+            udp_endpoint_hub.sendto(self, data, target)
+            return {"bytes_sent": len(data), "peer": f"{target[0]}:{target[1]}"}
+
+        if action == "udp.on_message":
+            return {"ok": True}
+
+        raise ValueError(f"Unsupported action for UdpDriver: {action}")
+
+    def _reply_address(self, params: dict[str, Any]) -> tuple[str, int]:
+        host = params.get("host") or self.peer_ip or (self.last_peer[0] if self.last_peer else None)
+        port = params.get("port") or self.peer_port or (self.last_peer[1] if self.last_peer else None)
+        if not host or not port:
+            raise ConnectionError("no peer address known for this device yet")
+        return str(host), int(port)
+
+    def _flush(self) -> None:
+        self._flush_scheduled = False
+        if not self._pending or self._dispatch_task is not None:
+            return
+        batch = list(self._pending)
+        self._pending.clear()
+        self.batches += 1
+        self.max_batch = max(self.max_batch, len(batch))
+        self._dispatch_task = asyncio.create_task(self._dispatch(batch))
+
+    async def _dispatch(self, batch: list[bytes]) -> None:
+        # One batch in flight per device; whatever arrives meanwhile forms the next one.
+        topic = f"udp://{self.last_peer[0]}:{self.last_peer[1]}" if self.last_peer else "udp://"
+        try:
+            if self._batch_handler is not None:
+                await self._batch_handler(topic, batch)
+            elif self._handler is not None:
+                for payload in batch:
+                    await self._handler(topic, payload)
+        except Exception:
+            logger.exception("UDP handler failed for %s", topic)
+        finally:
+            if self._dispatch_task is asyncio.current_task():
+                self._dispatch_task = None
+                if self._pending and not self._flush_scheduled:
+                    self._flush_scheduled = True
+                    asyncio.get_running_loop().call_soon(self._flush)
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import asyncio
+import socket
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:  # pragma: no cover
+    from backend.drivers.udp_driver import UdpDriver
+
+# Kernel receive buffer per socket; absorbs bursts while a batch is being parsed.
+UDP_RECEIVE_BUFFER_BYTES = 4 * 1024 * 1024
+# asyncio reads one datagram per wakeup; drain up to this many more before yielding.
+DRAIN_MAX_DATAGRAMS = 256
+MAX_DATAGRAM_BYTES = 65535
+
+
+class _DatagramProtocol(asyncio.DatagramProtocol):
+    def __init__(self, endpoint: _Endpoint, sock: socket.socket):
+        self.endpoint = endpoint
+        self.sock = sock
+
+    def datagram_received(self, data: bytes, addr: tuple[Any, ...]) -> None:
+        route = self.endpoint.route
+        route(data, addr)
+        recvfrom = self.sock.recvfrom
+        for _ in range(DRAIN_MAX_DATAGRAMS):
+            try:
+                data, addr = recvfrom(MAX_DATAGRAM_BYTES)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                self.endpoint.errors += 1
+                return
+            route(data, addr)
+
+    def error_received(self, exc: Exception) -> None:
+        self.endpoint.errors += 1
+
+
+@dataclass
+class _Endpoint:
+    host: str
+    port: int
+    transport: asyncio.DatagramTransport | None = None
+    drivers: list[UdpDriver] = field(default_factory=list)
+    by_address: dict[tuple[str, int], UdpDriver] = field(default_factory=dict)
+    by_ip: dict[str, UdpDriver] = field(default_factory=dict)
+    catch_all: UdpDriver | None = None
+    datagrams: int = 0
+    unmatched: int = 0
+    errors: int = 0
+
+    def route(self, data: bytes, addr: tuple[Any, ...]) -> None:
+        self.datagrams += 1
+        driver = self.by_address.get(addr[:2]) or self.by_ip.get(addr[0]) or self.catch_all
+        if driver is None:
+            self.unmatched += 1
+            return
+        driver.feed(data, addr)
+
+    def reindex(self) -> None:
+        # Lookups run per datagram, so keep them to two dict gets.
+        self.by_address = {}
+        self.by_ip = {}
+        self.catch_all = None
+        for driver in self.drivers:
+            if driver.peer_ip and driver.peer_port:
+                self.by_address.setdefault((driver.peer_ip, driver.peer_port), driver)
+            elif driver.peer_ip:
+                self.by_ip.setdefault(driver.peer_ip, driver)
+            elif self.catch_all is None:
+                self.catch_all = driver
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "listen": f"{self.host}:{self.port}",
+            "devices": len(self.drivers),
+            "datagrams": self.datagrams,
+            "unmatched": self.unmatched,
+            "errors": self.errors,
+            "dropped": sum(driver.dropped for driver in self.drivers),
+            "max_batch": max((driver.max_batch for driver in self.drivers), default=0),
+        }
+
+
+class UdpEndpointHub:
+    """One datagram socket per bound address, demultiplexed to devices by source address."""
+
+    def __init__(self) -> None:
+        self._endpoints: dict[tuple[str, int], _Endpoint] = {}
+        self._lock = asyncio.Lock()
+
+    async def register(self, driver: UdpDriver) -> None:
+        key = (driver.listen_host, driver.listen_port)
+        async with self._lock:
+            endpoint = self._endpoints.get(key)
+            if endpoint is None:
+                endpoint = _Endpoint(host=key[0], port=key[1])
+                sock = await _bind(key[0], key[1])
+                try:
+                    transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+                        lambda: _DatagramProtocol(endpoint, sock),
+                        sock=sock,
+                    )
+                except BaseException:
+                    sock.close()
+                    raise
+                endpoint.transport = transport
+                self._endpoints[key] = endpoint
+            if driver not in endpoint.drivers:
+                endpoint.drivers.append(driver)
+                endpoint.reindex()
+
+    async def unregister(self, driver: UdpDriver) -> None:
+        key = (driver.listen_host, driver.listen_port)
+        async with self._lock:
+            endpoint = self._endpoints.get(key)
+            if endpoint is None or driver not in endpoint.drivers:
+                return
+            endpoint.drivers.remove(driver)
+            endpoint.reindex()
+            if endpoint.drivers:
+                return
+            del self._endpoints[key]
+        if endpoint.transport is not None:
+            endpoint.transport.close()
+
+    def sendto(self, driver: UdpDriver, data: bytes, addr: tuple[str, int]) -> None:
+        endpoint = self._endpoints.get((driver.listen_host, driver.listen_port))
+        if endpoint is None or endpoint.transport is None:
+            raise ConnectionError(f"UDP {driver.listen_host}:{driver.listen_port} is not bound")
+        endpoint.transport.sendto(data, addr)
+
+    def stats(self) -> dict[str, Any]:
+        return {"endpoints": [endpoint.stats() for endpoint in self._endpoints.values()]}
+
+
+async def _bind(host: str, port: int) -> socket.socket:
+    # The endpoint keeps its own socket so the protocol can drain it in one go.
+    infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_DGRAM)
+    if not infos:
+        raise OSError(f"cannot resolve {host}")
+    family, sock_type, proto, _, address = infos[0]
+    sock = socket.socket(family, sock_type, proto)
+    try:
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, UDP_RECEIVE_BUFFER_BYTES)
+        except OSError:
+            pass
+        sock.bind(address)
+        sock.setblocking(False)
+    except BaseException:
+        sock.close()
+        raise
+    return sock
+
+
+udp_endpoint_hub = UdpEndpointHub()
@@ -5,7 +5,7 @@ import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from backend.api import devices, protocols, serial_debug, websocket
+from backend.api import devices, metrics, protocols, serial_debug, websocket
 from backend.database.connection import close_db, init_db
 from backend.services.device_manager import manager
 from backend.services.serial_debug_service import serial_debug_service
@@ -30,6 +30,7 @@ app.include_router(protocols.router)
 app.include_router(devices.router)
 app.include_router(websocket.router)
 app.include_router(serial_debug.router)
+app.include_router(metrics.router)
 
 
 @app.on_event("startup")
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Mapping
+
+
+@dataclass(frozen=True)
+class AdaptivePoll:
+    """`runtime_options.adaptive_poll`: poll fast while the weight moves, back off while it rests."""
+
+    min_interval: float = 0.1
+    max_interval: float = 1.0
+    factor: float = 2.0
+    # Weight changes at or below this count as idle.
+    threshold: float = 0.0
+
+    def next_interval(self, current: float, active: bool) -> float:
+        if active:
+            return self.min_interval
+        return min(max(current, self.min_interval) * self.factor, self.max_interval)
+
+    def is_active(self, previous: float | None, weight: float | None, stable: bool | None) -> bool:
+        if stable is False:
+            return True
+        if previous is None or weight is None:
+            return previous is not weight
+        return abs(weight - previous) > self.threshold
+
+
+def parse_adaptive_poll(value: Any) -> AdaptivePoll | None:
+    if not isinstance(value, Mapping) or not value:
+        return None
+    defaults = AdaptivePoll()
+    try:
+        policy = AdaptivePoll(
+            min_interval=float(value.get("min_interval", defaults.min_interval)),
+            max_interval=float(value.get("max_interval", defaults.max_interval)),
+            factor=float(value.get("factor", defaults.factor)),
+            threshold=float(value.get("threshold", defaults.threshold)),
+        )
+    except (TypeError, ValueError) as exc:
+        raise ValueError("adaptive_poll.min_interval / max_interval / factor / threshold must be numbers") from exc
+    if not 0.05 <= policy.min_interval <= policy.max_interval:
+        raise ValueError("adaptive_poll requires 0.05 <= min_interval <= max_interval")
+    if policy.factor <= 1 or policy.threshold < 0:
+        raise ValueError("adaptive_poll.factor must be > 1 and threshold >= 0")
+    return policy
+
+
+DEFAULT_IDLE_INTERVAL = 30.0
+
+
+def parse_on_demand(value: Any) -> float | None:
+    """`runtime_options.on_demand`: `true` or `{"idle_interval": seconds}`; returns the idle interval."""
+    if value is None or value is False:
+        return None
+    if value is True:
+        return DEFAULT_IDLE_INTERVAL
+    if not isinstance(value, Mapping):
+        raise ValueError("on_demand must be true/false or an object")
+    try:
+        idle_interval = float(value.get("idle_interval", DEFAULT_IDLE_INTERVAL))
+    except (TypeError, ValueError) as exc:
+        raise ValueError("on_demand.idle_interval must be a number") from exc
+    if idle_interval <= 0:
+        raise ValueError("on_demand.idle_interval must be > 0")
+    return idle_interval
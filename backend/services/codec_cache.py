@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import re
+import struct
+from typing import Any
+
+from backend.services.lru_cache import LruCache
+
+PATTERN_CACHE_SIZE = 512
+STRUCT_CACHE_SIZE = 256
+
+
+def compile_pattern(pattern: str, binary: bool = False) -> re.Pattern[Any]:
+    text = str(pattern)
+    if binary:
+        return _BYTES_PATTERNS.get_or_create(text, lambda: re.compile(text.encode("utf-8")))
+    return _PATTERNS.get_or_create(text, lambda: re.compile(text))
+
+
+def get_struct(fmt: str) -> struct.Struct:
+    text = str(fmt)
+    return _STRUCTS.get_or_create(text, lambda: struct.Struct(text))
+
+
+def codec_cache_stats() -> dict[str, Any]:
+    return {
+        "pattern": _PATTERNS.stats(),
+        "bytes_pattern": _BYTES_PATTERNS.stats(),
+        "struct": _STRUCTS.stats(),
+    }
+
+
+_PATTERNS: LruCache[re.Pattern[str]] = LruCache(PATTERN_CACHE_SIZE)
+_BYTES_PATTERNS: LruCache[re.Pattern[bytes]] = LruCache(PATTERN_CACHE_SIZE)
+_STRUCTS: LruCache[struct.Struct] = LruCache(STRUCT_CACHE_SIZE)
@@ -2,7 +2,9 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Sequence
+
+from backend.services.stability import StabilityWindow
 
 
 @dataclass
@@ -16,6 +18,10 @@ class RuntimeState:
     last_update: str | None = None
     error: str | None = None
     step_results: dict[str, Any] = field(default_factory=dict)
+    # Only set when the template configures `output.stability`.
+    stability: StabilityWindow | None = field(default=None, repr=False)
+    stable: bool | None = None
+    stable_since: str | None = None
 
     def to_message(self) -> dict[str, Any]:
         return {
@@ -28,21 +34,54 @@ class RuntimeState:
             "timestamp": self.last_update,
             "status": self.status,
             "error": self.error,
+            "stable": self.stable,
+            "stable_since": self.stable_since,
         }
 
-    def mark_online(self, weight: float | None, unit: str) -> None:
+    def mark_online(self, weight: float | None, unit: str, earlier: Sequence[float | None] = ()) -> None:
+        """`earlier` are readings that arrived in the same batch before this one; they only feed stability."""
+        if unit != self.unit or self.status != "online":
+            self._reset_stability()
         self.status = "online"
         self.weight = weight
         self.unit = unit
         self.error = None
         self.last_update = datetime.now(timezone.utc).isoformat()
+        for reading in earlier:
+            self.observe(reading)
+        self.observe(weight)
 
     def mark_offline(self, error: str | None = None) -> None:
         self.status = "offline"
         self.error = error
         self.last_update = datetime.now(timezone.utc).isoformat()
+        self._reset_stability()
 
     def mark_error(self, error: str) -> None:
         self.status = "error"
         self.error = error
         self.last_update = datetime.now(timezone.utc).isoformat()
+        self._reset_stability()
+
+    def observe(self, weight: float | None) -> None:
+        """Feed one reading to the stability window (mark_online does this for the reading it publishes)."""
+        window = self.stability
+        if window is None:
+            return
+        if weight is None:
+            window.clear()
+            stable = False
+        else:
+            stable = window.push(weight)
+        if stable and not self.stable:
+            self.stable_since = self.last_update
+        elif not stable:
+            self.stable_since = None
+        self.stable = stable
+
+    def _reset_stability(self) -> None:
+        if self.stability is None:
+            return
+        self.stability.clear()
+        self.stable = False
+        self.stable_since = None
@@ -2,15 +2,22 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from dataclasses import dataclass
-from typing import Any
+import time
+from dataclasses import dataclass, field
+from typing import Any, Iterable
 
 from backend.database.models import Device, ProtocolTemplate
+from backend.services.adaptive_poll import AdaptivePoll, parse_adaptive_poll, parse_on_demand
 from backend.drivers import build_driver
-from backend.drivers.mqtt_driver import MqttDriver
 from backend.services.data_collector import RuntimeState
 from backend.services.event_bus import EventBus
+from backend.services.poll_scheduler import ScheduledPoll, poll_scheduler
+from backend.services.publish_gate import PublishGate, resolve_publish_policy
+from backend.services.stability import StabilityWindow
+from backend.services.subscriptions import Selector
 from backend.services.protocol_executor import ProtocolExecutor
+from backend.services.template_compiler import CompiledTemplate
+from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
@@ -19,29 +26,138 @@ logger = logging.getLogger(__name__)
 class DeviceRuntime:
     device: Device
     template: ProtocolTemplate
+    plan: CompiledTemplate
     driver: Any
     state: RuntimeState
     stop_event: asyncio.Event
-    task: asyncio.Task[Any] | None = None
+    schedule: ScheduledPoll | None = None
+    setup_done: bool = False
+    backoff: float = 1.0
+    publisher: PublishGate = field(default_factory=PublishGate)
+    adaptive: AdaptivePoll | None = None
+    # Idle interval of an on_demand device, used while nobody subscribes to it.
+    on_demand_idle: float | None = None
 
 
 class DeviceManager:
     def __init__(self) -> None:
         self._executor = ProtocolExecutor()
         self._event_bus = EventBus()
+        self._event_bus.set_interest_listener(self._on_interest)
+        # Subscriptions by device_code glob or template, re-evaluated whenever a device starts or changes.
+        self._selectors: dict[asyncio.Queue, Selector] = {}
         self._runtimes: dict[int, DeviceRuntime] = {}
+        self._plans: dict[int, tuple[Any, CompiledTemplate]] = {}
         self._lock = asyncio.Lock()
+        self._connect_slots = asyncio.Semaphore(max(settings.connect_concurrency, 1))
+        self._startup_began = 0.0
+        self._startup_pending: set[int] = set()
+        self._startup_stats: dict[str, Any] = {}
+        self._shutdown_stats: dict[str, Any] = {}
+        self._reload_stats = {"in_place": 0, "plan_swapped": 0, "rescheduled": 0, "reconnected": 0}
 
     async def startup(self) -> None:
-        enabled_devices = list(Device.select().where(Device.enabled == True))  # noqa: E712
-        for device in enabled_devices:
-            await self.start_device(device.id)
+        self._startup_began = time.perf_counter()
+        # Two queries in total, however many devices there are.
+        devices = list(Device.select().where(Device.enabled == True))  # noqa: E712
+        template_ids = list({device.protocol_template_id for device in devices})
+        templates = {}
+        if template_ids:
+            templates = {row.id: row for row in ProtocolTemplate.select().where(ProtocolTemplate.id.in_(template_ids))}
+        loaded = time.perf_counter()
+        self._startup_stats = {
+            "devices": len(devices),
+            "templates": len(templates),
+            "started": 0,
+            "failed": 0,
+            "load_ms": round((loaded - self._startup_began) * 1000, 1),
+            "start_ms": None,
+            "connected": 0,
+            "connect_failed": 0,
+            "first_connect_ms": None,
+        }
+
+        failed = 0
+        for device in devices:
+            template = templates.get(device.protocol_template_id)
+            if template is None:
+                logger.error("Missing protocol template for device_id=%s", device.id)
+                failed += 1
+                continue
+            try:
+                await self._start_runtime(device, template)
+            except Exception as exc:
+                logger.exception("Failed to start device_id=%s: %s", device.id, exc)
+                failed += 1
+                continue
+            self._startup_pending.add(device.id)
+
+        # Connects happen on each device's first scheduled cycle, spread over its interval.
+        self._startup_stats.update(
+            started=len(devices) - failed,
+            failed=failed,
+            start_ms=round((time.perf_counter() - loaded) * 1000, 1),
+        )
+        logger.info(
+            "Started %s of %s devices in %.0f ms",
+            len(devices) - failed,
+            len(devices),
+            (time.perf_counter() - self._startup_began) * 1000,
+        )
 
     async def shutdown(self) -> None:
         async with self._lock:
-            device_ids = list(self._runtimes.keys())
-        for device_id in device_ids:
-            await self.stop_device(device_id)
+            runtimes = list(self._runtimes.values())
+            self._runtimes.clear()
+        self._startup_pending.clear()
+        if not runtimes:
+            return
+
+        began = time.perf_counter()
+        tasks = [asyncio.create_task(self._stop_runtime(runtime)) for runtime in runtimes]
+        done, pending = await asyncio.wait(tasks, timeout=settings.shutdown_timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            logger.warning(
+                "%s of %s devices did not disconnect within %.1f s", len(pending), len(runtimes), settings.shutdown_timeout
+            )
+        failed = 0
+        for task in done:
+            if task.exception() is not None:
+                failed += 1
+                logger.error("Device shutdown failed: %s", task.exception())
+        self._shutdown_stats = {
+            "devices": len(runtimes),
+            "timed_out": len(pending),
+            "failed": failed,
+            "elapsed_ms": round((time.perf_counter() - began) * 1000, 1),
+        }
+
+    def publish_stats(self) -> dict[str, Any]:
+        devices = [
+            {"device_id": runtime.device.id, "device_code": runtime.device.device_code, **runtime.publisher.stats()}
+            for runtime in self._runtimes.values()
+        ]
+        return {
+            "published": sum(item["published"] for item in devices),
+            "suppressed": sum(item["suppressed"] for item in devices),
+            "devices": devices,
+        }
+
+    def lifecycle_stats(self) -> dict[str, Any]:
+        return {
+            "startup": dict(self._startup_stats),
+            "startup_pending": len(self._startup_pending),
+            "shutdown": dict(self._shutdown_stats),
+            "reload": dict(self._reload_stats),
+            "on_demand": {
+                "devices": sum(1 for runtime in self._runtimes.values() if runtime.on_demand_idle is not None),
+                "idle": sum(1 for runtime in self._runtimes.values() if self._idle(runtime)),
+            },
+            "connect_concurrency": settings.connect_concurrency,
+        }
 
     async def start_device(self, device_id: int) -> None:
         device = Device.get_or_none(Device.id == device_id)
@@ -53,39 +169,59 @@ class DeviceManager:
             logger.error("Missing protocol template for device_id=%s", device_id)
             return
 
-        await self.stop_device(device_id)
+        await self._start_runtime(device, template)
+
+    async def _start_runtime(self, device: Device, template: ProtocolTemplate) -> None:
+        await self.stop_device(device.id)
 
         runtime = DeviceRuntime(
             device=device,
             template=template,
+            plan=self.get_plan(template),
             driver=build_driver(template.protocol_type, device.connection_params),
             state=RuntimeState(device_id=device.id, device_name=device.name, device_code=device.device_code),
             stop_event=asyncio.Event(),
         )
+        runtime.state.stability = StabilityWindow.from_config(runtime.plan.stability)
+        runtime.publisher.policy = resolve_publish_policy(runtime.plan, device.runtime_options)
+        runtime.adaptive = parse_adaptive_poll(device.runtime_options.get("adaptive_poll"))
+        runtime.on_demand_idle = parse_on_demand(device.runtime_options.get("on_demand"))
+
+        push_driven = runtime.driver.is_push_driven()
+        if push_driven:
+            runtime.driver.register_message_handler(
+                lambda topic, payload: self._handle_pushed_message(runtime, topic, payload)
+            )
+            runtime.driver.register_batch_handler(
+                lambda topic, payloads: self._handle_pushed_batch(runtime, topic, payloads)
+            )
 
-        runtime.task = asyncio.create_task(self._run_runtime(runtime), name=f"device-runtime-{device.id}")
         async with self._lock:
             self._runtimes[device.id] = runtime
+        self._refresh_selectors(runtime)
+        runtime.schedule = poll_scheduler.add(
+            device.id,
+            self._target_interval(runtime),
+            lambda: self._poll_cycle(runtime),
+            endpoint=None if push_driven else _poll_endpoint(device.connection_params),
+        )
 
     async def stop_device(self, device_id: int) -> None:
         async with self._lock:
             runtime = self._runtimes.pop(device_id, None)
         if runtime is None:
             return
+        await self._stop_runtime(runtime)
 
+    async def _stop_runtime(self, runtime: DeviceRuntime) -> None:
+        self._startup_pending.discard(runtime.device.id)
         runtime.stop_event.set()
-        if runtime.task:
-            runtime.task.cancel()
-            try:
-                await runtime.task
-            except asyncio.CancelledError:
-                pass
-            except Exception as exc:  # pragma: no cover
-                logger.exception("Runtime cancellation failed: %s", exc)
+        if runtime.schedule is not None:
+            await poll_scheduler.remove(runtime.schedule)
 
         await runtime.driver.disconnect()
         runtime.state.mark_offline("stopped")
-        await self._event_bus.publish(runtime.state.to_message())
+        await self._publish(runtime)
 
     async def reload_device(self, device_id: int) -> None:
         device = Device.get_or_none(Device.id == device_id)
@@ -97,11 +233,83 @@ class DeviceManager:
             await self.stop_device(device_id)
             return
 
-        await self.start_device(device_id)
+        runtime = await self.get_runtime(device_id)
+        template = ProtocolTemplate.get_or_none(ProtocolTemplate.id == device.protocol_template_id)
+        if runtime is None or template is None or _needs_reconnect(runtime, device, template):
+            if runtime is not None:
+                self._reload_stats["reconnected"] += 1
+            await self.start_device(device_id)
+            return
+        self._apply_in_place(runtime, device, template)
+
+    def _apply_in_place(self, runtime: DeviceRuntime, device: Device, template: ProtocolTemplate) -> None:
+        """Apply an edit that keeps the connection: variables, names, runtime options, poll rate or a same-protocol template.
+
+        Each field is a single attribute swap, so a cycle already running keeps
+        the configuration it started with and the next one sees the new one.
+        """
+        plan = self.get_plan(template)
+        if plan is not runtime.plan:
+            if plan.stability != runtime.plan.stability:
+                runtime.state.stability = StabilityWindow.from_config(plan.stability)
+                runtime.state.stable = None
+                runtime.state.stable_since = None
+            runtime.plan = plan
+            # The new template's setup steps run on the next cycle, over the same connection.
+            runtime.setup_done = False
+            self._reload_stats["plan_swapped"] += 1
+        rate_changed = device.poll_interval != runtime.device.poll_interval or any(
+            device.runtime_options.get(key) != runtime.device.runtime_options.get(key)
+            for key in ("adaptive_poll", "on_demand")
+        )
+        runtime.template = template
+        runtime.device = device
+        runtime.publisher.policy = resolve_publish_policy(plan, device.runtime_options)
+        runtime.adaptive = parse_adaptive_poll(device.runtime_options.get("adaptive_poll"))
+        runtime.on_demand_idle = parse_on_demand(device.runtime_options.get("on_demand"))
+        runtime.state.device_name = device.name
+        runtime.state.device_code = device.device_code
+        self._refresh_selectors(runtime)
+
+        # An adaptive device keeps the interval it has backed off to unless its rate settings changed.
+        keep_interval = runtime.adaptive is not None and not rate_changed
+        if runtime.schedule is not None and not keep_interval:
+            interval = self._target_interval(runtime)
+            if interval != runtime.schedule.interval:
+                poll_scheduler.reschedule(runtime.schedule, interval)
+                self._reload_stats["rescheduled"] += 1
+        self._reload_stats["in_place"] += 1
 
     async def remove_device(self, device_id: int) -> None:
         await self.stop_device(device_id)
 
+    def get_plan(self, template: ProtocolTemplate) -> CompiledTemplate:
+        cached = self._plans.get(template.id)
+        if cached is not None and cached[0] == template.updated_at:
+            return cached[1]
+        plan = self._executor.compile(template.template)
+        self._plans[template.id] = (template.updated_at, plan)
+        return plan
+
+    def invalidate_plan(self, template_id: int) -> None:
+        self._plans.pop(template_id, None)
+
+    async def reload_template(self, template_id: int) -> list[dict[str, Any]]:
+        """Apply an edited template to the running devices that use it, in place where possible.
+
+        A device that fails to reload does not stop the others; the failures are returned.
+        """
+        self.invalidate_plan(template_id)
+        runtimes = [runtime for runtime in self._runtimes.values() if runtime.template.id == template_id]
+        errors: list[dict[str, Any]] = []
+        for device_id in [runtime.device.id for runtime in runtimes]:
+            try:
+                await self.reload_device(device_id)
+            except Exception as exc:
+                logger.exception("Failed to reload device_id=%s for template_id=%s: %s", device_id, template_id, exc)
+                errors.append({"device_id": device_id, "error": str(exc)})
+        return errors
+
     async def execute_manual_step(
         self,
         device_id: int,
@@ -113,7 +321,7 @@ class DeviceManager:
             raise ValueError("Device runtime not found or not enabled")
 
         result = await self._executor.run_manual_step(
-            template=runtime.template.template,
+            template=runtime.plan,
             driver=runtime.driver,
             step_id=step_id,
             variables=runtime.device.template_variables,
@@ -126,102 +334,236 @@ class DeviceManager:
         async with self._lock:
             return self._runtimes.get(device_id)
 
-    async def subscribe(self):
-        return await self._event_bus.subscribe()
+    def list_runtimes(self) -> list[DeviceRuntime]:
+        return list(self._runtimes.values())
+
+    async def subscribe(self, device_ids: Iterable[int] | None = None, status_only: bool = False):
+        return await self._event_bus.subscribe(device_ids, status_only)
+
+    async def update_subscription(self, queue, selector: Selector, status_only: bool) -> list[int] | None:
+        """Point a subscription at the devices `selector` matches; returns the device ids (None for all)."""
+        device_ids: set[int] | None = None
+        if not selector.everything:
+            device_ids = set(selector.device_ids)
+            device_ids.update(
+                runtime.device.id
+                for runtime in self._runtimes.values()
+                if selector.matches(runtime.device.id, runtime.device.device_code, runtime.template.id)
+            )
+        if selector.has_patterns:
+            self._selectors[queue] = selector
+        else:
+            self._selectors.pop(queue, None)
+        await self._event_bus.update(queue, device_ids, status_only)
+        return None if device_ids is None else sorted(device_ids)
 
     async def unsubscribe(self, queue):
+        self._selectors.pop(queue, None)
         await self._event_bus.unsubscribe(queue)
 
+    def subscription_stats(self) -> dict[str, Any]:
+        return {**self._event_bus.stats(), "pattern_subscriptions": len(self._selectors)}
+
+    def _refresh_selectors(self, runtime: DeviceRuntime) -> None:
+        device = runtime.device
+        for queue, selector in self._selectors.items():
+            self._event_bus.include(queue, device.id, selector.matches(device.id, device.device_code, runtime.template.id))
+
     async def runtime_snapshot(self, device_id: int) -> dict[str, Any]:
         runtime = await self.get_runtime(device_id)
         if runtime is None:
             return {"status": "offline", "weight": None, "unit": "kg", "timestamp": None, "error": None}
         return runtime.state.to_message()
 
-    async def _run_runtime(self, runtime: DeviceRuntime) -> None:
-        backoff = 1.0
-        setup_done = False
+    async def _poll_cycle(self, runtime: DeviceRuntime) -> float | None:
+        """One scheduled cycle: (re)connect, run setup once, then poll.
 
-        if isinstance(runtime.driver, MqttDriver):
-            runtime.driver.register_message_handler(
-                lambda topic, payload: self._handle_mqtt_message(runtime, topic, payload)
+        Returns how long the scheduler should hold off after a failure.
+        """
+        if runtime.stop_event.is_set():
+            return None
+        # A hot reload may swap these mid-cycle; this cycle finishes with what it started with.
+        plan = runtime.plan
+        variables = runtime.device.template_variables
+        try:
+            if not await runtime.driver.is_connected():
+                async with self._connect_slots:
+                    connected = await runtime.driver.connect()
+                if not connected:
+                    self._record_first_connect(runtime, False)
+                    connect_error = "connect failed"
+                    get_last_error = getattr(runtime.driver, "get_last_error", None)
+                    if callable(get_last_error):
+                        last_error = get_last_error()
+                        if last_error:
+                            connect_error = f"connect failed: {last_error}"
+                    runtime.state.mark_offline(connect_error)
+                    await self._publish(runtime)
+                    return _next_backoff(runtime)
+
+            runtime.backoff = 1.0
+            self._record_first_connect(runtime, True)
+
+            if not runtime.setup_done:
+                runtime.driver.begin_setup()
+                setup_results = await self._executor.run_setup_steps(plan, runtime.driver, variables)
+                runtime.driver.finish_setup()
+                runtime.state.step_results.update(setup_results)
+                runtime.setup_done = runtime.plan is plan
+
+            if runtime.driver.is_push_driven():
+                return None
+
+            steps = await self._executor.run_poll_steps(
+                plan,
+                runtime.driver,
+                variables,
+                previous_steps=runtime.state.step_results,
             )
+            runtime.state.step_results = steps
 
-        while not runtime.stop_event.is_set():
-            try:
-                if not await runtime.driver.is_connected():
-                    connected = await runtime.driver.connect()
-                    if not connected:
-                        connect_error = "connect failed"
-                        get_last_error = getattr(runtime.driver, "get_last_error", None)
-                        if callable(get_last_error):
-                            last_error = get_last_error()
-                            if last_error:
-                                connect_error = f"connect failed: {last_error}"
-                        runtime.state.mark_offline(connect_error)
-                        await self._event_bus.publish(runtime.state.to_message())
-                        await asyncio.sleep(backoff)
-                        backoff = min(backoff * 2, 30)
-                        continue
+            context = {"steps": steps, **variables}
+            output = self._executor.render_output(plan, context)
 
-                backoff = 1.0
+            weight = _to_float(output.get("weight"))
+            unit = str(output.get("unit", "kg"))
+            previous = runtime.state.weight if runtime.state.status == "online" else None
+            runtime.state.mark_online(weight, unit)
+            if runtime.adaptive is not None and runtime.schedule is not None and not self._idle(runtime):
+                active = runtime.adaptive.is_active(previous, weight, runtime.state.stable)
+                interval = runtime.adaptive.next_interval(runtime.schedule.interval, active)
+                poll_scheduler.reschedule(runtime.schedule, interval)
+            await self._publish(runtime)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            self._record_first_connect(runtime, False)
+            runtime.state.mark_error(str(exc))
+            await self._publish(runtime)
+            return _next_backoff(runtime)
+        return None
 
-                if not setup_done:
-                    setup_results = await self._executor.run_setup_steps(
-                        runtime.template.template,
+    def _record_first_connect(self, runtime: DeviceRuntime, connected: bool) -> None:
+        device_id = runtime.device.id
+        if device_id not in self._startup_pending:
+            return
+        self._startup_pending.discard(device_id)
+        stats = self._startup_stats
+        stats["connected" if connected else "connect_failed"] += 1
+        if not self._startup_pending:
+            stats["first_connect_ms"] = round((time.perf_counter() - self._startup_began) * 1000, 1)
+
+    def _idle(self, runtime: DeviceRuntime) -> bool:
+        return runtime.on_demand_idle is not None and not self._event_bus.interested(runtime.device.id)
+
+    def _target_interval(self, runtime: DeviceRuntime) -> float:
+        push_driven = runtime.driver.is_push_driven()
+        interval = _schedule_interval(runtime.device, push_driven, runtime.adaptive)
+        if not push_driven and self._idle(runtime):
+            return max(runtime.on_demand_idle, interval)
+        return interval
+
+    def _on_interest(self, device_id: int | None, interested: bool) -> None:
+        # First listener in: back to full rate right away; last one out: drop to the idle heartbeat.
+        if device_id is None:
+            runtimes = list(self._runtimes.values())
+        else:
+            runtime = self._runtimes.get(device_id)
+            runtimes = [runtime] if runtime is not None else []
+        for runtime in runtimes:
+            if runtime.on_demand_idle is not None and runtime.schedule is not None:
+                poll_scheduler.reschedule(runtime.schedule, self._target_interval(runtime))
+
+    async def _publish(self, runtime: DeviceRuntime) -> None:
+        message = runtime.state.to_message()
+        if runtime.publisher.admit(message):
+            await self._event_bus.publish(message)
+
+    async def _handle_pushed_message(self, runtime: DeviceRuntime, topic: str, payload: bytes) -> None:
+        await self._handle_pushed_batch(runtime, topic, [payload])
+
+    async def _handle_pushed_batch(self, runtime: DeviceRuntime, topic: str, payloads: list[bytes]) -> None:
+        # Every payload is parsed in order, but only the state after the last one is published.
+        output: dict[str, Any] | None = None
+        # Weights of every record handled, so stability sees readings that are not published.
+        weights: list[float | None] = []
+        error: Exception | None = None
+        plan = runtime.plan
+        device = runtime.device
+        batch_mode = plan.message_batch is not None
+        for payload in payloads:
+            try:
+                if batch_mode:
+                    steps, outputs = await self._executor.run_message_batch(
+                        plan,
+                        payload,
+                        device.template_variables,
+                        key=device.device_code,
+                        previous_steps=runtime.state.step_results,
+                    )
+                    if not outputs:
+                        continue
+                    weights.extend(_to_float(item.get("weight")) for item in outputs)
+                    output = outputs[-1]
+                else:
+                    steps, output = await self._executor.run_message_handler(
+                        plan,
                         runtime.driver,
-                        runtime.device.template_variables,
+                        payload,
+                        device.template_variables,
+                        previous_steps=runtime.state.step_results,
                     )
-                    runtime.state.step_results.update(setup_results)
-                    setup_done = True
-
-                protocol_type = runtime.template.protocol_type.lower()
-                if protocol_type == "mqtt":
-                    await asyncio.sleep(max(runtime.device.poll_interval, 1.0))
-                    continue
-
-                steps = await self._executor.run_poll_steps(
-                    runtime.template.template,
-                    runtime.driver,
-                    runtime.device.template_variables,
-                    previous_steps=runtime.state.step_results,
-                )
+                    weights.append(_to_float(output.get("weight")))
                 runtime.state.step_results = steps
-
-                context = {"steps": steps, **runtime.device.template_variables}
-                output = self._executor.render_output(runtime.template.template, context)
-
-                weight = _to_float(output.get("weight"))
-                unit = str(output.get("unit", "kg"))
-                runtime.state.mark_online(weight, unit)
-                await self._event_bus.publish(runtime.state.to_message())
-            except asyncio.CancelledError:
-                raise
+                error = None
             except Exception as exc:
-                runtime.state.mark_error(str(exc))
-                await self._event_bus.publish(runtime.state.to_message())
-                await asyncio.sleep(backoff)
-                backoff = min(backoff * 2, 30)
+                error = exc
 
-            await asyncio.sleep(max(runtime.device.poll_interval, 0.1))
-
-    async def _handle_mqtt_message(self, runtime: DeviceRuntime, topic: str, payload: bytes) -> None:
-        try:
-            steps, output = await self._executor.run_message_handler(
-                runtime.template.template,
-                runtime.driver,
-                payload,
-                runtime.device.template_variables,
-                previous_steps=runtime.state.step_results,
-            )
-            runtime.state.step_results = steps
+        if error is not None:
+            protocol_type = runtime.template.protocol_type.lower()
+            runtime.state.mark_error(f"{protocol_type} message handling failed: {topic}: {error}")
+        elif output is not None:
             weight = _to_float(output.get("weight"))
             unit = str(output.get("unit", "kg"))
-            runtime.state.mark_online(weight, unit)
-            await self._event_bus.publish(runtime.state.to_message())
-        except Exception as exc:
-            runtime.state.mark_error(f"mqtt message handling failed: {topic}: {exc}")
-            await self._event_bus.publish(runtime.state.to_message())
+            runtime.state.mark_online(weight, unit, earlier=weights[:-1])
+        else:
+            # A batch message without records for this device.
+            return
+        await self._publish(runtime)
+
+
+def _schedule_interval(device: Device, push_driven: bool, adaptive: AdaptivePoll | None = None) -> float:
+    # Push-driven devices are only scheduled to keep the connection alive.
+    if push_driven:
+        return max(device.poll_interval, 1.0)
+    # Adaptive devices start fast and back off from there.
+    if adaptive is not None:
+        return adaptive.min_interval
+    return max(device.poll_interval, 0.1)
+
+
+def _needs_reconnect(runtime: DeviceRuntime, device: Device, template: ProtocolTemplate) -> bool:
+    return (
+        device.connection_params != runtime.device.connection_params
+        or template.protocol_type.lower() != runtime.template.protocol_type.lower()
+    )
+
+
+def _next_backoff(runtime: DeviceRuntime) -> float:
+    hold = runtime.backoff
+    runtime.backoff = min(runtime.backoff * 2, 30)
+    return hold
+
+
+def _poll_endpoint(connection_params: dict[str, Any]) -> str | None:
+    # Devices behind the same gateway address or on the same serial port share a poll cap.
+    host = connection_params.get("host")
+    port = connection_params.get("port")
+    if host:
+        return f"{host}:{port}"
+    if port:
+        return str(port)
+    return None
 
 
 def _to_float(value: Any) -> float | None:
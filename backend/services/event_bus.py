@@ -1,35 +1,164 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Any
+import json
+from typing import Any, Callable, Iterable
+
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None
+
+# (device_id, interested); device_id is None when subscribers to every device came or went.
+InterestListener = Callable[[int | None, bool], None]
+
+# Queues carry JSON text already encoded by `encode_message`.
+Queue = asyncio.Queue[str]
+
+
+def encode_message(message: dict[str, Any]) -> str:
+    if orjson is not None:
+        try:
+            return orjson.dumps(message).decode()
+        except TypeError:
+            pass
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":"))
+
+
+class _Subscriber:
+    __slots__ = ("device_ids", "status_only")
+
+    def __init__(self, status_only: bool) -> None:
+        # None: every device; otherwise the indexed device ids.
+        self.device_ids: frozenset[int] | None = frozenset()
+        self.status_only = status_only
 
 
 class EventBus:
+    """Fan-out of device messages to subscriber queues, indexed by device id.
+
+    A publish only touches the queues subscribed to that device plus those
+    subscribed to everything, and encodes the message once for all of them.
+    Mutations never await, so the indexes are
+    always consistent on the event loop without a lock.
+    """
+
     def __init__(self) -> None:
-        self._queues: set[asyncio.Queue[dict[str, Any]]] = set()
-        self._lock = asyncio.Lock()
+        self._subscribers: dict[Queue, _Subscriber] = {}
+        self._by_device: dict[int, set[Queue]] = {}
+        self._everything: set[Queue] = set()
+        self._last_status: dict[Any, Any] = {}
+        self._listener: InterestListener | None = None
 
-    async def subscribe(self) -> asyncio.Queue[dict[str, Any]]:
-        queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=200)
-        async with self._lock:
-            self._queues.add(queue)
+    def set_interest_listener(self, listener: InterestListener | None) -> None:
+        self._listener = listener
+
+    def interested(self, device_id: int) -> bool:
+        return bool(self._everything) or device_id in self._by_device
+
+    async def subscribe(self, device_ids: Iterable[int] | None = None, status_only: bool = False) -> Queue:
+        queue: Queue = asyncio.Queue(maxsize=200)
+        self._subscribers[queue] = _Subscriber(status_only)
+        self._notify(self._assign(queue, None if device_ids is None else frozenset(device_ids)))
         return queue
 
-    async def unsubscribe(self, queue: asyncio.Queue[dict[str, Any]]) -> None:
-        async with self._lock:
-            self._queues.discard(queue)
+    async def update(self, queue: Queue, device_ids: Iterable[int] | None, status_only: bool | None = None) -> None:
+        subscriber = self._subscribers.get(queue)
+        if subscriber is None:
+            return
+        if status_only is not None:
+            subscriber.status_only = status_only
+        self._notify(self._assign(queue, None if device_ids is None else frozenset(device_ids)))
+
+    def include(self, queue: Queue, device_id: int, included: bool) -> None:
+        """Add or drop one device for a queue that is not subscribed to everything."""
+        subscriber = self._subscribers.get(queue)
+        if subscriber is None or subscriber.device_ids is None:
+            return
+        if (device_id in subscriber.device_ids) == included:
+            return
+        wanted = subscriber.device_ids | {device_id} if included else subscriber.device_ids - {device_id}
+        self._notify(self._assign(queue, wanted))
+
+    async def unsubscribe(self, queue: Queue) -> None:
+        if queue not in self._subscribers:
+            return
+        changes = self._assign(queue, frozenset())
+        del self._subscribers[queue]
+        self._notify(changes)
 
     async def publish(self, message: dict[str, Any]) -> None:
-        async with self._lock:
-            targets = list(self._queues)
+        device_id = message.get("device_id")
+        status = message.get("status")
+        status_changed = self._last_status.get(device_id) != status
+        self._last_status[device_id] = status
 
+        targets = [*self._everything, *self._by_device.get(device_id, ())]
+        frame: str | None = None
         for queue in targets:
-            if queue.full():
-                try:
-                    _ = queue.get_nowait()
-                except asyncio.QueueEmpty:
-                    pass
-            try:
-                queue.put_nowait(message)
-            except asyncio.QueueFull:
+            subscriber = self._subscribers.get(queue)
+            if subscriber is None or (subscriber.status_only and not status_changed):
+                continue
+            if frame is None:
+                frame = encode_message(message)
+            offer(queue, frame)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "subscribers": len(self._subscribers),
+            "all_devices": len(self._everything),
+            "status_only": sum(1 for item in self._subscribers.values() if item.status_only),
+            "indexed_devices": len(self._by_device),
+            "indexed_subscriptions": sum(len(queues) for queues in self._by_device.values()),
+        }
+
+    def _assign(self, queue: Queue, wanted: frozenset[int] | None) -> list[tuple[int | None, bool]]:
+        subscriber = self._subscribers[queue]
+        old = subscriber.device_ids
+        changes: list[tuple[int | None, bool]] = []
+        if old is None:
+            if wanted is None:
+                return changes
+            self._everything.discard(queue)
+            if not self._everything:
+                changes.append((None, False))
+            old = frozenset()
+        new = frozenset() if wanted is None else wanted
+        for device_id in old - new:
+            queues = self._by_device.get(device_id)
+            if queues is None:
                 continue
+            queues.discard(queue)
+            if not queues:
+                del self._by_device[device_id]
+                changes.append((device_id, False))
+        for device_id in new - old:
+            queues = self._by_device.setdefault(device_id, set())
+            if not queues:
+                changes.append((device_id, True))
+            queues.add(queue)
+        if wanted is None:
+            self._everything.add(queue)
+            if len(self._everything) == 1:
+                changes.append((None, True))
+        subscriber.device_ids = wanted
+        return changes
+
+    def _notify(self, changes: list[tuple[int | None, bool]]) -> None:
+        if self._listener is None:
+            return
+        for device_id, interested in changes:
+            self._listener(device_id, interested)
+
+
+def offer(queue: Queue, frame: str) -> None:
+    """Put without blocking, dropping the oldest frame when the subscriber lags behind."""
+    if queue.full():
+        try:
+            _ = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+    try:
+        queue.put_nowait(frame)
+    except asyncio.QueueFull:
+        pass
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import ast
+import json
+from dataclasses import dataclass
+from types import CodeType, SimpleNamespace
+from typing import Any, Mapping
+
+from backend.services.lru_cache import LruCache
+
+
+def _json_loads(s: str) -> Any:
+    return json.loads(s)
+
+
+def _json_get(obj: dict, key: str, default: Any = None) -> Any:
+    return obj.get(key, default)
+
+
+SAFE_FUNCTIONS: dict[str, Any] = {
+    "int": int,
+    "float": float,
+    "str": str,
+    "abs": abs,
+    "round": round,
+    "min": min,
+    "max": max,
+    "len": len,
+    # 添加 JSON 解析支持
+    "json.loads": _json_loads,
+    "json.get": _json_get,
+}
+
+EXPRESSION_CACHE_SIZE = 1024
+MAX_POWER = 4000000
+MAX_SHIFT = 10000
+MAX_SEQUENCE_LENGTH = 100000
+
+DISALLOWED_ATTR_PREFIXES = ("_", "func_")
+DISALLOWED_ATTRS = {"format", "format_map", "mro", "tb_frame", "gi_frame", "ag_frame", "cr_frame", "exec"}
+
+ALLOWED_NODES = (
+    ast.Expression,
+    ast.Constant,
+    ast.Name,
+    ast.Load,
+    ast.UnaryOp,
+    ast.BinOp,
+    ast.BoolOp,
+    ast.Compare,
+    ast.IfExp,
+    ast.Call,
+    ast.keyword,
+    ast.Subscript,
+    ast.Attribute,
+    ast.Slice,
+    ast.JoinedStr,
+    ast.FormattedValue,
+    # operators
+    ast.Add,
+    ast.Sub,
+    ast.Mult,
+    ast.Div,
+    ast.FloorDiv,
+    ast.Mod,
+    ast.Pow,
+    ast.LShift,
+    ast.RShift,
+    ast.BitXor,
+    ast.BitOr,
+    ast.BitAnd,
+    ast.Invert,
+    ast.Not,
+    ast.USub,
+    ast.UAdd,
+    ast.And,
+    ast.Or,
+    ast.Eq,
+    ast.NotEq,
+    ast.Gt,
+    ast.Lt,
+    ast.GtE,
+    ast.LtE,
+    ast.In,
+    ast.NotIn,
+    ast.Is,
+    ast.IsNot,
+)
+
+
+class ExpressionError(ValueError):
+    pass
+
+
+def _safe_power(a: Any, b: Any) -> Any:
+    if abs(a) > MAX_POWER or abs(b) > MAX_POWER:
+        raise ExpressionError(f"Sorry! I don't want to evaluate {a} ** {b}")
+    return a**b
+
+
+def _safe_mult(a: Any, b: Any) -> Any:
+    if hasattr(a, "__len__") and b * len(a) > MAX_SEQUENCE_LENGTH:
+        raise ExpressionError("Sorry, I will not evaluate something that long.")
+    if hasattr(b, "__len__") and a * len(b) > MAX_SEQUENCE_LENGTH:
+        raise ExpressionError("Sorry, I will not evaluate something that long.")
+    return a * b
+
+
+def _safe_lshift(a: Any, b: Any) -> Any:
+    if abs(b) > MAX_SHIFT:
+        raise ExpressionError(f"Sorry! I don't want to evaluate {a} << {b}")
+    return a << b
+
+
+_GUARDED_OPERATORS = {ast.Pow: "_safe_power", ast.Mult: "_safe_mult", ast.LShift: "_safe_lshift"}
+_NUMBER_TYPES = (int, float)
+
+
+def _build_globals() -> dict[str, Any]:
+    namespace: dict[str, Any] = {
+        "__builtins__": {},
+        "_safe_power": _safe_power,
+        "_safe_mult": _safe_mult,
+        "_safe_lshift": _safe_lshift,
+    }
+    for name, func in SAFE_FUNCTIONS.items():
+        if "." not in name:
+            namespace[name] = func
+            continue
+        head, attr = name.split(".", 1)
+        holder = namespace.setdefault(head, SimpleNamespace())
+        setattr(holder, attr, func)
+    return namespace
+
+
+@dataclass(frozen=True)
+class CompiledExpression:
+    source: str
+    code: CodeType
+    names: tuple[str, ...]
+
+    def evaluate(self, names: Mapping[str, Any]) -> Any:
+        return eval(self.code, _GLOBALS, names)  # noqa: S307 - AST validated by compile_expression
+
+
+class _Guard(ast.NodeTransformer):
+    """Route unbounded numeric/sequence operators through size-checked helpers."""
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        self.generic_visit(node)
+        helper = _GUARDED_OPERATORS.get(type(node.op))
+        if helper is None:
+            return node
+        if type(node.op) is ast.Mult and _is_number_constant(node.left) and _is_number_constant(node.right):
+            return node
+        call = ast.Call(func=ast.Name(id=helper, ctx=ast.Load()), args=[node.left, node.right], keywords=[])
+        return ast.copy_location(call, node)
+
+
+def _is_number_constant(node: ast.AST) -> bool:
+    return isinstance(node, ast.Constant) and isinstance(node.value, _NUMBER_TYPES)
+
+
+def validate_expression(expression: str) -> ast.Expression:
+    """Parse and check an expression against the evaluator whitelist."""
+    text = str(expression).strip()
+    if not text:
+        raise ExpressionError("Sorry, cannot evaluate empty string")
+    try:
+        tree = ast.parse(text, mode="eval")
+    except SyntaxError as exc:
+        raise ExpressionError(f"invalid expression syntax: {exc.msg}") from exc
+
+    for node in ast.walk(tree):
+        if not isinstance(node, ALLOWED_NODES):
+            raise ExpressionError(f"Sorry, {type(node).__name__} is not available in this evaluator")
+        if isinstance(node, ast.Name) and node.id.startswith("_"):
+            raise ExpressionError(f"Sorry, access to {node.id} is not available")
+        if isinstance(node, ast.Attribute):
+            if node.attr.startswith(DISALLOWED_ATTR_PREFIXES) or node.attr in DISALLOWED_ATTRS:
+                raise ExpressionError(f"Sorry, this attribute is not available. ({node.attr})")
+        if isinstance(node, ast.keyword) and node.arg is None:
+            raise ExpressionError("Sorry, **kwargs is not available in this evaluator")
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id not in SAFE_FUNCTIONS:
+            raise ExpressionError(f"Function '{node.func.id}' not defined")
+    return tree
+
+
+def compile_expression(expression: str) -> CompiledExpression:
+    text = str(expression)
+    return _CACHE.get_or_create(text, lambda: _compile(text))
+
+
+def expression_cache_stats() -> dict[str, Any]:
+    return _CACHE.stats()
+
+
+def _compile(expression: str) -> CompiledExpression:
+    tree = validate_expression(expression)
+
+    call_targets = {
+        id(node.func) for node in ast.walk(tree) if isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+    }
+    names: list[str] = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Name) or node.id in names:
+            continue
+        # Function calls resolve against SAFE_FUNCTIONS only, like simpleeval.
+        if id(node) in call_targets:
+            continue
+        names.append(node.id)
+
+    guarded = ast.fix_missing_locations(_Guard().visit(tree))
+    code = compile(guarded, "<protocol_expression>", "eval")
+    return CompiledExpression(source=expression, code=code, names=tuple(names))
+
+
+_GLOBALS = _build_globals()
+_CACHE: LruCache[CompiledExpression] = LruCache(EXPRESSION_CACHE_SIZE)
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, TypeVar
+
+V = TypeVar("V")
+
+
+class LruCache(Generic[V]):
+    """Bounded least-recently-used cache with hit/miss counters."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = max(int(maxsize), 1)
+        self._items: OrderedDict[Hashable, V] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], V]) -> V:
+        try:
+            value = self._items[key]
+        except KeyError:
+            self.misses += 1
+            value = factory()
+            self._items[key] = value
+            if len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+                self.evictions += 1
+            return value
+
+        self.hits += 1
+        self._items.move_to_end(key)
+        return value
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._items),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import logging
+from typing import Any, Awaitable, Callable, Hashable
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# A poll returns None, or the number of seconds to hold off (connect backoff).
+PollFunction = Callable[[], Awaitable[float | None]]
+
+# Fractional part of the golden ratio: consecutive keys land far apart on the cycle.
+PHASE_STEP = 0.6180339887498949
+
+
+class ScheduledPoll:
+    """One device's slot in the scheduler plus its timing statistics."""
+
+    def __init__(self, key: Hashable, interval: float, poll: PollFunction, endpoint: str | None, phase: float):
+        self.key = key
+        self.interval = interval
+        self.poll = poll
+        self.endpoint = endpoint
+        self.phase = phase
+        self.deadline = 0.0
+        self.generation = 0
+        self.task: asyncio.Task[None] | None = None
+        self.hold_until = 0.0
+        self.removed = False
+
+        self.polls = 0
+        self.skipped = 0
+        self.last_start: float | None = None
+        self.lag_total = 0.0
+        self.lag_max = 0.0
+        self.jitter_total = 0.0
+        self.jitter_max = 0.0
+        self.jitter_samples = 0
+        self.duration_total = 0.0
+        self.duration_last = 0.0
+
+    def record_start(self, deadline: float, started: float) -> None:
+        lag = max(started - deadline, 0.0)
+        self.lag_total += lag
+        self.lag_max = max(self.lag_max, lag)
+        if self.last_start is not None:
+            jitter = abs(started - self.last_start - self.interval)
+            # A skipped cycle is an overrun, not jitter.
+            if jitter < self.interval:
+                self.jitter_total += jitter
+                self.jitter_max = max(self.jitter_max, jitter)
+                self.jitter_samples += 1
+        self.last_start = started
+
+    def record_finish(self, duration: float) -> None:
+        self.polls += 1
+        self.duration_total += duration
+        self.duration_last = duration
+
+    def stats(self) -> dict[str, Any]:
+        polls = max(self.polls, 1)
+        samples = max(self.jitter_samples, 1)
+        return {
+            "key": self.key,
+            "endpoint": self.endpoint,
+            "interval_ms": round(self.interval * 1000, 1),
+            "polls": self.polls,
+            "skipped": self.skipped,
+            "in_flight": self.task is not None,
+            "lag_avg_ms": round(self.lag_total / polls * 1000, 2),
+            "lag_max_ms": round(self.lag_max * 1000, 2),
+            "jitter_avg_ms": round(self.jitter_total / samples * 1000, 2),
+            "jitter_max_ms": round(self.jitter_max * 1000, 2),
+            "duration_avg_ms": round(self.duration_total / polls * 1000, 2),
+            "duration_last_ms": round(self.duration_last * 1000, 2),
+        }
+
+
+class PollScheduler:
+    """Fixed-rate poll deadlines for every device in one heap, driven by a single timer.
+
+    Deadlines advance by exactly one interval per cycle, so I/O time never
+    shifts the cadence. Each device starts at its own phase inside the
+    interval. A cycle whose previous poll is still running is skipped and
+    counted instead of being queued. Concurrent polls are capped globally
+    and per endpoint (gateway / serial port).
+    """
+
+    def __init__(self, max_in_flight: int, max_per_endpoint: int):
+        self.max_in_flight = max(int(max_in_flight), 1)
+        self.max_per_endpoint = max(int(max_per_endpoint), 1)
+        self._heap: list[tuple[float, int, int, ScheduledPoll]] = []
+        self._entries: dict[Hashable, ScheduledPoll] = {}
+        self._seq = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._timer_at: float | None = None
+        self._firing = False
+        self._slots: asyncio.Semaphore | None = None
+        self._endpoint_slots: dict[str, asyncio.Semaphore] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def add(self, key: Hashable, interval: float, poll: PollFunction, endpoint: str | None = None) -> ScheduledPoll:
+        loop = self._bind_loop()
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            previous.removed = True
+        interval = max(float(interval), 0.001)
+        entry = ScheduledPoll(key, interval, poll, endpoint, phase=(_phase_seed(key) * PHASE_STEP) % 1.0)
+        self._entries[key] = entry
+        entry.deadline = loop.time() + entry.phase * interval
+        self._push(entry)
+        return entry
+
+    def reschedule(self, entry: ScheduledPoll, interval: float) -> None:
+        """Change the interval in place; the next poll is due one new interval after the last slot."""
+        interval = max(float(interval), 0.001)
+        if entry.removed or interval == entry.interval:
+            return
+        assert self._loop is not None
+        last_slot = entry.deadline - entry.interval
+        entry.interval = interval
+        entry.last_start = None
+        entry.deadline = max(last_slot + interval, self._loop.time())
+        # The old heap item is skipped by its stale generation.
+        self._push(entry)
+
+    async def remove(self, entry: ScheduledPoll) -> None:
+        entry.removed = True
+        if self._entries.get(entry.key) is entry:
+            del self._entries[entry.key]
+        task = entry.task
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            except Exception as exc:  # pragma: no cover
+                logger.exception("Poll cancellation failed: %s", exc)
+
+    def stats(self) -> dict[str, Any]:
+        in_flight = sum(1 for entry in self._entries.values() if entry.task is not None)
+        endpoints: dict[str, int] = {}
+        for entry in self._entries.values():
+            if entry.task is not None and entry.endpoint is not None:
+                endpoints[entry.endpoint] = endpoints.get(entry.endpoint, 0) + 1
+        return {
+            "devices": len(self._entries),
+            "in_flight": in_flight,
+            "max_in_flight": self.max_in_flight,
+            "max_per_endpoint": self.max_per_endpoint,
+            "in_flight_by_endpoint": endpoints,
+            "skipped": sum(entry.skipped for entry in self._entries.values()),
+            "entries": [entry.stats() for entry in self._entries.values()],
+        }
+
+    def _bind_loop(self) -> asyncio.AbstractEventLoop:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Started again in a new event loop (tests, tools): drop loop-bound state.
+            self._loop = loop
+            self._heap.clear()
+            self._entries.clear()
+            self._timer = None
+            self._timer_at = None
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+            self._endpoint_slots.clear()
+        return loop
+
+    def _push(self, entry: ScheduledPoll) -> None:
+        entry.generation += 1
+        self._seq += 1
+        heapq.heappush(self._heap, (entry.deadline, self._seq, entry.generation, entry))
+        if not self._firing and (self._timer_at is None or entry.deadline < self._timer_at):
+            self._arm(entry.deadline)
+
+    def _arm(self, when: float) -> None:
+        assert self._loop is not None
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = self._loop.call_at(when, self._fire)
+        self._timer_at = when
+
+    def _fire(self) -> None:
+        assert self._loop is not None
+        self._timer = None
+        self._timer_at = None
+        now = self._loop.time()
+        heap = self._heap
+        self._firing = True
+        try:
+            while heap and heap[0][0] <= now:
+                deadline, _, generation, entry = heapq.heappop(heap)
+                if entry.removed or generation != entry.generation:
+                    continue
+                if entry.task is not None:
+                    # Previous poll still running: skip this cycle rather than queue another.
+                    entry.skipped += 1
+                elif now >= entry.hold_until:
+                    entry.task = self._loop.create_task(self._run(entry, deadline))
+                self._advance(entry, deadline, now)
+        finally:
+            self._firing = False
+        if heap:
+            self._arm(heap[0][0])
+
+    def _advance(self, entry: ScheduledPoll, deadline: float, now: float) -> None:
+        next_deadline = deadline + entry.interval
+        if next_deadline <= now:
+            # The loop stalled for whole intervals: drop those slots, keep the phase.
+            missed = int((now - next_deadline) // entry.interval) + 1
+            entry.skipped += missed
+            next_deadline += missed * entry.interval
+        entry.deadline = next_deadline
+        self._push(entry)
+
+    async def _run(self, entry: ScheduledPoll, deadline: float) -> None:
+        assert self._loop is not None and self._slots is not None
+        endpoint_slots = None
+        if entry.endpoint is not None:
+            endpoint_slots = self._endpoint_slots.get(entry.endpoint)
+            if endpoint_slots is None:
+                endpoint_slots = asyncio.Semaphore(self.max_per_endpoint)
+                self._endpoint_slots[entry.endpoint] = endpoint_slots
+        try:
+            # Endpoint first: polls queued behind one busy gateway must not hold global slots.
+            if endpoint_slots is not None:
+                await endpoint_slots.acquire()
+            try:
+                async with self._slots:
+                    started = self._loop.time()
+                    entry.record_start(deadline, started)
+                    hold = await entry.poll()
+                    finished = self._loop.time()
+                    entry.record_finish(finished - started)
+                    if hold:
+                        entry.hold_until = finished + hold
+            finally:
+                if endpoint_slots is not None:
+                    endpoint_slots.release()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Scheduled poll %s failed", entry.key)
+        finally:
+            entry.task = None
+
+
+def _phase_seed(key: Hashable) -> int:
+    return key if isinstance(key, int) else hash(key) & 0xFFFFFFFF
+
+
+poll_scheduler = PollScheduler(settings.poll_max_in_flight, settings.poll_max_per_endpoint)
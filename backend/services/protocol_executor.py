@@ -1,112 +1,113 @@
 from __future__ import annotations
 
-import re
-import struct
-from typing import Any
-
-from simpleeval import simple_eval
-
-
-SAFE_FUNCTIONS = {
-    "int": int,
-    "float": float,
-    "str": str,
-    "abs": abs,
-    "round": round,
-    "min": min,
-    "max": max,
-    "len": len,
-}
-
-# 添加 JSON 解析支持
-def _json_loads(s: str) -> Any:
-    import json
-    return json.loads(s)
-
-def _json_get(obj: dict, key: str, default: Any = None) -> Any:
-    return obj.get(key, default)
-
-SAFE_FUNCTIONS["json.loads"] = _json_loads
-SAFE_FUNCTIONS["json.get"] = _json_get
-SAFE_FUNCTIONS["json.loads"] = _json_loads
+import asyncio
+import json
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Mapping
+
+from backend.services.codec_cache import compile_pattern, get_struct
+from backend.services.expression_compiler import SAFE_FUNCTIONS, compile_expression
+from backend.services.lru_cache import LruCache
+from backend.services.record_batch import Record, split_records
+from backend.services.register_codec import decode_registers
+from backend.services.template_compiler import (
+    COALESCIBLE_READ_ACTIONS,
+    CompiledStep,
+    CompiledTemplate,
+    compile_step,
+    compile_template,
+)
+
+__all__ = ["ProtocolExecutor", "SAFE_FUNCTIONS"]
+
+# Batch payloads recently split into records; one MQTT message reaches every device subscribed to it.
+RECORD_GROUP_CACHE_SIZE = 32
 
 
 class ProtocolExecutor:
-    PLACEHOLDER_PATTERN = re.compile(r"\$\{([^}]+)\}")
+    def __init__(self) -> None:
+        self._record_groups: LruCache[tuple[bytes | str, dict[str | None, list[Record]]]] = LruCache(
+            RECORD_GROUP_CACHE_SIZE
+        )
+
+    def compile(self, template: dict[str, Any] | CompiledTemplate) -> CompiledTemplate:
+        if isinstance(template, CompiledTemplate):
+            return template
+        return compile_template(template)
 
     async def run_setup_steps(
         self,
-        template: dict[str, Any],
+        template: dict[str, Any] | CompiledTemplate,
         driver,
         variables: dict[str, Any],
     ) -> dict[str, Any]:
+        plan = self.compile(template)
         context = {"steps": {}, **variables}
-        for step in template.get("setup_steps", []):
+        for step in plan.setup_steps:
             result = await self._execute_step(driver, step, context)
-            context["steps"][step["id"]] = {"result": result}
+            context["steps"][step.id] = {"result": result}
         return context["steps"]
 
     async def run_poll_steps(
         self,
-        template: dict[str, Any],
+        template: dict[str, Any] | CompiledTemplate,
         driver,
         variables: dict[str, Any],
         previous_steps: dict[str, Any] | None = None,
     ) -> dict[str, Any]:
+        plan = self.compile(template)
         steps_results = previous_steps.copy() if previous_steps else {}
         context: dict[str, Any] = {"steps": steps_results, **variables}
-        for step in template.get("steps", []):
-            trigger = step.get("trigger", "poll")
-            if trigger != "poll":
-                continue
-            result = await self._execute_step(driver, step, context)
-            context["steps"][step["id"]] = {"result": result}
+        pipelined = driver is not None and driver.supports_pipelining()
+        groups = plan.poll_waves if pipelined and plan.has_parallel_waves else plan.poll_runs
+        coalesce = plan.coalesce if driver is not None and driver.supports_read_coalescing() else None
+        for group in groups:
+            results = await self._execute_group(driver, group, context, coalesce, concurrent=pipelined)
+            for step, result in zip(group, results):
+                context["steps"][step.id] = {"result": result}
         return context["steps"]
 
     async def run_manual_step(
         self,
-        template: dict[str, Any],
+        template: dict[str, Any] | CompiledTemplate,
         driver,
         step_id: str,
         variables: dict[str, Any],
         params_override: dict[str, Any] | None = None,
         previous_steps: dict[str, Any] | None = None,
     ) -> dict[str, Any]:
+        plan = self.compile(template)
         context: dict[str, Any] = {
             "steps": previous_steps.copy() if previous_steps else {},
             **variables,
         }
 
-        target = None
-        for step in template.get("steps", []):
-            if step.get("id") == step_id:
-                target = step
-                break
-
+        target = plan.steps_by_id.get(step_id)
         if target is None:
             raise ValueError(f"Step not found: {step_id}")
 
-        if target.get("trigger", "poll") != "manual":
+        if target.trigger != "manual":
             raise PermissionError(f"Step is not manual trigger: {step_id}")
 
         result = await self._execute_step(driver, target, context, params_override=params_override)
-        context["steps"][target["id"]] = {"result": result}
+        context["steps"][target.id] = {"result": result}
         return {
-            "step_id": target["id"],
+            "step_id": target.id,
             "result": result,
-            "output": self.render_output(template, context),
+            "output": self.render_output(plan, context),
         }
 
     async def run_message_handler(
         self,
-        template: dict[str, Any],
+        template: dict[str, Any] | CompiledTemplate,
         driver,
         payload: bytes,
         variables: dict[str, Any],
         previous_steps: dict[str, Any] | None = None,
     ) -> tuple[dict[str, Any], dict[str, Any]]:
-        handler = template.get("message_handler")
-        if not handler:
+        plan = self.compile(template)
+        handler = plan.message_handler
+        if handler is None:
             raise ValueError("Template has no message_handler")
 
         text_payload = payload.decode("utf-8", errors="ignore") if isinstance(payload, bytes) else str(payload)
@@ -120,45 +121,168 @@ class ProtocolExecutor:
         # mqtt.on_message is logical action, result comes from parse payload.
         result = await self._execute_step(driver, handler, context, skip_driver=True)
         context["message_handler"] = {"result": result}
-        return context["steps"], self.render_output(template, context)
+        return context["steps"], self.render_output(plan, context)
 
-    def render_output(self, template: dict[str, Any], context: dict[str, Any]) -> dict[str, Any]:
-        output = template.get("output", {})
-        return self._resolve_value(output, context)
+    async def run_message_batch(
+        self,
+        template: dict[str, Any] | CompiledTemplate,
+        payload: bytes,
+        variables: dict[str, Any],
+        key: str | None = None,
+        previous_steps: dict[str, Any] | None = None,
+    ) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+        """Parse the records of a batch payload that belong to ``key``; one output per record.
+
+        Without ``key_field`` every record belongs to the receiving device.
+        """
+        plan = self.compile(template)
+        handler = plan.message_handler
+        batch = plan.message_batch
+        if handler is None or batch is None:
+            raise ValueError("Template has no batch message_handler")
+
+        records = self.record_groups(plan, payload).get(key if batch.key_field else None, [])
+        steps = previous_steps.copy() if previous_steps else {}
+        context: dict[str, Any] = {"payload": "", "record": None, "steps": steps, **variables}
+        parse = handler.parse
+        needs_text = parse is not None and (
+            parse.get("type") != "expression" or "payload" in compile_expression(parse.get("expression", "")).names
+        )
+        outputs: list[dict[str, Any]] = []
+        for text, record in records:
+            if needs_text and text is None:
+                text = record if isinstance(record, str) else json.dumps(record, ensure_ascii=False)
+            context["payload"] = text
+            context["record"] = record
+            result = self._finish_step(handler, {"payload": text, "record": record}, context) if parse else record
+            context["message_handler"] = {"result": result}
+            outputs.append(plan.output.render(context))
+        return steps, outputs
+
+    def record_groups(self, template: dict[str, Any] | CompiledTemplate, payload: bytes | str) -> dict[str | None, list[Record]]:
+        plan = self.compile(template)
+        if plan.message_batch is None:
+            raise ValueError("Template has no batch message_handler")
+        batch = plan.message_batch
+        # Keyed by identity: the cached entry keeps the payload alive, so its id cannot be reused.
+        cached = self._record_groups.get_or_create((id(payload), batch), lambda: (payload, split_records(batch, payload)))
+        return cached[1]
+
+    def render_output(self, template: dict[str, Any] | CompiledTemplate, context: dict[str, Any]) -> dict[str, Any]:
+        return self.compile(template).output.render(context)
 
     async def execute_one_step(
         self,
         driver,
-        step: dict[str, Any],
+        step: dict[str, Any] | CompiledStep,
         context: dict[str, Any],
         params_override: dict[str, Any] | None = None,
         skip_driver: bool = False,
     ) -> Any:
         return await self._execute_step(
             driver=driver,
-            step=step,
+            step=step if isinstance(step, CompiledStep) else compile_step(step),
             context=context,
             params_override=params_override,
             skip_driver=skip_driver,
         )
 
+    async def _execute_group(
+        self,
+        driver,
+        steps: tuple[CompiledStep, ...],
+        context: dict[str, Any],
+        coalesce: Mapping[str, int] | None,
+        concurrent: bool,
+    ) -> list[Any]:
+        """Execute mutually independent steps, merging adjacent register reads."""
+        if len(steps) == 1:
+            return [await self._execute_step(driver, steps[0], context)]
+
+        blocks: list[_ReadBlock] = []
+        singles = list(range(len(steps)))
+        if coalesce:
+            blocks, singles = _plan_read_blocks(steps, context, coalesce)
+
+        jobs: list[tuple[int, Awaitable[list[tuple[int, Any]]]]] = [
+            (index, self._execute_indexed(driver, steps, index, context)) for index in singles
+        ]
+        jobs.extend((block.members[0][0], self._execute_read_block(driver, steps, block, context)) for block in blocks)
+        jobs.sort(key=lambda job: job[0])
+
+        results: list[Any] = [None] * len(steps)
+        if concurrent:
+            tasks = [asyncio.ensure_future(job) for _, job in jobs]
+            try:
+                outcomes = await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+        else:
+            outcomes = []
+            for position, (_, job) in enumerate(jobs):
+                try:
+                    outcomes.append(await job)
+                except BaseException:
+                    for _, pending in jobs[position + 1 :]:
+                        pending.close()
+                    raise
+
+        for outcome in outcomes:
+            for index, result in outcome:
+                results[index] = result
+        return results
+
+    async def _execute_indexed(
+        self,
+        driver,
+        steps: tuple[CompiledStep, ...],
+        index: int,
+        context: dict[str, Any],
+    ) -> list[tuple[int, Any]]:
+        return [(index, await self._execute_step(driver, steps[index], context))]
+
+    async def _execute_read_block(
+        self,
+        driver,
+        steps: tuple[CompiledStep, ...],
+        block: _ReadBlock,
+        context: dict[str, Any],
+    ) -> list[tuple[int, Any]]:
+        raw_result = await driver.execute_action(
+            block.action,
+            {"slave_id": block.slave_id, "address": block.start, "count": block.end - block.start},
+        )
+        registers = raw_result.get("registers", []) if isinstance(raw_result, dict) else []
+        if len(registers) < block.end - block.start:
+            raise ValueError(
+                f"Modbus read at {block.start} returned {len(registers)} registers, expected {block.end - block.start}"
+            )
+        results: list[tuple[int, Any]] = []
+        for index, address, count in block.members:
+            offset = address - block.start
+            member_result = {"registers": registers[offset : offset + count]}
+            results.append((index, self._finish_step(steps[index], member_result, context)))
+        return results
+
     async def _execute_step(
         self,
         driver,
-        step: dict[str, Any],
+        step: CompiledStep,
         context: dict[str, Any],
         params_override: dict[str, Any] | None = None,
         skip_driver: bool = False,
     ) -> Any:
-        action = step.get("action", "")
-        params = self._resolve_value(step.get("params", {}), context)
+        action = step.action
+        params = step.params.render(context)
         if params_override:
-            params.update(params_override)
+            # Constant params are shared by the plan, never update them in place.
+            params = {**params, **params_override}
 
         if action == "delay":
             delay_ms = int(params.get("milliseconds", 0))
-            import asyncio
-
             await asyncio.sleep(delay_ms / 1000)
             raw_result: Any = {"delayed_ms": delay_ms}
         elif action.startswith("transform."):
@@ -168,70 +292,57 @@ class ProtocolExecutor:
         else:
             raw_result = await driver.execute_action(action, params)
 
-        parse_config = step.get("parse")
-        if parse_config:
-            return self._parse_result(parse_config, raw_result, context)
+        return self._finish_step(step, raw_result, context)
+
+    def _finish_step(self, step: CompiledStep, raw_result: Any, context: dict[str, Any]) -> Any:
+        if step.parse:
+            return self._parse_result(step.parse, raw_result, context)
         return raw_result
 
     def _run_transform(self, action: str, params: dict[str, Any]) -> Any:
         source = params.get("input", "")
-        text = source.decode("utf-8", errors="ignore") if isinstance(source, bytes) else str(source)
 
         if action == "transform.base64_decode":
             import base64
 
-            return base64.b64decode(text)
+            return base64.b64decode(_to_text(source))
         if action == "transform.hex_decode":
-            cleaned = text.replace(" ", "")
+            cleaned = _to_text(source).replace(" ", "")
             return bytes.fromhex(cleaned)
         if action == "transform.regex_extract":
-            match = re.search(params.get("pattern", ""), text)
-            if not match:
-                return None
-            group = int(params.get("group", 1))
-            return match.group(group)
+            return _regex_extract(params, source)
         if action == "transform.substring":
+            text = _to_text(source)
             start = int(params.get("start", 0))
             end = int(params.get("end", len(text)))
             return text[start:end]
+        if action == "transform.registers_decode":
+            return decode_registers(_registers_of(source), params)
         if action == "transform.struct_parse":
-            fmt = str(params.get("format", ""))
-            raw = source if isinstance(source, bytes) else str(source).encode("utf-8")
-            fields = params.get("fields", [])
-            unpacked = struct.unpack(fmt, raw)
-            if fields:
-                return {fields[i]: unpacked[i] for i in range(min(len(fields), len(unpacked)))}
-            return list(unpacked)
+            raw = source if isinstance(source, (bytes, bytearray)) else str(source).encode("utf-8")
+            return _struct_unpack(params, raw)
 
         raise ValueError(f"Unsupported transform action: {action}")
 
     def _parse_result(
         self,
-        parse_config: dict[str, Any],
+        parse_config: Mapping[str, Any],
         raw_result: Any,
         context: dict[str, Any],
     ) -> Any:
         parse_type = parse_config.get("type")
 
         if parse_type == "expression":
-            names = {
-                "registers": raw_result.get("registers", []) if isinstance(raw_result, dict) else [],
-                "coils": raw_result.get("coils", []) if isinstance(raw_result, dict) else [],
-                "payload": self._extract_payload(raw_result),
-                "steps": context.get("steps", {}),
-                "float": float,
-                "int": int,
-                "str": str,
-            }
-            names.update(context)
-            return simple_eval(parse_config.get("expression", ""), names=names, functions=SAFE_FUNCTIONS)
+            compiled = compile_expression(parse_config.get("expression", ""))
+            return compiled.evaluate(self._expression_names(compiled.names, raw_result, context))
+
+        if parse_type == "registers":
+            return decode_registers(_registers_of(raw_result), parse_config)
 
         if parse_type == "regex":
-            text = self._extract_payload(raw_result)
-            match = re.search(parse_config.get("pattern", ""), text)
-            if not match:
-                return None
-            return match.group(int(parse_config.get("group", 1)))
+            if parse_config.get("bytes"):
+                return _regex_extract(parse_config, self._extract_payload_bytes(raw_result))
+            return _regex_extract(parse_config, self._extract_payload(raw_result))
 
         if parse_type == "substring":
             text = self._extract_payload(raw_result)
@@ -240,17 +351,40 @@ class ProtocolExecutor:
             return text[start:end]
 
         if parse_type == "struct":
-            fmt = parse_config.get("format", "")
-            fields = parse_config.get("fields", [])
             source = raw_result.get("payload", b"") if isinstance(raw_result, dict) else b""
-            payload = source if isinstance(source, bytes) else str(source).encode("utf-8")
-            unpacked = struct.unpack(fmt, payload)
-            if fields:
-                return {fields[i]: unpacked[i] for i in range(min(len(fields), len(unpacked)))}
-            return list(unpacked)
+            payload = source if isinstance(source, (bytes, bytearray)) else str(source).encode("utf-8")
+            return _struct_unpack(parse_config, payload)
 
         raise ValueError(f"Unsupported parse type: {parse_type}")
 
+    def _expression_names(
+        self,
+        names: tuple[str, ...],
+        raw_result: Any,
+        context: dict[str, Any],
+    ) -> dict[str, Any]:
+        # Only the names the expression actually references are materialised;
+        # template context wins over the raw driver result, as before.
+        scope: dict[str, Any] = {}
+        for name in names:
+            if name in context:
+                scope[name] = context[name]
+            elif name == "registers":
+                scope[name] = raw_result.get("registers", []) if isinstance(raw_result, dict) else []
+            elif name == "coils":
+                scope[name] = raw_result.get("coils", []) if isinstance(raw_result, dict) else []
+            elif name == "payload":
+                scope[name] = self._extract_payload(raw_result)
+            elif name == "steps":
+                scope[name] = {}
+        return scope
+
+    def _extract_payload_bytes(self, raw_result: Any) -> bytes:
+        payload = raw_result.get("payload") if isinstance(raw_result, dict) else raw_result
+        if isinstance(payload, (bytes, bytearray)):
+            return payload
+        return self._extract_payload(raw_result).encode("utf-8")
+
     def _extract_payload(self, raw_result: Any) -> str:
         if isinstance(raw_result, dict):
             payload = raw_result.get("payload")
@@ -262,33 +396,94 @@ class ProtocolExecutor:
             return raw_result.decode("utf-8", errors="ignore")
         return str(raw_result)
 
-    def _resolve_value(self, value: Any, context: dict[str, Any]) -> Any:
-        if isinstance(value, dict):
-            return {k: self._resolve_value(v, context) for k, v in value.items()}
-        if isinstance(value, list):
-            return [self._resolve_value(item, context) for item in value]
-        if not isinstance(value, str):
-            return value
-
-        matches = self.PLACEHOLDER_PATTERN.findall(value)
-        if not matches:
-            return value
-
-        # Full-string placeholder: return original type if possible.
-        if value.strip() == "${" + matches[0] + "}" and len(matches) == 1:
-            return self._get_from_context(matches[0], context)
-
-        rendered = value
-        for path in matches:
-            resolved = self._get_from_context(path, context)
-            rendered = rendered.replace("${" + path + "}", "" if resolved is None else str(resolved))
-        return rendered
-
-    def _get_from_context(self, path: str, context: dict[str, Any]) -> Any:
-        current: Any = context
-        for part in path.split("."):
-            if isinstance(current, dict):
-                current = current.get(part)
+
+@dataclass
+class _ReadBlock:
+    action: str
+    slave_id: int
+    start: int
+    end: int
+    members: list[tuple[int, int, int]] = field(default_factory=list)
+
+
+def _plan_read_blocks(
+    steps: tuple[CompiledStep, ...],
+    context: dict[str, Any],
+    coalesce: Mapping[str, int],
+) -> tuple[list[_ReadBlock], list[int]]:
+    """Merge register reads on the same slave that are contiguous or within max_gap."""
+    singles: list[int] = []
+    reads: dict[tuple[str, int], list[tuple[int, int, int]]] = {}
+    for index, step in enumerate(steps):
+        if step.action not in COALESCIBLE_READ_ACTIONS:
+            singles.append(index)
+            continue
+        params = step.params.render(context)
+        try:
+            slave_id = int(params.get("slave_id", 1))
+            address = int(params.get("address", 0))
+            count = int(params.get("count", 2))
+        except (TypeError, ValueError):
+            singles.append(index)
+            continue
+        reads.setdefault((step.action, slave_id), []).append((address, count, index))
+
+    max_gap = coalesce["max_gap"]
+    max_registers = coalesce["max_registers"]
+    blocks: list[_ReadBlock] = []
+    for (action, slave_id), items in reads.items():
+        current: _ReadBlock | None = None
+        for address, count, index in sorted(items):
+            end = address + count
+            if (
+                current is not None
+                and address <= current.end + max_gap
+                and max(current.end, end) - current.start <= max_registers
+            ):
+                current.end = max(current.end, end)
+                current.members.append((index, address, count))
                 continue
-            return None
-        return current
+            current = _ReadBlock(action, slave_id, address, end, [(index, address, count)])
+            blocks.append(current)
+
+    merged = [block for block in blocks if len(block.members) > 1]
+    singles.extend(block.members[0][0] for block in blocks if len(block.members) == 1)
+    return merged, sorted(singles)
+
+
+def _to_text(source: Any) -> str:
+    return source.decode("utf-8", errors="ignore") if isinstance(source, (bytes, bytearray)) else str(source)
+
+
+def _registers_of(source: Any) -> list[int]:
+    if isinstance(source, dict):
+        return source.get("registers", [])
+    if isinstance(source, (list, tuple)):
+        return source
+    raise ValueError("registers decoding expects a register list or a modbus read result")
+
+
+def _regex_extract(config: Mapping[str, Any], source: Any) -> Any:
+    # bytes=true matches the raw frame without decoding it first; only the
+    # captured group is decoded so results keep the same type as text mode.
+    binary = bool(config.get("bytes")) and isinstance(source, (bytes, bytearray))
+    pattern = compile_pattern(config.get("pattern", ""), binary=binary)
+    match = pattern.search(source if binary else _to_text(source))
+    if not match:
+        return None
+    value = match.group(int(config.get("group", 1)))
+    if binary and value is not None:
+        return value.decode("utf-8", errors="ignore")
+    return value
+
+
+def _struct_unpack(config: Mapping[str, Any], raw: bytes) -> Any:
+    unpacker = get_struct(config.get("format", ""))
+    if "offset" in config:
+        unpacked = unpacker.unpack_from(raw, int(config.get("offset") or 0))
+    else:
+        unpacked = unpacker.unpack(raw)
+    fields = config.get("fields", [])
+    if fields:
+        return {fields[i]: unpacked[i] for i in range(min(len(fields), len(unpacked)))}
+    return list(unpacked)
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Mapping
+
+from backend.services.template_compiler import CompiledTemplate, PublishPolicy, parse_publish_policy
+
+
+class PublishGate:
+    """Report-by-exception filter in front of `EventBus.publish` for one device.
+
+    Status, unit, error and stability changes always go out. A weight change
+    goes out only once it leaves the deadband around the last *published*
+    weight, so slow drift still gets reported. `heartbeat` bounds how long a
+    device can stay silent. Without a policy every message is published.
+    """
+
+    def __init__(self, policy: PublishPolicy | None = None):
+        self.policy = policy
+        self.published = 0
+        self.suppressed = 0
+        self._last: Mapping[str, Any] | None = None
+        self._last_at = 0.0
+
+    def admit(self, message: Mapping[str, Any], now: float | None = None) -> bool:
+        now = time.monotonic() if now is None else now
+        if self._changed(message, now):
+            self._last = message
+            self._last_at = now
+            self.published += 1
+            return True
+        self.suppressed += 1
+        return False
+
+    def stats(self) -> dict[str, Any]:
+        policy = self.policy
+        return {
+            "published": self.published,
+            "suppressed": self.suppressed,
+            "deadband_abs": policy.deadband_abs if policy else None,
+            "deadband_percent": policy.deadband_percent if policy else None,
+            "heartbeat": policy.heartbeat if policy else None,
+        }
+
+    def _changed(self, message: Mapping[str, Any], now: float) -> bool:
+        policy = self.policy
+        last = self._last
+        if policy is None or last is None:
+            return True
+        if (
+            message["status"] != last["status"]
+            or message["unit"] != last["unit"]
+            or message["error"] != last["error"]
+            or message["stable"] != last["stable"]
+        ):
+            return True
+        if policy.heartbeat is not None and now - self._last_at >= policy.heartbeat:
+            return True
+        weight = message["weight"]
+        previous = last["weight"]
+        if weight is None or previous is None:
+            return weight is not previous
+        band = max(policy.deadband_abs, abs(previous) * policy.deadband_percent / 100)
+        return abs(weight - previous) > band
+
+
+def resolve_publish_policy(plan: CompiledTemplate, runtime_options: Mapping[str, Any] | None) -> PublishPolicy | None:
+    """The template's `publish_policy`, with keys from the device's `runtime_options.publish_policy` on top."""
+    override = (runtime_options or {}).get("publish_policy")
+    if not isinstance(override, dict):
+        return plan.publish_policy
+    base = plan.source.get("publish_policy")
+    return parse_publish_policy({**(base if isinstance(base, dict) else {}), **override})
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from backend.services.template_compiler import MessageBatch
+
+# (record text if the payload carried it, decoded record)
+Record = tuple[str | None, Any]
+
+
+def split_records(batch: MessageBatch, payload: bytes | str) -> dict[str | None, list[Record]]:
+    """Decode a batch payload once and group its records by `key_field` (``None`` without one).
+
+    Records that lack the key field are skipped: they belong to no device.
+    """
+    if batch.format == "ndjson":
+        text = payload.decode("utf-8", errors="ignore") if isinstance(payload, bytes) else str(payload)
+        items: list[Record] = []
+        for line in text.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                items.append((line, json.loads(line)))
+            except ValueError:
+                items.append((line, line))
+    else:
+        records = _resolve(json.loads(payload), batch.records_path)
+        if not isinstance(records, list):
+            path = ".".join(batch.records_path) or "payload"
+            raise ValueError(f"batch records_path {path!r} is not a JSON array")
+        items = [(None, record) for record in records]
+
+    key_field = batch.key_field
+    grouped: dict[str | None, list[Record]] = {}
+    for item in items:
+        key = None
+        if key_field:
+            record = item[1]
+            value = record.get(key_field) if isinstance(record, dict) else None
+            if value is None:
+                continue
+            key = str(value)
+        grouped.setdefault(key, []).append(item)
+    return grouped
+
+
+def _resolve(document: Any, path: tuple[str, ...]) -> Any:
+    for part in path:
+        if isinstance(document, dict):
+            document = document.get(part)
+        elif isinstance(document, list) and part.isdigit() and int(part) < len(document):
+            document = document[int(part)]
+        else:
+            return None
+    return document
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import struct
+from typing import Any, Mapping, Sequence
+
+from backend.services.codec_cache import get_struct
+
+# dtype -> (struct code, registers per value)
+REGISTER_DTYPES: dict[str, tuple[str, int]] = {
+    "int16": ("h", 1),
+    "uint16": ("H", 1),
+    "int32": ("i", 2),
+    "uint32": ("I", 2),
+    "float32": ("f", 2),
+    "int64": ("q", 4),
+    "uint64": ("Q", 4),
+    "float64": ("d", 4),
+}
+
+# Common manual notation -> (word_order, byte_order)
+REGISTER_ORDERS: dict[str, tuple[str, str]] = {
+    "ABCD": ("big", "big"),
+    "CDAB": ("little", "big"),
+    "BADC": ("big", "little"),
+    "DCBA": ("little", "little"),
+}
+
+_ORDER_VALUES = {"big", "little"}
+
+
+def decode_registers(registers: Sequence[int], config: Mapping[str, Any]) -> Any:
+    """Decode one value, a run of values, or named fields from a register block.
+
+    The block is packed into bytes at most twice (once per word layout) and
+    every field is then a single ``Struct.unpack_from`` at its register index.
+    """
+    buffers: dict[bool, bytes] = {}
+    fields = config.get("fields")
+    if fields:
+        result: dict[str, Any] = {}
+        for position, field in enumerate(fields):
+            merged = {**_inherited(config), **field}
+            name = str(field.get("name") or f"value{position}")
+            result[name] = _decode_field(registers, merged, buffers)
+        return result
+    return _decode_field(registers, config, buffers)
+
+
+def _inherited(config: Mapping[str, Any]) -> dict[str, Any]:
+    return {
+        key: config[key]
+        for key in ("dtype", "order", "word_order", "byte_order", "scale", "offset", "decimals")
+        if key in config
+    }
+
+
+def _decode_field(registers: Sequence[int], config: Mapping[str, Any], buffers: dict[bool, bytes]) -> Any:
+    dtype = str(config.get("dtype", "uint16")).lower()
+    try:
+        code, width = REGISTER_DTYPES[dtype]
+    except KeyError:
+        raise ValueError(f"Unsupported register dtype: {dtype}") from None
+
+    word_order, byte_order = _orders(config)
+    index = int(config.get("index", 0))
+    count = int(config.get("count", 1))
+
+    # Packing each register big-endian when word and byte order agree (ABCD/DCBA)
+    # and little-endian otherwise (CDAB/BADC) turns every layout into a plain
+    # big/little-endian read of the whole value.
+    swapped = word_order != byte_order
+    buffer = buffers.get(swapped)
+    if buffer is None:
+        buffer = _pack_block(registers, "<" if swapped else ">")
+        buffers[swapped] = buffer
+
+    endian = ">" if word_order == "big" else "<"
+    unpacker = get_struct(f"{endian}{count}{code}")
+    try:
+        values = unpacker.unpack_from(buffer, index * 2)
+    except struct.error:
+        raise ValueError(
+            f"{dtype} x{count} at register index {index} needs {index + width * count} registers, "
+            f"got {len(registers)}"
+        ) from None
+
+    scale = config.get("scale", 1)
+    offset = config.get("offset", 0)
+    decimals = config.get("decimals")
+    if scale != 1 or offset != 0 or decimals is not None:
+        values = tuple(_scaled(value, scale, offset, decimals) for value in values)
+
+    if "count" in config:
+        return list(values)
+    return values[0]
+
+
+def _orders(config: Mapping[str, Any]) -> tuple[str, str]:
+    order = config.get("order")
+    if order:
+        try:
+            return REGISTER_ORDERS[str(order).upper()]
+        except KeyError:
+            raise ValueError(f"Unsupported register order: {order}") from None
+
+    word_order = str(config.get("word_order", "big")).lower()
+    byte_order = str(config.get("byte_order", "big")).lower()
+    if word_order not in _ORDER_VALUES or byte_order not in _ORDER_VALUES:
+        raise ValueError("word_order/byte_order must be 'big' or 'little'")
+    return word_order, byte_order
+
+
+def _pack_block(registers: Sequence[int], endian: str) -> bytes:
+    packer = get_struct(f"{endian}{len(registers)}H")
+    try:
+        return packer.pack(*registers)
+    except struct.error:
+        return packer.pack(*(int(value) & 0xFFFF for value in registers))
+
+
+def _scaled(value: Any, scale: Any, offset: Any, decimals: Any) -> Any:
+    scaled = value * float(scale) + float(offset)
+    if decimals is not None:
+        return round(scaled, int(decimals))
+    return scaled
@@ -5,6 +5,8 @@ from datetime import datetime, timezone
 from collections import deque
 from typing import Any
 
+from backend.drivers.serial_transport import AsyncSerialPort
+
 try:
     import serial
     from serial.tools import list_ports
@@ -23,7 +25,7 @@ LINE_ENDING_MAP = {
 
 class SerialDebugService:
     def __init__(self) -> None:
-        self._ser = None
+        self._port: AsyncSerialPort | None = None
         self._lock = asyncio.Lock()
         self._last_error: str | None = None
         self._settings: dict[str, Any] = {}
@@ -65,7 +67,7 @@ class SerialDebugService:
         async with self._lock:
             await self._close_unlocked()
             try:
-                self._ser = serial.Serial(
+                self._port = await AsyncSerialPort.open(
                     port=port,
                     baudrate=baudrate,
                     bytesize=bytesize,
@@ -73,8 +75,7 @@ class SerialDebugService:
                     stopbits=stopbits,
                     timeout=max(timeout_ms, 1) / 1000,
                 )
-                self._ser.reset_input_buffer()
-                self._ser.reset_output_buffer()
+                self._port.reset_buffers()
                 self._settings = {
                     "port": port,
                     "baudrate": baudrate,
@@ -90,7 +91,7 @@ class SerialDebugService:
                     display_text=f"Connected: {port} {baudrate}/{bytesize}/{parity}/{stopbits}",
                 )
             except Exception as exc:
-                self._ser = None
+                self._port = None
                 self._last_error = str(exc)
                 self._append_log(direction="ERR", payload=b"", display_text=f"Open failed: {exc}")
                 raise RuntimeError(f"open failed: {exc}") from exc
@@ -108,7 +109,7 @@ class SerialDebugService:
 
     async def send(self, *, data: str, data_format: str, encoding: str, line_ending: str) -> dict[str, Any]:
         async with self._lock:
-            ser = self._ensure_connected_unlocked()
+            port = self._ensure_connected_unlocked()
 
             payload = self._build_payload(
                 data=str(data),
@@ -116,8 +117,8 @@ class SerialDebugService:
                 encoding=str(encoding),
                 line_ending=str(line_ending),
             )
-            sent = ser.write(payload)
-            ser.flush()
+            sent = await port.write(payload)
+            await port.drain()
             self._append_log(direction="TX", payload=payload, display_text=self._render_payload_text(payload, encoding))
             return {
                 "ok": True,
@@ -131,25 +132,8 @@ class SerialDebugService:
             raise ValueError("max_bytes must be > 0")
 
         async with self._lock:
-            ser = self._ensure_connected_unlocked()
-
-            original_timeout = ser.timeout
-            payload = b""
-            try:
-                ser.timeout = max(timeout_ms, 0) / 1000
-                in_waiting = int(getattr(ser, "in_waiting", 0) or 0)
-                if in_waiting > 0:
-                    payload = ser.read(min(max_bytes, in_waiting))
-                else:
-                    payload = ser.read(1)
-
-                if payload and len(payload) < max_bytes:
-                    remaining = max_bytes - len(payload)
-                    more_waiting = int(getattr(ser, "in_waiting", 0) or 0)
-                    if more_waiting > 0:
-                        payload += ser.read(min(remaining, more_waiting))
-            finally:
-                ser.timeout = original_timeout
+            port = self._ensure_connected_unlocked()
+            payload = await port.read_some(max_bytes, max(timeout_ms, 0) / 1000)
 
             if payload:
                 self._append_log(direction="RX", payload=payload, display_text=self._render_payload_text(payload, encoding))
@@ -184,18 +168,18 @@ class SerialDebugService:
 
     async def _close_unlocked(self) -> None:
         previous_port = self._settings.get("port")
-        was_connected = bool(self._ser is not None and getattr(self._ser, "is_open", False))
-        if self._ser is not None:
+        was_connected = bool(self._port is not None and self._port.is_open)
+        if self._port is not None:
             try:
-                self._ser.close()
+                self._port.close()
             except Exception:
                 pass
-        self._ser = None
+        self._port = None
         if was_connected and previous_port:
             self._append_log(direction="SYS", payload=b"", display_text=f"Disconnected: {previous_port}")
 
     async def _status_unlocked(self) -> dict[str, Any]:
-        connected = bool(self._ser is not None and getattr(self._ser, "is_open", False))
+        connected = bool(self._port is not None and self._port.is_open)
         return {
             "ok": True,
             "connected": connected,
@@ -203,10 +187,10 @@ class SerialDebugService:
             "last_error": self._last_error,
         }
 
-    def _ensure_connected_unlocked(self):
-        if self._ser is None or not getattr(self._ser, "is_open", False):
+    def _ensure_connected_unlocked(self) -> AsyncSerialPort:
+        if self._port is None or not self._port.is_open:
             raise RuntimeError("serial debugger is not connected")
-        return self._ser
+        return self._port
 
     def _build_payload(self, *, data: str, data_format: str, encoding: str, line_ending: str) -> bytes:
         normalized_format = data_format.lower()
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import math
+from array import array
+from collections import deque
+
+from backend.services.template_compiler import Stability
+
+
+class StabilityWindow:
+    """Range and standard deviation over the last `size` readings, O(1) amortised per reading.
+
+    Readings live in a fixed ring of doubles; min/max come from monotonic
+    deques of sequence numbers, the deviation from running sums (re-summed
+    once per lap so float error cannot build up).
+    """
+
+    __slots__ = ("size", "tolerance", "max_stddev", "_values", "_count", "_sum", "_sumsq", "_min", "_max")
+
+    def __init__(self, size: int, tolerance: float, max_stddev: float | None = None):
+        self.size = size
+        self.tolerance = tolerance
+        self.max_stddev = max_stddev
+        self._values = array("d", bytes(8 * size))
+        self._count = 0
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._min: deque[int] = deque()
+        self._max: deque[int] = deque()
+
+    @classmethod
+    def from_config(cls, config: Stability | None) -> StabilityWindow | None:
+        if config is None:
+            return None
+        return cls(config.window, config.tolerance, config.max_stddev)
+
+    @property
+    def full(self) -> bool:
+        return self._count >= self.size
+
+    @property
+    def span(self) -> float:
+        if not self._count:
+            return 0.0
+        values = self._values
+        return values[self._max[0] % self.size] - values[self._min[0] % self.size]
+
+    @property
+    def stddev(self) -> float:
+        n = min(self._count, self.size)
+        if not n:
+            return 0.0
+        mean = self._sum / n
+        return math.sqrt(max(self._sumsq / n - mean * mean, 0.0))
+
+    def push(self, value: float) -> bool:
+        """Add a reading; returns whether the window is now stable."""
+        seq = self._count
+        size = self.size
+        slot = seq % size
+        values = self._values
+        if seq >= size:
+            old = values[slot]
+            self._sum -= old
+            self._sumsq -= old * old
+            expired = seq - size
+            if self._min[0] == expired:
+                self._min.popleft()
+            if self._max[0] == expired:
+                self._max.popleft()
+        values[slot] = value
+        self._count = seq + 1
+        if slot == size - 1:
+            self._sum = math.fsum(values[: min(self._count, size)])
+            self._sumsq = math.fsum(item * item for item in values[: min(self._count, size)])
+        else:
+            self._sum += value
+            self._sumsq += value * value
+
+        lows = self._min
+        while lows and values[lows[-1] % size] >= value:
+            lows.pop()
+        lows.append(seq)
+        highs = self._max
+        while highs and values[highs[-1] % size] <= value:
+            highs.pop()
+        highs.append(seq)
+        return self.stable
+
+    @property
+    def stable(self) -> bool:
+        if not self.full or self.span > self.tolerance:
+            return False
+        return self.max_stddev is None or self.stddev <= self.max_stddev
+
+    def clear(self) -> None:
+        self._count = 0
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._min.clear()
+        self._max.clear()
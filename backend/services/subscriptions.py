@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+from typing import Any, Mapping
+
+
+@dataclass
+class Selector:
+    """Devices a WebSocket client asked for: everything, or by id, device_code glob and template id."""
+
+    everything: bool = False
+    device_ids: set[int] = field(default_factory=set)
+    code_patterns: set[str] = field(default_factory=set)
+    template_ids: set[int] = field(default_factory=set)
+
+    @classmethod
+    def from_message(cls, message: Mapping[str, Any]) -> Selector:
+        return cls(
+            everything=bool(message.get("all")),
+            device_ids=set(_int_list(message, "device_ids")),
+            code_patterns={pattern.upper() for pattern in _str_list(message, "device_codes")},
+            template_ids=set(_int_list(message, "template_ids")),
+        )
+
+    @property
+    def has_patterns(self) -> bool:
+        # Globs and templates can match devices started later; explicit ids and "all" cannot go stale.
+        return not self.everything and bool(self.code_patterns or self.template_ids)
+
+    @property
+    def empty(self) -> bool:
+        return not (self.everything or self.device_ids or self.code_patterns or self.template_ids)
+
+    def merge(self, other: Selector) -> None:
+        self.everything = self.everything or other.everything
+        self.device_ids |= other.device_ids
+        self.code_patterns |= other.code_patterns
+        self.template_ids |= other.template_ids
+
+    def subtract(self, other: Selector) -> None:
+        if other.everything:
+            self.everything = False
+            self.device_ids.clear()
+            self.code_patterns.clear()
+            self.template_ids.clear()
+            return
+        self.device_ids -= other.device_ids
+        self.code_patterns -= other.code_patterns
+        self.template_ids -= other.template_ids
+
+    def matches(self, device_id: int, device_code: str | None, template_id: int | None) -> bool:
+        if self.everything or device_id in self.device_ids or template_id in self.template_ids:
+            return True
+        code = device_code or ""
+        return any(fnmatchcase(code, pattern) for pattern in self.code_patterns)
+
+    def describe(self) -> dict[str, Any]:
+        return {
+            "all": self.everything,
+            "device_ids": sorted(self.device_ids),
+            "device_codes": sorted(self.code_patterns),
+            "template_ids": sorted(self.template_ids),
+        }
+
+
+def _int_list(message: Mapping[str, Any], key: str) -> list[int]:
+    value = message.get(key) or []
+    if not isinstance(value, list):
+        raise ValueError(f"{key} must be a list")
+    try:
+        return [int(item) for item in value]
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"{key} must contain integers") from exc
+
+
+def _str_list(message: Mapping[str, Any], key: str) -> list[str]:
+    value = message.get(key) or []
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise ValueError(f"{key} must be a list of strings")
+    return value
@@ -0,0 +1,410 @@
+from __future__ import annotations
+
+import copy
+import re
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Callable, Mapping
+
+from backend.services.expression_compiler import ExpressionError, compile_expression
+
+PLACEHOLDER_PATTERN = re.compile(r"\$\{([^}]+)\}")
+
+COALESCIBLE_READ_ACTIONS = frozenset({"modbus.read_holding_registers", "modbus.read_input_registers"})
+# Modbus function codes 03/04 return at most 125 registers per request.
+MODBUS_MAX_READ_REGISTERS = 125
+MESSAGE_BATCH_FORMATS = frozenset({"json_array", "ndjson"})
+
+Renderer = Callable[[Mapping[str, Any]], Any]
+
+
+@dataclass(frozen=True)
+class CompiledValue:
+    """A params/output subtree with every `${...}` pre-split into a path accessor."""
+
+    render: Renderer
+    paths: tuple[tuple[str, ...], ...] = ()
+    is_constant: bool = True
+
+
+@dataclass(frozen=True)
+class CompiledStep:
+    id: Any
+    action: str
+    trigger: str
+    params: CompiledValue
+    parse: Mapping[str, Any] | None
+    source: Mapping[str, Any]
+    # Step ids this step reads through `${steps.<id>...}` or an explicit `depends_on`.
+    step_refs: frozenset[Any] = field(default_factory=frozenset)
+    # True when the step can see every previous result (`${steps}` or a parse expression using `steps`).
+    reads_all_steps: bool = False
+
+
+@dataclass(frozen=True)
+class MessageBatch:
+    """`message_handler.batch`: one payload carries many records, keyed to devices by `key_field`."""
+
+    format: str
+    records_path: tuple[str, ...] = ()
+    key_field: str | None = None
+
+
+@dataclass(frozen=True)
+class PublishPolicy:
+    """`publish_policy`: report by exception instead of publishing every reading."""
+
+    deadband_abs: float = 0.0
+    deadband_percent: float = 0.0
+    heartbeat: float | None = None
+
+
+@dataclass(frozen=True)
+class Stability:
+    """`output.stability`: stable once the last `window` weights span at most `tolerance`."""
+
+    window: int
+    tolerance: float
+    max_stddev: float | None = None
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """Immutable execution plan built once per protocol template."""
+
+    source: Mapping[str, Any]
+    setup_steps: tuple[CompiledStep, ...]
+    poll_steps: tuple[CompiledStep, ...]
+    steps_by_id: Mapping[Any, CompiledStep]
+    message_handler: CompiledStep | None
+    output: CompiledValue
+    # poll_steps grouped into dependency levels; steps inside one wave never read each other.
+    poll_waves: tuple[tuple[CompiledStep, ...], ...] = ()
+    # poll_steps in template order, adjacent independent register reads grouped for coalescing.
+    poll_runs: tuple[tuple[CompiledStep, ...], ...] = ()
+    # {"max_gap", "max_registers"} when Modbus read coalescing is enabled.
+    coalesce: Mapping[str, int] | None = None
+    message_batch: MessageBatch | None = None
+    publish_policy: PublishPolicy | None = None
+    stability: Stability | None = None
+
+    @property
+    def has_parallel_waves(self) -> bool:
+        return len(self.poll_waves) < len(self.poll_steps)
+
+
+def compile_template(template: Mapping[str, Any]) -> CompiledTemplate:
+    setup_steps = tuple(compile_step(step) for step in _step_list(template.get("setup_steps")))
+    steps = tuple(compile_step(step) for step in _step_list(template.get("steps")))
+
+    steps_by_id: dict[Any, CompiledStep] = {}
+    for step in steps:
+        steps_by_id.setdefault(step.id, step)
+
+    handler = template.get("message_handler")
+    poll_steps = tuple(step for step in steps if step.trigger == "poll")
+    coalesce = _coalesce_config(template.get("modbus_coalesce"))
+    output = template.get("output", {})
+    stability = None
+    if isinstance(output, dict) and "stability" in output:
+        stability = _stability_config(output["stability"])
+        output = {key: value for key, value in output.items() if key != "stability"}
+    return CompiledTemplate(
+        source=template,
+        setup_steps=setup_steps,
+        poll_steps=poll_steps,
+        poll_waves=build_waves(poll_steps),
+        poll_runs=build_read_runs(poll_steps) if coalesce else tuple((step,) for step in poll_steps),
+        coalesce=coalesce,
+        steps_by_id=MappingProxyType(steps_by_id),
+        message_handler=compile_step(handler) if isinstance(handler, dict) and handler else None,
+        message_batch=_batch_config(handler.get("batch")) if isinstance(handler, dict) else None,
+        publish_policy=parse_publish_policy(template.get("publish_policy")),
+        stability=stability,
+        output=compile_value(output),
+    )
+
+
+def compile_step(step: Mapping[str, Any]) -> CompiledStep:
+    parse_config = step.get("parse")
+    params = compile_value(step.get("params", {}))
+
+    step_refs: set[Any] = set()
+    reads_all_steps = False
+    for path in params.paths:
+        if path[0] != "steps":
+            continue
+        if len(path) == 1:
+            reads_all_steps = True
+        else:
+            step_refs.add(path[1])
+
+    depends_on = step.get("depends_on")
+    if isinstance(depends_on, str):
+        step_refs.add(depends_on)
+    elif isinstance(depends_on, list):
+        step_refs.update(depends_on)
+
+    if parse_config and parse_config.get("type") == "expression":
+        reads_all_steps = reads_all_steps or _expression_reads_steps(parse_config.get("expression", ""))
+
+    return CompiledStep(
+        id=step.get("id"),
+        action=step.get("action", ""),
+        trigger=step.get("trigger", "poll"),
+        params=params,
+        parse=MappingProxyType(copy.deepcopy(parse_config)) if parse_config else None,
+        source=step,
+        step_refs=frozenset(step_refs),
+        reads_all_steps=reads_all_steps,
+    )
+
+
+def build_waves(steps: tuple[CompiledStep, ...]) -> tuple[tuple[CompiledStep, ...], ...]:
+    """Group steps into levels that can run concurrently without changing results.
+
+    Results of a wave are stored only after the whole wave finished, so a step
+    that reads a *later* step (previous cycle's value) may share its wave but
+    must never run after it. `delay` keeps its sequencing role as a barrier.
+    """
+    levels: list[int] = []
+    last_index: dict[Any, int] = {}
+    floor = 0
+    for index, step in enumerate(steps):
+        level = floor
+        if step.action == "delay":
+            level = max([floor, *(value + 1 for value in levels)])
+            floor = level + 1
+        elif step.reads_all_steps:
+            level = max([floor, *(value + 1 for value in levels)])
+        else:
+            for ref in step.step_refs:
+                if ref in last_index:
+                    level = max(level, levels[last_index[ref]] + 1)
+        for earlier, earlier_step in enumerate(steps[:index]):
+            # A step reading every result also reads this one's previous-cycle value.
+            if earlier_step.reads_all_steps or step.id in earlier_step.step_refs:
+                level = max(level, levels[earlier])
+        levels.append(level)
+        last_index[step.id] = index
+
+    waves: dict[int, list[CompiledStep]] = {}
+    for level, step in zip(levels, steps):
+        waves.setdefault(level, []).append(step)
+    return tuple(tuple(waves[level]) for level in sorted(waves))
+
+
+def build_read_runs(steps: tuple[CompiledStep, ...]) -> tuple[tuple[CompiledStep, ...], ...]:
+    """Split steps into template-order runs; a run of register reads never reads itself."""
+    runs: list[list[CompiledStep]] = []
+    for step in steps:
+        current = runs[-1] if runs else None
+        if (
+            current is not None
+            and step.action in COALESCIBLE_READ_ACTIONS
+            and current[0].action in COALESCIBLE_READ_ACTIONS
+            and not step.reads_all_steps
+            and not any(member.id in step.step_refs or step.id in member.step_refs for member in current)
+        ):
+            current.append(step)
+            continue
+        runs.append([step])
+    return tuple(tuple(run) for run in runs)
+
+
+def _coalesce_config(value: Any) -> Mapping[str, int] | None:
+    # Opt-in: merged requests read registers the template never asked for.
+    if not isinstance(value, dict) or not value.get("enabled", True):
+        return None
+    config = value
+    max_registers = int(config.get("max_registers", MODBUS_MAX_READ_REGISTERS))
+    return MappingProxyType(
+        {
+            "max_gap": max(int(config.get("max_gap", 0)), 0),
+            "max_registers": min(max(max_registers, 1), MODBUS_MAX_READ_REGISTERS),
+        }
+    )
+
+
+def _batch_config(value: Any) -> MessageBatch | None:
+    if not isinstance(value, dict):
+        return None
+    batch_format = str(value.get("format") or "json_array").lower()
+    if batch_format not in MESSAGE_BATCH_FORMATS:
+        raise ValueError(f"message_handler.batch.format must be one of {sorted(MESSAGE_BATCH_FORMATS)}")
+    records_path = str(value.get("records_path") or "").strip()
+    key_field = str(value.get("key_field") or "").strip()
+    return MessageBatch(
+        format=batch_format,
+        records_path=tuple(records_path.split(".")) if records_path else (),
+        key_field=key_field or None,
+    )
+
+
+def parse_publish_policy(value: Any) -> PublishPolicy | None:
+    if not isinstance(value, dict) or not value:
+        return None
+    try:
+        deadband_abs = float(value.get("deadband_abs") or 0)
+        deadband_percent = float(value.get("deadband_percent") or 0)
+        heartbeat = float(value["heartbeat"]) if value.get("heartbeat") is not None else None
+    except (TypeError, ValueError) as exc:
+        raise ValueError("publish_policy.deadband_abs / deadband_percent / heartbeat must be numbers") from exc
+    if deadband_abs < 0 or deadband_percent < 0 or (heartbeat is not None and heartbeat <= 0):
+        raise ValueError("publish_policy deadbands must be >= 0 and heartbeat > 0")
+    return PublishPolicy(deadband_abs=deadband_abs, deadband_percent=deadband_percent, heartbeat=heartbeat)
+
+
+def _stability_config(value: Any) -> Stability | None:
+    if not isinstance(value, dict):
+        return None
+    try:
+        window = int(value.get("window") or 10)
+        tolerance = float(value.get("tolerance") or 0)
+        max_stddev = float(value["max_stddev"]) if value.get("max_stddev") is not None else None
+    except (TypeError, ValueError) as exc:
+        raise ValueError("output.stability.window / tolerance / max_stddev must be numbers") from exc
+    if window < 2 or tolerance < 0 or (max_stddev is not None and max_stddev < 0):
+        raise ValueError("output.stability.window must be >= 2 and tolerance / max_stddev >= 0")
+    return Stability(window=window, tolerance=tolerance, max_stddev=max_stddev)
+
+
+def compile_value(value: Any) -> CompiledValue:
+    constant, compiled, paths = _compile(value)
+    if constant:
+        return CompiledValue(render=_constant_renderer(compiled), paths=(), is_constant=True)
+    return CompiledValue(render=compiled, paths=tuple(paths), is_constant=False)
+
+
+def _expression_reads_steps(expression: Any) -> bool:
+    try:
+        return "steps" in compile_expression(expression).names
+    except ExpressionError:
+        return False
+
+
+def resolve_path(parts: tuple[str, ...], context: Mapping[str, Any]) -> Any:
+    current: Any = context
+    for part in parts:
+        if isinstance(current, dict):
+            current = current.get(part)
+            continue
+        return None
+    return current
+
+
+def _step_list(value: Any) -> list[Mapping[str, Any]]:
+    if not isinstance(value, list):
+        return []
+    return [step for step in value if isinstance(step, dict)]
+
+
+def _compile(value: Any) -> tuple[bool, Any, list[tuple[str, ...]]]:
+    """Return (is_constant, constant value or renderer, referenced paths)."""
+    if isinstance(value, dict):
+        entries: list[tuple[Any, bool, Any]] = []
+        paths: list[tuple[str, ...]] = []
+        for key, item in value.items():
+            constant, compiled, item_paths = _compile(item)
+            entries.append((key, constant, compiled))
+            paths.extend(item_paths)
+        if all(constant for _, constant, _ in entries):
+            return True, {key: compiled for key, _, compiled in entries}, []
+
+        frozen_entries = tuple((key, *_shareable(constant, compiled)) for key, constant, compiled in entries)
+
+        def render_dict(context: Mapping[str, Any]) -> dict[Any, Any]:
+            return {key: item if constant else item(context) for key, constant, item in frozen_entries}
+
+        return False, render_dict, paths
+
+    if isinstance(value, list):
+        items = [_compile(item) for item in value]
+        if all(constant for constant, _, _ in items):
+            return True, [compiled for _, compiled, _ in items], []
+
+        frozen_items = tuple(_shareable(constant, compiled) for constant, compiled, _ in items)
+        paths = [path for _, _, item_paths in items for path in item_paths]
+
+        def render_list(context: Mapping[str, Any]) -> list[Any]:
+            return [item if constant else item(context) for constant, item in frozen_items]
+
+        return False, render_list, paths
+
+    if not isinstance(value, str):
+        return True, copy.deepcopy(value), []
+
+    matches = PLACEHOLDER_PATTERN.findall(value)
+    if not matches:
+        return True, value, []
+
+    # Full-string placeholder: return original type if possible.
+    if len(matches) == 1 and value.strip() == "${" + matches[0] + "}":
+        parts = tuple(matches[0].split("."))
+        return False, _path_renderer(parts), [parts]
+
+    pieces: list[Any] = []
+    for index, piece in enumerate(PLACEHOLDER_PATTERN.split(value)):
+        if index % 2 == 0:
+            if piece:
+                pieces.append(piece)
+        else:
+            pieces.append(tuple(piece.split(".")))
+    frozen_pieces = tuple(pieces)
+
+    def render_text(context: Mapping[str, Any]) -> str:
+        rendered: list[str] = []
+        for piece in frozen_pieces:
+            if isinstance(piece, str):
+                rendered.append(piece)
+                continue
+            resolved = resolve_path(piece, context)
+            rendered.append("" if resolved is None else str(resolved))
+        return "".join(rendered)
+
+    return False, render_text, [piece for piece in frozen_pieces if isinstance(piece, tuple)]
+
+
+def _constant_renderer(value: Any) -> Renderer:
+    # Callers own what they render, so folded containers are rebuilt each time; scalars are shared.
+    if isinstance(value, (dict, list)):
+
+        def render_container(context: Mapping[str, Any]) -> Any:
+            return _fresh(value)
+
+        return render_container
+
+    def render_constant(context: Mapping[str, Any]) -> Any:
+        return value
+
+    return render_constant
+
+
+def _shareable(constant: bool, compiled: Any) -> tuple[bool, Any]:
+    """Turn a constant container child into a renderer so parents never hand out the shared copy."""
+    if constant and isinstance(compiled, (dict, list)):
+        return False, _constant_renderer(compiled)
+    return constant, compiled
+
+
+def _fresh(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _fresh(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_fresh(item) for item in value]
+    return value
+
+
+def _path_renderer(parts: tuple[str, ...]) -> Renderer:
+    if len(parts) == 1:
+        key = parts[0]
+
+        def render_name(context: Mapping[str, Any]) -> Any:
+            return context.get(key) if isinstance(context, dict) else None
+
+        return render_name
+
+    def render_path(context: Mapping[str, Any]) -> Any:
+        return resolve_path(parts, context)
+
+    return render_path
@@ -26,6 +26,20 @@ class Settings:
     frontend_host: str = os.getenv("FRONTEND_HOST", "127.0.0.1")
     frontend_port: int = int(os.getenv("FRONTEND_PORT", "8001"))
 
+    # Modbus TCP 同一 host:port 最多共享的连接数（网关通常限制 4~8 个）
+    modbus_tcp_max_connections: int = int(os.getenv("MODBUS_TCP_MAX_CONNECTIONS", "4"))
+
+    # 轮询调度：全局 / 同一端点（网关地址或串口）同时进行的轮询上限
+    poll_max_in_flight: int = int(os.getenv("POLL_MAX_IN_FLIGHT", "256"))
+    poll_max_per_endpoint: int = int(os.getenv("POLL_MAX_PER_ENDPOINT", "4"))
+
+    # 启动 / 重连时同时进行的 connect 数量上限；关停时等待所有设备断开的总时限（秒）
+    connect_concurrency: int = int(os.getenv("CONNECT_CONCURRENCY", "64"))
+    shutdown_timeout: float = float(os.getenv("SHUTDOWN_TIMEOUT", "10"))
+
+    # 处理推送消息（MQTT）的固定 worker 数量
+    inbox_workers: int = int(os.getenv("INBOX_WORKERS", "4"))
+
     # ture表示用模拟数据，false 表示：连不上真实设备就报离线/错误，不再返回随机测试值
     # SIMULATE_ON_CONNECT_FAIL=false
     simulate_on_connect_fail: bool = os.getenv("SIMULATE_ON_CONNECT_FAIL", "true").lower() in {
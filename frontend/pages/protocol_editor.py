@@ -9,6 +9,8 @@ PROTOCOL_OPTIONS = [
     {"label": "MQTT（推送）", "value": "mqtt"},
     {"label": "Serial（串口）", "value": "serial"},
     {"label": "TCP（原始）", "value": "tcp"},
+    {"label": "TCP 服务端（设备主动连接）", "value": "tcp_server"},
+    {"label": "UDP（设备推送报文）", "value": "udp"},
 ]
 
 
@@ -35,13 +37,25 @@ ACTION_OPTIONS = [
     {"label": "mqtt.publish", "value": "mqtt.publish"},
     {"label": "serial.send", "value": "serial.send"},
     {"label": "serial.receive", "value": "serial.receive"},
+    {"label": "serial.transact", "value": "serial.transact"},
+    {"label": "serial.stream_start", "value": "serial.stream_start"},
+    {"label": "serial.stream_read", "value": "serial.stream_read"},
     {"label": "tcp.send", "value": "tcp.send"},
     {"label": "tcp.receive", "value": "tcp.receive"},
+    {"label": "tcp.transact", "value": "tcp.transact"},
+    {"label": "tcp.stream_start", "value": "tcp.stream_start"},
+    {"label": "tcp.stream_read", "value": "tcp.stream_read"},
+    {"label": "tcp_server.send", "value": "tcp_server.send"},
+    {"label": "tcp_server.on_message", "value": "tcp_server.on_message"},
+    {"label": "udp.send", "value": "udp.send"},
+    {"label": "udp.on_message", "value": "udp.on_message"},
     {"label": "delay", "value": "delay"},
 ]
 
-MQTT_MESSAGE_ACTION_OPTIONS = [
+MESSAGE_ACTION_OPTIONS = [
     {"label": "mqtt.on_message", "value": "mqtt.on_message"},
+    {"label": "tcp_server.on_message", "value": "tcp_server.on_message"},
+    {"label": "udp.on_message", "value": "udp.on_message"},
 ]
 
 
@@ -544,7 +558,7 @@ def layout() -> html.Div:
                                                     ),
                                                     html.Details(
                                                         [
-                                                            html.Summary("MQTT setup 步骤", className="protocol-details-summary"),
+                                                            html.Summary("setup 步骤（MQTT 订阅 / 串口、TCP 连续流）", className="protocol-details-summary"),
                                                             html.Div(
                                                                 [
                                                                     html.Div(
@@ -720,7 +734,7 @@ def layout() -> html.Div:
                                                     ),
                                                     html.Details(
                                                         [
-                                                            html.Summary("MQTT message_handler", className="protocol-details-summary"),
+                                                            html.Summary("message_handler（推送类协议）", className="protocol-details-summary"),
                                                             html.Div(
                                                                 [
                                                                     html.Div(
@@ -739,7 +753,7 @@ def layout() -> html.Div:
                                                                             ),
                                                                             dcc.Dropdown(
                                                                                 id="protocol-form-message-action",
-                                                                                options=MQTT_MESSAGE_ACTION_OPTIONS,
+                                                                                options=MESSAGE_ACTION_OPTIONS,
                                                                                 value="mqtt.on_message",
                                                                                 clearable=False,
                                                                                 className="qx-dropdown",
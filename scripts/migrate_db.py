@@ -76,6 +76,7 @@ def import_data(input_path: Path) -> None:
                 protocol_template=template.id,
                 connection_params=item.get("connection_params", {}),
                 template_variables=item.get("template_variables", {}),
+                runtime_options=item.get("runtime_options", {}),
                 poll_interval=item.get("poll_interval", 1.0),
                 enabled=item.get("enabled", True),
             )
@@ -84,6 +85,7 @@ def import_data(input_path: Path) -> None:
         row.protocol_template = template.id
         row.connection_params = item.get("connection_params", {})
         row.template_variables = item.get("template_variables", {})
+        row.runtime_options = item.get("runtime_options", {})
         row.poll_interval = item.get("poll_interval", 1.0)
         row.enabled = item.get("enabled", True)
         row.save()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+自适应轮询基准
+模拟大量大部分时间空闲的地磅：偶尔有托盘放上（重量在约 1 秒内爬升后稳定）。
+对比固定 poll_interval 与 runtime_options.adaptive_poll 的轮询次数、CPU 占用和发现上秤的延迟。
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.services.adaptive_poll import AdaptivePoll  # noqa: E402
+from backend.services.poll_scheduler import PollScheduler  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare fixed-rate and adaptive polling of mostly idle scales.")
+    parser.add_argument("--devices", type=int, default=1500, help="Number of simulated scales")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per mode")
+    parser.add_argument("--loads", type=float, default=0.02, help="Pallet loads per scale per second")
+    parser.add_argument("--min-interval", type=float, default=0.1, help="Fixed interval / adaptive min_interval")
+    parser.add_argument("--max-interval", type=float, default=1.0, help="adaptive max_interval")
+    parser.add_argument("--io", type=float, default=0.002, help="Simulated I/O per poll (s)")
+    return parser.parse_args()
+
+
+class Scale:
+    def __init__(self, rng: random.Random, loads: float, start: float, duration: float):
+        self.events: list[float] = []
+        at = start + rng.expovariate(loads)
+        while at < start + duration - 2:
+            self.events.append(at)
+            at += 2 + rng.expovariate(loads)
+        self.next_event = 0
+        self.seen_event = -1
+        self.detected: list[float] = []
+        self.last: float | None = None
+
+    def weight(self, now: float) -> float:
+        # 0 kg at rest; after each load a 1 s ramp to 500 kg, removed again 1 s later.
+        for at in self.events:
+            if at <= now < at + 2:
+                return round(min((now - at) / 1.0, 1.0) * 500, 1)
+        return 0.0
+
+    def observe(self, now: float, weight: float) -> None:
+        while self.next_event < len(self.events) and self.events[self.next_event] + 2 <= now:
+            self.next_event += 1
+        if self.next_event < len(self.events) and self.seen_event != self.next_event:
+            at = self.events[self.next_event]
+            if at <= now and weight != 0.0:
+                self.seen_event = self.next_event
+                self.detected.append(now - at)
+
+
+async def run_mode(args: argparse.Namespace, adaptive: AdaptivePoll | None) -> None:
+    rng = random.Random(7)
+    scheduler = PollScheduler(max_in_flight=args.devices, max_per_endpoint=args.devices)
+    start = time.perf_counter()
+    scales = [Scale(rng, args.loads, start, args.duration) for _ in range(args.devices)]
+    polls = 0
+    entries = []
+
+    def make_poll(index: int):
+        scale = scales[index]
+
+        async def poll() -> None:
+            nonlocal polls
+            await asyncio.sleep(args.io)
+            now = time.perf_counter()
+            weight = scale.weight(now)
+            scale.observe(now, weight)
+            polls += 1
+            if adaptive is not None:
+                active = adaptive.is_active(scale.last, weight, None)
+                scheduler.reschedule(entries[index], adaptive.next_interval(entries[index].interval, active))
+            scale.last = weight
+
+        return poll
+
+    cpu = time.process_time()
+    for index in range(args.devices):
+        entries.append(scheduler.add(index, args.min_interval, make_poll(index)))
+    await asyncio.sleep(args.duration)
+    cpu = time.process_time() - cpu
+    for entry in entries:
+        await scheduler.remove(entry)
+
+    latencies = [latency for scale in scales for latency in scale.detected]
+    loads = sum(len(scale.events) for scale in scales)
+    name = "adaptive" if adaptive else "fixed"
+    print(f"[{name}]")
+    print(f"  polls      : {polls / args.duration:,.0f}/s, CPU {cpu / args.duration:.0%} of one core")
+    if latencies:
+        print(
+            f"  detection  : {len(latencies)}/{loads} loads, latency avg {statistics.fmean(latencies) * 1000:.0f} ms, "
+            f"p99 {sorted(latencies)[int(len(latencies) * 0.99)] * 1000:.0f} ms"
+        )
+
+
+async def run(args: argparse.Namespace) -> None:
+    await run_mode(args, None)
+    await run_mode(args, AdaptivePoll(min_interval=args.min_interval, max_interval=args.max_interval))
+
+
+def main() -> None:
+    asyncio.run(run(parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+message_handler 批量模式基准
+同样的读数分别以“一条消息一个读数”和“网关一条消息打包多个读数”送入 DeviceManager，比较每个读数的处理耗时。
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.services.data_collector import RuntimeState  # noqa: E402
+from backend.services.device_manager import DeviceManager, DeviceRuntime  # noqa: E402
+from backend.services.template_compiler import compile_template  # noqa: E402
+
+SINGLE_TEMPLATE = {
+    "name": "single",
+    "protocol_type": "mqtt",
+    "setup_steps": [],
+    "message_handler": {
+        "id": "handle_message",
+        "action": "mqtt.on_message",
+        "parse": {"type": "regex", "pattern": "\"weight\"\\s*:\\s*([-+]?[0-9]*\\.?[0-9]+)", "group": 1},
+    },
+    "output": {"weight": "${message_handler.result}", "unit": "kg"},
+}
+
+BATCH_TEMPLATE = {
+    "name": "batch",
+    "protocol_type": "mqtt",
+    "setup_steps": [],
+    "message_handler": {
+        "id": "handle_message",
+        "action": "mqtt.on_message",
+        "batch": {"format": "json_array", "records_path": "readings", "key_field": "device_code"},
+    },
+    "output": {"weight": "${record.weight}", "unit": "kg"},
+}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare one reading per message with batched messages.")
+    parser.add_argument("--devices", type=int, default=4, help="Devices behind the gateway")
+    parser.add_argument("--per-message", type=int, default=200, help="Readings per batch message")
+    parser.add_argument("--messages", type=int, default=200, help="Batch messages to process")
+    return parser.parse_args()
+
+
+def make_runtime(template: dict, code: str) -> DeviceRuntime:
+    return DeviceRuntime(
+        device=SimpleNamespace(template_variables={}, device_code=code),
+        template=SimpleNamespace(protocol_type="mqtt"),
+        plan=compile_template(template),
+        driver=None,
+        state=RuntimeState(device_id=0, device_name=code, device_code=code),
+        stop_event=asyncio.Event(),
+    )
+
+
+async def run(args: argparse.Namespace) -> None:
+    codes = [f"S{index}" for index in range(args.devices)]
+    readings = [
+        {"device_code": codes[index % args.devices], "weight": round(index * 0.01, 2)} for index in range(args.per_message)
+    ]
+    total = args.per_message * args.messages
+
+    manager = DeviceManager()
+    singles = {code: make_runtime(SINGLE_TEMPLATE, code) for code in codes}
+    messages = [(singles[item["device_code"]], json.dumps(item).encode()) for item in readings]
+    start = time.perf_counter()
+    for _ in range(args.messages):
+        for runtime, payload in messages:
+            await manager._handle_pushed_message(runtime, "scale", payload)
+    single_seconds = time.perf_counter() - start
+
+    manager = DeviceManager()
+    batched = [make_runtime(BATCH_TEMPLATE, code) for code in codes]
+    # A distinct bytes object per message, as the broker would deliver them.
+    payloads = [json.dumps({"readings": readings}).encode() for _ in range(args.messages)]
+    start = time.perf_counter()
+    for payload in payloads:
+        for runtime in batched:
+            await manager._handle_pushed_message(runtime, "gateway", payload)
+    batch_seconds = time.perf_counter() - start
+
+    print(f"readings        : {total} for {args.devices} devices")
+    print(f"one per message : {single_seconds:.3f} s, {single_seconds / total * 1e6:.1f} us/reading, {total} messages")
+    print(
+        f"batched x{args.per_message:<5}: {batch_seconds:.3f} s, {batch_seconds / total * 1e6:.1f} us/reading, "
+        f"{args.messages} messages"
+    )
+    print(f"speed-up        : {single_seconds / batch_seconds:.1f}x, broker messages / {args.per_message}")
+
+
+def main() -> None:
+    asyncio.run(run(parse_args()))
+
+
+if __name__ == "__main__":
+    main()
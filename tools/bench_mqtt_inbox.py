@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+MQTT 推送消息回放基准（无需 broker）
+以固定速率把消息回放进共享 MQTT 客户端的 on_message，经设备 inbox -> worker -> DeviceManager 批量处理，
+记录常驻内存、任务数与各设备的队列深度/丢弃数。--mode tasks 模拟旧实现（每条消息一个 create_task）作对比。
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import resource
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.drivers.mqtt_broker import SharedMqttClient  # noqa: E402
+from backend.drivers.mqtt_driver import MqttDriver  # noqa: E402
+from backend.services.data_collector import RuntimeState  # noqa: E402
+from backend.services.device_manager import DeviceManager, DeviceRuntime  # noqa: E402
+from backend.services.template_compiler import compile_template  # noqa: E402
+
+TEMPLATE = {
+    "name": "bench",
+    "protocol_type": "mqtt",
+    "variables": [],
+    "setup_steps": [],
+    "message_handler": {
+        "id": "handle_message",
+        "trigger": "event",
+        "action": "mqtt.on_message",
+        "parse": {"type": "regex", "pattern": "\"weight\"\\s*:\\s*([-+]?[0-9]*\\.?[0-9]+)", "group": 1},
+    },
+    "output": {"weight": "${message_handler.result}", "unit": "kg"},
+}
+
+TICK_SECONDS = 0.01
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as handle:
+            return int(handle.read().split()[1]) * resource.getpagesize() / 1e6
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay MQTT messages into device inboxes.")
+    parser.add_argument("--rate", type=int, default=50000, help="Messages per second in total")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds to replay")
+    parser.add_argument("--devices", type=int, default=50, help="Number of MQTT devices")
+    parser.add_argument("--policy", default="all", choices=["all", "latest", "coalesce"], help="inbox_policy")
+    parser.add_argument("--size", type=int, default=None, help="inbox_size")
+    parser.add_argument("--mode", default="inbox", choices=["inbox", "tasks"], help="tasks = one task per message")
+    return parser.parse_args()
+
+
+async def run(args: argparse.Namespace) -> None:
+    manager = DeviceManager()
+    plan = compile_template(TEMPLATE)
+    shared = SharedMqttClient("replay", 0, None, None)
+    drivers = []
+    for index in range(args.devices):
+        driver = MqttDriver({"inbox_policy": args.policy, "inbox_size": args.size})
+        runtime = DeviceRuntime(
+            device=SimpleNamespace(template_variables={}),
+            template=SimpleNamespace(protocol_type="mqtt"),
+            plan=plan,
+            driver=driver,
+            state=RuntimeState(device_id=index, device_name=f"mqtt-{index}"),
+            stop_event=asyncio.Event(),
+        )
+        if args.mode == "tasks":
+            driver.deliver = lambda topic, payload, runtime=runtime: asyncio.create_task(
+                manager._handle_pushed_message(runtime, topic, payload)
+            )
+        else:
+            driver.register_batch_handler(
+                lambda topic, payloads, runtime=runtime: manager._handle_pushed_batch(runtime, topic, payloads)
+            )
+        shared.subscribe(driver, f"scale/{index}/weight", 0)
+        drivers.append(driver)
+
+    sent = 0
+    start = time.perf_counter()
+    next_report = start + 1.0
+    peak_tasks = 0
+    print(f"{'t':>4} {'sent':>8} {'rss MB':>8} {'tasks':>7} {'depth':>7} {'dropped':>8}")
+    while time.perf_counter() - start < args.duration:
+        # Catch up to the wall-clock schedule, however long the handlers took.
+        due = int((time.perf_counter() - start) * args.rate)
+        while sent < due:
+            index = sent % args.devices
+            shared._on_message(None, f"scale/{index}/weight", b'{"weight": %d.5}' % sent, 0, {})
+            sent += 1
+        peak_tasks = max(peak_tasks, len(asyncio.all_tasks()))
+        await asyncio.sleep(TICK_SECONDS)
+        now = time.perf_counter()
+        if now >= next_report:
+            next_report += 1.0
+            depth = sum(driver.inbox.depth for driver in drivers)
+            dropped = sum(driver.inbox.dropped + driver.inbox.overflow for driver in drivers)
+            print(f"{now - start:4.1f} {sent:8d} {rss_mb():8.1f} {len(asyncio.all_tasks()):7d} {depth:7d} {dropped:8d}")
+
+    elapsed = time.perf_counter() - start
+    handled = sum(driver.inbox.handled for driver in drivers)
+    coalesced = sum(driver.inbox.coalesced for driver in drivers)
+    dropped = sum(driver.inbox.dropped for driver in drivers)
+    overflow = sum(driver.inbox.overflow for driver in drivers)
+    print(f"replayed {sent} messages in {elapsed:.2f} s ({sent / elapsed:,.0f}/s), peak tasks {peak_tasks}")
+    if args.mode == "inbox":
+        print(f"handled {handled}, dropped {dropped}, overflow {overflow}, coalesced {coalesced}")
+
+
+def main() -> None:
+    asyncio.run(run(parse_args()))
+
+
+if __name__ == "__main__":
+    main()
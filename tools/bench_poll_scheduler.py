@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+轮询调度基准
+模拟大量设备（每次轮询 I/O 耗时随机），对比“每设备一个循环 + sleep(poll_interval)”与中心调度器：
+实际轮询间隔（漂移）、相位分布（同时在途的峰值）、任务数与 CPU 占用。
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.services.poll_scheduler import PollScheduler  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare per-device sleep loops with the central poll scheduler.")
+    parser.add_argument("--devices", type=int, default=5000, help="Number of simulated devices")
+    parser.add_argument("--interval", type=float, default=1.0, help="poll_interval (s)")
+    parser.add_argument("--io-min", type=float, default=0.005, help="Shortest simulated poll I/O (s)")
+    parser.add_argument("--io-max", type=float, default=0.05, help="Longest simulated poll I/O (s)")
+    parser.add_argument("--duration", type=float, default=6.0, help="Seconds per mode")
+    return parser.parse_args()
+
+
+class Probe:
+    def __init__(self, devices: int):
+        self.starts: list[list[float]] = [[] for _ in range(devices)]
+        self.in_flight = 0
+        self.peak = 0
+
+    async def poll(self, index: int, io: float) -> None:
+        self.starts[index].append(time.perf_counter())
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(io)
+        self.in_flight -= 1
+
+    def report(self, name: str, interval: float, cpu: float, wall: float, tasks: int) -> None:
+        gaps = [b - a for starts in self.starts for a, b in zip(starts, starts[1:])]
+        polls = sum(len(starts) for starts in self.starts)
+        mean_gap = statistics.fmean(gaps) if gaps else float("nan")
+        print(f"[{name}]")
+        print(f"  polls        : {polls} ({polls / wall:,.0f}/s, ideal {len(self.starts) / interval:,.0f}/s)")
+        print(f"  mean interval: {mean_gap * 1000:.1f} ms (target {interval * 1000:.0f} ms, drift {(mean_gap - interval) * 1000:+.1f} ms)")
+        print(f"  peak in-flight: {self.peak}, tasks: {tasks}, CPU {cpu / wall:.0%} of one core")
+
+
+async def legacy(args: argparse.Namespace, ios: list[float]) -> None:
+    probe = Probe(args.devices)
+
+    async def loop(index: int) -> None:
+        # The old DeviceManager loop: work, then sleep a full interval.
+        while True:
+            await probe.poll(index, ios[index])
+            await asyncio.sleep(args.interval)
+
+    cpu, wall = time.process_time(), time.perf_counter()
+    tasks = [asyncio.create_task(loop(index)) for index in range(args.devices)]
+    await asyncio.sleep(args.duration)
+    count = len(asyncio.all_tasks())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    probe.report("per-device loops", args.interval, time.process_time() - cpu, time.perf_counter() - wall, count)
+
+
+async def scheduled(args: argparse.Namespace, ios: list[float]) -> None:
+    probe = Probe(args.devices)
+    scheduler = PollScheduler(max_in_flight=args.devices, max_per_endpoint=args.devices)
+
+    def make_poll(index: int):
+        async def poll() -> None:
+            await probe.poll(index, ios[index])
+
+        return poll
+
+    cpu, wall = time.process_time(), time.perf_counter()
+    entries = [scheduler.add(index, args.interval, make_poll(index)) for index in range(args.devices)]
+    await asyncio.sleep(args.duration)
+    count = len(asyncio.all_tasks())
+    stats = scheduler.stats()["entries"]
+    for entry in entries:
+        await scheduler.remove(entry)
+    probe.report("central scheduler", args.interval, time.process_time() - cpu, time.perf_counter() - wall, count)
+    lag = max(item["lag_max_ms"] for item in stats)
+    jitter = statistics.fmean(item["jitter_avg_ms"] for item in stats)
+    print(f"  scheduler stats: max lag {lag:.1f} ms, mean jitter {jitter:.2f} ms, skipped {sum(i['skipped'] for i in stats)}")
+
+
+async def run(args: argparse.Namespace) -> None:
+    rng = random.Random(1)
+    ios = [rng.uniform(args.io_min, args.io_max) for _ in range(args.devices)]
+    await legacy(args, ios)
+    await scheduled(args, ios)
+
+
+def main() -> None:
+    asyncio.run(run(parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+串口非阻塞验证（Linux/macOS，基于 pty）
+一个串口设备迟迟不应答时，测量另一个串口设备的轮询节奏与事件循环延迟。
+正常设备的最长周期超过阈值（默认 3 × --interval）时以非零状态退出，可直接用于回归检查。
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import pty
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.drivers.serial_driver import SerialDriver  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Check that a silent serial port does not stall other devices.")
+    parser.add_argument("--duration", type=float, default=3.0, help="Seconds to run")
+    parser.add_argument("--interval", type=float, default=0.1, help="Poll interval of the healthy device (s)")
+    parser.add_argument("--slow-timeout", type=float, default=2.0, help="Receive timeout of the silent device (s)")
+    parser.add_argument(
+        "--max-cycle-factor",
+        type=float,
+        default=3.0,
+        help="Fail when the healthy device's longest cycle exceeds this many intervals",
+    )
+    return parser.parse_args()
+
+
+def open_pty() -> tuple[int, str]:
+    master, slave = pty.openpty()
+    path = os.ttyname(slave)
+    os.set_blocking(master, False)
+    return master, path
+
+
+async def echo_peer(master: int, stop: asyncio.Event) -> None:
+    loop = asyncio.get_running_loop()
+    ready = asyncio.Event()
+    loop.add_reader(master, ready.set)
+    try:
+        while not stop.is_set():
+            await ready.wait()
+            ready.clear()
+            try:
+                data = os.read(master, 1024)
+            except BlockingIOError:
+                continue
+            if data:
+                os.write(master, b"ST,GS,+0012.34kg\r\n")
+    finally:
+        loop.remove_reader(master)
+
+
+async def poll_healthy(driver: SerialDriver, interval: float, stop: asyncio.Event, gaps: list[float]) -> None:
+    last = time.perf_counter()
+    while not stop.is_set():
+        await driver.execute_action("serial.send", {"data": "SI\r\n"})
+        await driver.execute_action("serial.receive", {"size": 18, "timeout": 500})
+        now = time.perf_counter()
+        gaps.append(now - last)
+        last = now
+        await asyncio.sleep(interval)
+
+
+async def poll_silent(driver: SerialDriver, timeout: float, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        await driver.execute_action("serial.receive", {"size": 18, "timeout": timeout * 1000})
+
+
+async def main() -> None:
+    args = parse_args()
+    healthy_master, healthy_path = open_pty()
+    silent_master, silent_path = open_pty()
+
+    healthy = SerialDriver({"port": healthy_path, "baudrate": 9600})
+    silent = SerialDriver({"port": silent_path, "baudrate": 9600})
+    if not await healthy.connect() or not await silent.connect():
+        raise SystemExit(f"connect failed: {healthy.get_last_error() or silent.get_last_error()}")
+
+    stop = asyncio.Event()
+    gaps: list[float] = []
+    tasks = [
+        asyncio.create_task(echo_peer(healthy_master, stop)),
+        asyncio.create_task(poll_healthy(healthy, args.interval, stop, gaps)),
+        asyncio.create_task(poll_silent(silent, args.slow_timeout, stop)),
+    ]
+    await asyncio.sleep(args.duration)
+    stop.set()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await healthy.disconnect()
+    await silent.disconnect()
+    os.close(healthy_master)
+    os.close(silent_master)
+
+    if not gaps:
+        raise SystemExit("FAIL: the healthy device never completed a poll")
+    cycles = gaps[1:] or gaps
+    limit = args.interval * args.max_cycle_factor
+    print(f"healthy polls:  {len(gaps)} in {args.duration:.1f}s (interval {args.interval * 1000:.0f} ms)")
+    print(f"cycle median:   {statistics.median(cycles) * 1000:8.1f} ms")
+    print(f"cycle max:      {max(cycles) * 1000:8.1f} ms (limit {limit * 1000:.1f} ms)")
+    print(f"silent timeout: {args.slow_timeout * 1000:8.1f} ms")
+    if max(cycles) > limit:
+        raise SystemExit(f"FAIL: healthy device stalled for {max(cycles) * 1000:.1f} ms")
+    print("OK: the silent port did not stall the healthy device")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+UDP 推送接收基准
+另起一个进程按固定速率向本机发送检重秤报文，测量 udp 设备的解析吞吐、丢包与接收进程 CPU 占用。
+报文走与运行时相同的路径：UdpDriver -> DeviceManager 批量处理 -> message_handler 解析 -> 事件推送。
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing
+import socket
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.drivers.udp_driver import UdpDriver  # noqa: E402
+from backend.services.data_collector import RuntimeState  # noqa: E402
+from backend.services.device_manager import DeviceManager, DeviceRuntime  # noqa: E402
+from backend.services.template_compiler import compile_template  # noqa: E402
+
+TEMPLATE = {
+    "name": "bench",
+    "protocol_type": "udp",
+    "variables": [],
+    "steps": [],
+    "message_handler": {
+        "id": "handle_message",
+        "trigger": "event",
+        "action": "udp.on_message",
+        "parse": {"type": "regex", "pattern": "([-+]?[0-9]*\\.?[0-9]+)kg", "group": 1},
+    },
+    "output": {"weight": "${message_handler.result}", "unit": "kg"},
+}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark UDP datagram ingestion.")
+    parser.add_argument("--rate", type=int, default=10000, help="Datagrams per second in total (0 = as fast as possible)")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds to send")
+    parser.add_argument("--devices", type=int, default=4, help="Number of senders / devices sharing the port")
+    parser.add_argument("--port", type=int, default=19100, help="Local UDP port")
+    return parser.parse_args()
+
+
+def sender(port: int, devices: int, rate: int, duration: float, base_port: int, result: multiprocessing.Queue) -> None:
+    socks = []
+    for index in range(devices):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.bind(("127.0.0.1", base_port + index))
+        socks.append(sock)
+    target = ("127.0.0.1", port)
+    sent = 0
+    start = time.perf_counter()
+    end = start + duration
+    while True:
+        now = time.perf_counter()
+        if now >= end:
+            break
+        due = int((now - start) * rate) if rate else sent + 64
+        while sent < due:
+            socks[sent % devices].sendto(b"ST,GS,+%07.2fkg\r\n" % (sent % 10000 / 100), target)
+            sent += 1
+        if rate:
+            time.sleep(0.0005)
+    for sock in socks:
+        sock.close()
+    result.put((sent, time.perf_counter() - start))
+
+
+async def run(args: argparse.Namespace) -> None:
+    manager = DeviceManager()
+    plan = compile_template(TEMPLATE)
+    base_port = args.port + 1
+    runtimes = []
+    for index in range(args.devices):
+        driver = UdpDriver({"listen_host": "127.0.0.1", "listen_port": args.port, "peer_ip": "127.0.0.1", "peer_port": base_port + index})
+        runtime = DeviceRuntime(
+            device=SimpleNamespace(template_variables={}),
+            template=SimpleNamespace(protocol_type="udp"),
+            plan=plan,
+            driver=driver,
+            state=RuntimeState(device_id=index, device_name=f"udp-{index}"),
+            stop_event=asyncio.Event(),
+        )
+        driver.register_batch_handler(lambda topic, payloads, runtime=runtime: manager._handle_pushed_batch(runtime, topic, payloads))
+        if not await driver.connect():
+            raise SystemExit(f"bind failed: {driver.get_last_error()}")
+        runtimes.append(runtime)
+
+    parsed = 0
+    original = manager._executor.run_message_handler
+
+    async def counting(*a, **kw):
+        nonlocal parsed
+        parsed += 1
+        return await original(*a, **kw)
+
+    manager._executor.run_message_handler = counting
+
+    result: multiprocessing.Queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=sender, args=(args.port, args.devices, args.rate, args.duration, base_port, result))
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    process.start()
+    while process.is_alive():
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(0.2)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    sent, send_seconds = result.get()
+
+    for runtime in runtimes:
+        await runtime.driver.disconnect()
+
+    batches = sum(runtime.driver.batches for runtime in runtimes)
+    max_batch = max(runtime.driver.max_batch for runtime in runtimes)
+    weights = {runtime.state.weight for runtime in runtimes}
+    print(f"sent       : {sent} datagrams in {send_seconds:.2f} s ({sent / send_seconds:,.0f}/s)")
+    print(f"parsed     : {parsed} ({parsed / send_seconds:,.0f}/s), lost {sent - parsed} ({(sent - parsed) / max(sent, 1):.2%})")
+    print(f"batches    : {batches} (avg {parsed / max(batches, 1):.1f}, max {max_batch})")
+    print(f"receiver   : {cpu:.2f} s CPU over {wall:.2f} s wall ({cpu / wall:.0%} of one core)")
+    print(f"last weight: {sorted(w for w in weights if w is not None)[:4]}")
+
+
+def main() -> None:
+    asyncio.run(run(parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+WebSocket 扇出编码基准
+N 个订阅全部设备的连接，每条 weight_update 需要发给所有连接。
+对比"每个连接各自 json.dumps"（旧 send_json）与"EventBus 发布时只编码一次"的耗时。
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.services import event_bus  # noqa: E402
+from backend.services.event_bus import EventBus  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare per-subscriber encoding with encode-once fan-out.")
+    parser.add_argument("--subscribers", type=int, default=200, help="Connected dashboards")
+    parser.add_argument("--messages", type=int, default=2000, help="weight_update messages to publish")
+    return parser.parse_args()
+
+
+def make_message(seq: int) -> dict:
+    return {
+        "type": "weight_update",
+        "device_id": seq % 2000,
+        "device_name": f"地磅 {seq % 2000}",
+        "device_code": f"SCALE_{seq % 2000:04d}",
+        "weight": round(seq * 0.37 % 1000, 2),
+        "unit": "kg",
+        "timestamp": "2026-03-01T08:10:01.123456+00:00",
+        "status": "online",
+        "error": None,
+        "stable": seq % 3 == 0,
+        "stable_since": None,
+    }
+
+
+async def drain(queues: list[asyncio.Queue], encode_each: bool) -> None:
+    for queue in queues:
+        while not queue.empty():
+            item = queue.get_nowait()
+            if encode_each:
+                json.dumps(item, ensure_ascii=False, separators=(",", ":"))
+
+
+async def per_subscriber(subscribers: int, messages: int) -> float:
+    # Old path: the bus hands out the dict and every connection encodes it itself.
+    queues: list[asyncio.Queue] = [asyncio.Queue(maxsize=200) for _ in range(subscribers)]
+    started = time.perf_counter()
+    for seq in range(messages):
+        message = make_message(seq)
+        for queue in queues:
+            event_bus.offer(queue, message)  # type: ignore[arg-type]
+        if seq % 100 == 99:
+            await drain(queues, encode_each=True)
+    await drain(queues, encode_each=True)
+    return time.perf_counter() - started
+
+
+async def encode_once(subscribers: int, messages: int) -> float:
+    bus = EventBus()
+    queues = [await bus.subscribe() for _ in range(subscribers)]
+    started = time.perf_counter()
+    for seq in range(messages):
+        await bus.publish(make_message(seq))
+        if seq % 100 == 99:
+            await drain(queues, encode_each=False)
+    await drain(queues, encode_each=False)
+    return time.perf_counter() - started
+
+
+async def main() -> None:
+    args = parse_args()
+    frames = args.subscribers * args.messages
+    print(f"subscribers={args.subscribers} messages={args.messages} encoder={'orjson' if event_bus.orjson else 'json'}")
+    for name, run in (("per-subscriber json.dumps", per_subscriber), ("encode once", encode_once)):
+        elapsed = await run(args.subscribers, args.messages)
+        print(f"{name:<26} {elapsed:7.3f}s  {frames / elapsed:>12,.0f} frames/s  {elapsed / frames * 1e6:6.2f} us/frame")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -5,6 +5,7 @@ import argparse
 import asyncio
 import json
 from datetime import datetime
+from fnmatch import fnmatchcase
 from typing import Any
 
 try:
@@ -24,7 +25,9 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--port", type=int, default=8000, help="Quantix backend port")
     parser.add_argument("--api-key", default="quantix-dev-key", help="API key for /ws")
     parser.add_argument("--device-id", type=int, default=None, help="Only show one device")
-    parser.add_argument("--device-code", default=None, help="Only show one device by device_code")
+    parser.add_argument("--device-code", default=None, help="Only show devices by device_code (glob like SC-*)")
+    parser.add_argument("--template-id", type=int, default=None, help="Only show devices using one template")
+    parser.add_argument("--status-only", action="store_true", help="Only receive messages when status changes")
     parser.add_argument("--show-ping", action="store_true", help="Print ping messages")
     parser.add_argument("--raw", action="store_true", help="Print raw JSON message")
     parser.add_argument("--wss", action="store_true", help="Use wss:// instead of ws://")
@@ -49,13 +52,36 @@ def build_ws_url(host: str, port: int, api_key: str, use_wss: bool) -> str:
     return f"{scheme}://{host}:{port}/ws?api_key={api_key}"
 
 
+def build_subscribe_message(
+    device_id: int | None,
+    device_code: str | None,
+    template_id: int | None,
+    status_only: bool,
+) -> dict[str, Any] | None:
+    if device_id is None and device_code is None and template_id is None and not status_only:
+        return None
+    message: dict[str, Any] = {"action": "subscribe", "status_only": status_only}
+    if device_id is not None:
+        message["device_ids"] = [device_id]
+    if device_code is not None:
+        message["device_codes"] = [device_code]
+    if template_id is not None:
+        message["template_ids"] = [template_id]
+    if len(message) == 2:
+        message["all"] = True
+    return message
+
+
 async def run_subscriber(
     url: str,
     device_id: int | None,
     device_code: str | None,
+    template_id: int | None,
+    status_only: bool,
     show_ping: bool,
     show_raw: bool,
 ) -> None:
+    subscribe = build_subscribe_message(device_id, device_code, template_id, status_only)
     backoff = 1.0
     max_backoff = 30.0
 
@@ -65,6 +91,9 @@ async def run_subscriber(
             async with websockets.connect(url, ping_interval=20, ping_timeout=20, open_timeout=10) as ws:
                 print("[connected] waiting for real-time updates...")
                 backoff = 1.0
+                if subscribe is not None:
+                    # Filtering happens on the server; the checks below stay as a fallback for older servers.
+                    await ws.send(json.dumps(subscribe))
 
                 async for text in ws:
                     try:
@@ -83,6 +112,10 @@ async def run_subscriber(
                             print("[ping]")
                         continue
 
+                    if message_type == "subscription":
+                        print(f"[subscribed] devices={message.get('matched_device_ids')}")
+                        continue
+
                     if message_type != "weight_update":
                         print(f"[event:{message_type}] {message}")
                         continue
@@ -91,7 +124,9 @@ async def run_subscriber(
                     current_device_code = message.get("device_code")
                     if device_id is not None and current_device_id != device_id:
                         continue
-                    if device_code is not None and str(current_device_code or "").upper() != device_code.upper():
+                    if device_code is not None and not fnmatchcase(
+                        str(current_device_code or "").upper(), device_code.upper()
+                    ):
                         continue
 
                     ts = format_timestamp(message.get("timestamp"))
@@ -124,6 +159,8 @@ async def main() -> None:
         url=url,
         device_id=args.device_id,
         device_code=args.device_code,
+        template_id=args.template_id,
+        status_only=args.status_only,
         show_ping=args.show_ping,
         show_raw=args.raw,
     )